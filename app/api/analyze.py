@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Query, Response, HTTPException
-from app.schemas import AnalyzeRequest, ToneProfile
-from app.services.gemini import analyze_tone
+from fastapi import APIRouter, Query, Request, Response, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from tempfile import SpooledTemporaryFile
+from app.schemas import AnalyzeRequest, AnalyzeJobStatus, ToneProfile
+from app.services.gemini import analyze_tone_cached, stream_analyze_tone
 from app.api.storage import set_last_result
-from app.utils.dialogue import cut_dialogue_by_date
+from app.utils.dialogue import cut_dialogue_by_date, cut_dialogue_from_file
+from app.services.compaction import compact_dialogue
+from app.services.incremental import analyze_incremental
+from app.services.jobs import job_queue, QueueFullError
+from app.services.llm import LLMUnavailableError
+from app.services.admission import admit, current_user
+from app.utils.sse import sse_response
 import logging
 
 # 로거 설정
@@ -11,21 +19,31 @@ error_logger = logging.getLogger('error')
 
 router = APIRouter()
 
+INCREMENTAL_QUERY = Query(False, description="마지막 저장 프로필 + 새 줄만으로 프로필 갱신 (주기적으로 전체 재분석)")
+
 @router.post("/analyze", response_model=ToneProfile)
-async def analyze_text_post(data: AnalyzeRequest, user_id: str = Query(...)):
+async def analyze_text_post(data: AnalyzeRequest, response: Response, user_id: str = Query(...),
+                            incremental: bool = INCREMENTAL_QUERY):
+    admit("analyze", user_id)
     try:
         api_logger.info(f"POST /analyze - user_id: {user_id}")
-        api_logger.debug(f"Request data: {data.dict()}")
+        api_logger.debug(f"Request data: {data.model_dump()}")
         
         if not data.dialogue:
             raise HTTPException(status_code=400, detail="Dialogue is empty")
+
+        if incremental:
+            return await _analyze_incremental(user_id, cut_dialogue_by_date(data.dialogue), response)
             
-        trimmed_dialogue = cut_dialogue_by_date(data.dialogue)
+        trimmed_dialogue = compact_dialogue(cut_dialogue_by_date(data.dialogue))
         api_logger.debug(f"Trimmed dialogue length: {len(trimmed_dialogue)}")
         
         try:
-            result = analyze_tone(trimmed_dialogue)
-            api_logger.info("Analysis completed successfully")
+            result, cache_status = await analyze_tone_cached(trimmed_dialogue)
+            response.headers["X-Analysis-Cache"] = cache_status
+            api_logger.info(f"Analysis completed successfully (cache: {cache_status})")
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             error_logger.error(f"Analysis failed: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
@@ -39,7 +57,7 @@ async def analyze_text_post(data: AnalyzeRequest, user_id: str = Query(...)):
             
         return result
         
-    except HTTPException:
+    except (HTTPException, LLMUnavailableError):
         raise
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
@@ -47,17 +65,21 @@ async def analyze_text_post(data: AnalyzeRequest, user_id: str = Query(...)):
         raise HTTPException(status_code=500, detail=error_msg)
 
 @router.get("/analyze", response_model=ToneProfile)
-async def analyze_text_get(dialogue: list[str] = Query(...), user_id: str = Query(...)):
+async def analyze_text_get(response: Response, dialogue: list[str] = Query(...), user_id: str = Query(...)):
+    admit("analyze", user_id)
     try:
         api_logger.info(f"GET /analyze - user_id: {user_id}")
         api_logger.debug(f"Request dialogue length: {len(dialogue)}")
         
-        trimmed_dialogue = cut_dialogue_by_date(dialogue)
+        trimmed_dialogue = compact_dialogue(cut_dialogue_by_date(dialogue))
         api_logger.debug(f"Trimmed dialogue length: {len(trimmed_dialogue)}")
         
         try:
-            result = analyze_tone(trimmed_dialogue)
-            api_logger.info("Analysis completed successfully")
+            result, cache_status = await analyze_tone_cached(trimmed_dialogue)
+            response.headers["X-Analysis-Cache"] = cache_status
+            api_logger.info(f"Analysis completed successfully (cache: {cache_status})")
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             error_logger.error(f"Analysis failed: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
@@ -70,13 +92,143 @@ async def analyze_text_get(dialogue: list[str] = Query(...), user_id: str = Quer
             
         return result
         
-    except HTTPException:
+    except (HTTPException, LLMUnavailableError):
         raise
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         error_logger.error(error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=error_msg)
 
+# 스트리밍(SSE) 분석: chunk 이벤트로 JSON 조각을 보내고, 검증된 결과는 profile 이벤트로 보냄
+@router.post("/analyze/stream")
+async def analyze_text_stream(data: AnalyzeRequest, user_id: str = Query(...)):
+    api_logger.info(f"POST /analyze/stream - user_id: {user_id}")
+    admit("analyze", user_id)
+
+    if not data.dialogue:
+        raise HTTPException(status_code=400, detail="Dialogue is empty")
+
+    trimmed_dialogue = compact_dialogue(cut_dialogue_by_date(data.dialogue))
+    api_logger.debug(f"Trimmed dialogue length: {len(trimmed_dialogue)}")
+
+    async def events():
+        async for event, payload in stream_analyze_tone(trimmed_dialogue):
+            if event == "profile":
+                try:
+                    set_last_result(user_id, payload)
+                except Exception as e:
+                    error_logger.error(f"Failed to save result: {str(e)}", exc_info=True)
+            yield event, payload
+
+    return sse_response(events())
+
+# 대화 내보내기 파일 업로드 분석
+# - multipart/form-data 의 file 필드, 또는 요청 본문 자체(text/plain 등)를 파일로 받음
+# - 본문은 임시 파일로 스트리밍 저장(1MB 이상은 디스크)한 뒤 끝에서부터 필요한 만큼만 읽음
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+
+@router.post("/analyze/upload", response_model=ToneProfile)
+async def analyze_upload(request: Request, response: Response, user_id: str = Query(...),
+                         incremental: bool = INCREMENTAL_QUERY):
+    api_logger.info(f"POST /analyze/upload - user_id: {user_id}")
+    admit("analyze", user_id)
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="file 필드가 없습니다")
+        export_file = upload.file
+    else:
+        export_file = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+        async for chunk in request.stream():
+            export_file.write(chunk)
+
+    try:
+        trimmed_dialogue = await run_in_threadpool(cut_dialogue_from_file, export_file)
+    finally:
+        export_file.close()
+    if incremental and trimmed_dialogue:
+        return await _analyze_incremental(user_id, trimmed_dialogue, response)
+    trimmed_dialogue = compact_dialogue(trimmed_dialogue)
+    api_logger.debug(f"Trimmed dialogue length: {len(trimmed_dialogue)}")
+
+    if not trimmed_dialogue:
+        raise HTTPException(status_code=400, detail="Dialogue is empty")
+
+    try:
+        result, cache_status = await analyze_tone_cached(trimmed_dialogue)
+        response.headers["X-Analysis-Cache"] = cache_status
+        api_logger.info(f"Analysis completed successfully (cache: {cache_status})")
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        error_logger.error(f"Analysis failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        set_last_result(user_id, result)
+    except Exception as e:
+        error_logger.error(f"Failed to save result: {str(e)}", exc_info=True)
+
+    return result
+
+# 증분 분석: 응답 헤더 X-Analysis-Mode 는 full / incremental / unchanged
+async def _analyze_incremental(user_id: str, dialogue: list[str], response: Response) -> ToneProfile:
+    try:
+        outcome = await analyze_incremental(user_id, dialogue)
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        error_logger.error(f"Analysis failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    response.headers["X-Analysis-Cache"] = outcome.cache_status
+    response.headers["X-Analysis-Mode"] = outcome.mode
+    api_logger.info(f"Incremental analysis completed (mode: {outcome.mode}, new lines: {outcome.new_lines})")
+
+    try:
+        set_last_result(user_id, outcome.profile)
+    except Exception as e:
+        error_logger.error(f"Failed to save result: {str(e)}", exc_info=True)
+
+    return outcome.profile
+
+# 비동기 작업 모드: 작업 ID 를 바로 돌려주고 결과는 GET /analyze/jobs/{job_id} 로 조회
+async def _run_analysis_job(user_id: str, dialogue: list[str]) -> ToneProfile:
+    # 요청 한도는 제출할 때 확인했으므로 LLM 대기열에서 이 사용자로 줄 서게만 함
+    current_user.set(user_id)
+    result, cache_status = await analyze_tone_cached(dialogue)
+    api_logger.info(f"Analysis job completed (cache: {cache_status})")
+    set_last_result(user_id, result)
+    return result
+
+job_queue.set_handler(_run_analysis_job)
+
+@router.post("/analyze/jobs", response_model=AnalyzeJobStatus, status_code=202)
+async def create_analysis_job(data: AnalyzeRequest, response: Response, user_id: str = Query(...)):
+    api_logger.info(f"POST /analyze/jobs - user_id: {user_id}")
+    admit("analyze", user_id)
+
+    if not data.dialogue:
+        raise HTTPException(status_code=400, detail="Dialogue is empty")
+
+    trimmed_dialogue = compact_dialogue(cut_dialogue_by_date(data.dialogue))
+    try:
+        job_id = await job_queue.submit(user_id, trimmed_dialogue)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    response.headers["Location"] = f"/analyze/jobs/{job_id}?user_id={user_id}"
+    return AnalyzeJobStatus(job_id=job_id, status="queued")
+
+@router.get("/analyze/jobs/{job_id}", response_model=AnalyzeJobStatus)
+async def get_analysis_job(job_id: str, user_id: str = Query(...)):
+    job = await job_queue.get(job_id)
+    if job is None or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return AnalyzeJobStatus(job_id=job["job_id"], status=job["status"], result=job["result"], error=job["error"])
+
 @router.options("/analyze")
 async def preflight_analyze():
     api_logger.debug("OPTIONS /analyze - CORS preflight request")
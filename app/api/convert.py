@@ -1,18 +1,66 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas import ConvertRequest, ConvertResponse,ConvertWithProfileRequest,ConvertFromPresetRequest,ConvertWithAutoPresetRequest,ConvertWithAutoPresetResponse
-from app.services.convert import convert_tone,convert_with_tone_profile,convert_from_preset,convert_with_auto_preset
+from app.schemas import ConvertBatchRequest, ConvertBatchResponse
+from app.services.convert import convert_tone,convert_with_tone_profile,convert_from_preset,convert_with_auto_preset,convert_batch
+from app.services.convert import stream_convert_tone,stream_convert_with_tone_profile,stream_convert_from_preset,stream_convert_with_auto_preset
+from app.services.admission import admit
+from app.utils.sse import sse_response
 
 router = APIRouter()
 
+# 요청 한도/LLM 대기열 키: 본문에 user_id 가 없으면 클라이언트 주소
+def _admit(request: Request, user_id: str | None = None):
+    admit("convert", user_id or f"ip:{request.client.host if request.client else 'unknown'}")
+
 @router.post("/convert", response_model=ConvertResponse)
-def convert_text(data: ConvertRequest):
-    return convert_tone(data)
+async def convert_text(data: ConvertRequest, request: Request):
+    _admit(request)
+    return await convert_tone(data)
 @router.post("/convert/with-profile", response_model=ConvertResponse)
-def convert_text_with_profile(data: ConvertWithProfileRequest):
-    return convert_with_tone_profile(data)
+async def convert_text_with_profile(data: ConvertWithProfileRequest, request: Request):
+    _admit(request)
+    return await convert_with_tone_profile(data)
 @router.post("/convert/from-preset", response_model=ConvertResponse)
-def convert_text_from_preset(data: ConvertFromPresetRequest):
-    return convert_from_preset(data)
+async def convert_text_from_preset(data: ConvertFromPresetRequest, request: Request):
+    _admit(request, data.user_id)
+    return await convert_from_preset(data)
 @router.post("/convert/auto-preset", response_model=ConvertWithAutoPresetResponse)
-def convert_auto_preset(data: ConvertWithAutoPresetRequest):
-    return convert_with_auto_preset(data)
\ No newline at end of file
+async def convert_auto_preset(data: ConvertWithAutoPresetRequest, request: Request):
+    _admit(request, data.user_id)
+    try:
+        return await convert_with_auto_preset(data)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="프리셋을 찾을 수 없습니다")
+@router.post("/convert/batch", response_model=ConvertBatchResponse)
+async def convert_text_batch(data: ConvertBatchRequest, request: Request):
+    _admit(request, data.user_id)
+    try:
+        return await convert_batch(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="프리셋을 찾을 수 없습니다")
+
+# 스트리밍(SSE) 변환: token 이벤트로 조각을 보내고 done 이벤트로 최종 결과를 보냄
+@router.post("/convert/stream")
+async def convert_text_stream(data: ConvertRequest, request: Request):
+    _admit(request)
+    return sse_response(stream_convert_tone(data))
+@router.post("/convert/with-profile/stream")
+async def convert_text_with_profile_stream(data: ConvertWithProfileRequest, request: Request):
+    _admit(request)
+    return sse_response(stream_convert_with_tone_profile(data))
+@router.post("/convert/from-preset/stream")
+async def convert_text_from_preset_stream(data: ConvertFromPresetRequest, request: Request):
+    _admit(request, data.user_id)
+    try:
+        return sse_response(stream_convert_from_preset(data))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="프리셋을 찾을 수 없습니다")
+@router.post("/convert/auto-preset/stream")
+async def convert_auto_preset_stream(data: ConvertWithAutoPresetRequest, request: Request):
+    _admit(request, data.user_id)
+    try:
+        return sse_response(await stream_convert_with_auto_preset(data))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="프리셋을 찾을 수 없습니다")
@@ -1,30 +1,23 @@
-from fastapi import APIRouter, Body
-from pathlib import Path
-import json
+from fastapi import APIRouter, Body, Query, Request, Response
+from app.core.conditional import check_not_modified
+from app.services.history import append_history, read_history, history_validator
 
 router = APIRouter()
-HISTORY_BASE = Path("app/history")
 
 @router.post("/history/{user_id}")
 def add_history(user_id: str, text: str = Body(..., embed=True)):
-    user_file = HISTORY_BASE / f"{user_id}.json"
-    history = []
-
-    if user_file.exists():
-        history = json.loads(user_file.read_text(encoding="utf-8"))
-
-    history.append(text)
-    if len(history) > 100:
-        history = history[-100:]  # 최근 100개만 유지
-
-    user_file.parent.mkdir(parents=True, exist_ok=True)
-    user_file.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
-    return {"message": "saved", "count": len(history)}
+    count = append_history(user_id, text)
+    return {"message": "saved", "count": count}
 
 
+# offset: 최근 메시지부터 건너뛸 개수, limit: 가져올 개수 (결과는 항상 시간순)
 @router.get("/history/{user_id}")
-def get_history(user_id: str):
-    user_file = HISTORY_BASE / f"{user_id}.json"
-    if not user_file.exists():
-        return []
-    return json.loads(user_file.read_text(encoding="utf-8"))
+def get_history(
+    request: Request,
+    response: Response,
+    user_id: str,
+    offset: int = Query(0, ge=0, description="최근 메시지부터 건너뛸 개수"),
+    limit: int | None = Query(None, ge=1, description="가져올 최대 개수")
+):
+    check_not_modified(request, response, history_validator(user_id), offset, limit)
+    return read_history(user_id, offset, limit)
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import ToneProfile
-from app.services.preset import save_preset, load_preset, list_presets, delete_preset
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.core.conditional import check_not_modified
+from app.core.serialization import json_bytes_response, model_to_json
+from app.schemas import ToneProfile, PresetPage
+from app.services.preset import (
+    save_preset, load_preset, list_presets, page_presets, delete_preset, pack_validator, preset_validator
+)
 
 router = APIRouter()
 
@@ -9,14 +13,33 @@ def create_preset(user_id: str, profile: ToneProfile):
     save_preset(user_id, profile.name, profile)
     return {"message": f"{profile.name} 프리셋 저장 완료"}
 
+# expand=true 면 이름 목록 대신 프로필 전체를 한 번에 반환 (프리셋마다 따로 요청할 필요 없음)
 @router.get("/presets/{user_id}")
-def get_preset_list(user_id: str):
-    return list_presets(user_id)
+def get_preset_list(
+    request: Request,
+    response: Response,
+    user_id: str,
+    expand: bool = Query(False, description="true 면 이름 대신 프로필 목록 반환"),
+    fields: str | None = Query(None, description="반환할 필드 (쉼표 구분, 예: 'tone,formality'), name 은 항상 포함"),
+    offset: int = Query(0, ge=0, description="건너뛸 프리셋 수 (이름순)"),
+    limit: int | None = Query(None, ge=1, le=500, description="최대 항목 수"),
+):
+    check_not_modified(request, response, pack_validator(user_id), str(request.query_params))
+    if not expand:
+        return list_presets(user_id)
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    unknown = set(selected or ()) - set(ToneProfile.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    total, items = page_presets(user_id, selected, offset, limit)
+    return PresetPage(total=total, offset=offset, limit=limit, items=items)
 
 @router.get("/presets/{user_id}/{preset_name}", response_model=ToneProfile)
-def get_preset(user_id: str, preset_name: str):
+def get_preset(request: Request, response: Response, user_id: str, preset_name: str):
+    check_not_modified(request, response, preset_validator(user_id, preset_name))
     try:
-        return load_preset(user_id, preset_name)
+        # 캐시된(검증된) 프로필을 바로 직렬화해서 응답 (response_model 재검증 생략)
+        return json_bytes_response(model_to_json(load_preset(user_id, preset_name)), response)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="프리셋을 찾을 수 없습니다")
 
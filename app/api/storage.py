@@ -1,23 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request, Response
+from app.core.conditional import check_not_modified
+from app.core.serialization import json_bytes_response
 from app.schemas import ToneProfile
 from app.services.storage import (
     save_tone_profile,
-    load_latest_profile,
     list_user_history
 )
 from app.services.storage import (
-    load_profile, update_profile, delete_profile
+    load_profile_json, load_latest_profile_json, update_profile, delete_profile
 )
+from app.services.storage import latest_validator, profile_validator, history_version
+from app.services.staging import result_store
 
 router = APIRouter()
 
-# 임시 저장 (유저별)
-_last_results: dict[str, ToneProfile] = {}
-
 # 저장
 @router.post("/save", response_model=dict)
 def save_last_result(user_id: str = Query(..., description="사용자 ID")):
-    profile = _last_results.get(user_id)
+    profile = result_store.get(user_id)
     if profile is None:
         raise HTTPException(status_code=400, detail="저장할 데이터가 없습니다.")
     
@@ -26,33 +26,41 @@ def save_last_result(user_id: str = Query(..., description="사용자 ID")):
 
 # 마지막 결과 로드
 @router.get("/load", response_model=ToneProfile)
-def load_saved_result(user_id: str = Query(...)):
+def load_saved_result(request: Request, response: Response, user_id: str = Query(...)):
+    check_not_modified(request, response, latest_validator(user_id))
     try:
-        return load_latest_profile(user_id)
+        return json_bytes_response(load_latest_profile_json(user_id), response)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 # 사용자별 저장된 파일 목록
 @router.get("/history", response_model=list[str])
 def get_user_history(
+    request: Request,
+    response: Response,
     user_id: str = Query(...),
     sort: str = Query("asc", description="'asc' 또는 'desc'"),
-    query: str | None = Query(None, description="검색 키워드")
+    query: str | None = Query(None, description="검색 키워드 ('tone:친근' 처럼 필드 지정 가능, 결과는 관련도 순)")
 ):
+    check_not_modified(request, response, history_version(user_id), sort, query)
     return list_user_history(user_id, sort, query)
 
+# 임시 저장 (유저별, 설정에 따라 메모리 또는 워커 공유 저장소)
 def set_last_result(user_id: str, profile: ToneProfile):
-    _last_results[user_id] = profile
+    result_store.set(user_id, profile)
 
 
 #특정 파일 로드
 @router.get("/load/{filename}", response_model=ToneProfile)
 def load_by_filename(
+    request: Request,
+    response: Response,
     user_id: str = Query(...), 
     filename: str = Path(..., description="불러올 파일명")
 ):
+    check_not_modified(request, response, profile_validator(user_id, filename))
     try:
-        return load_profile(user_id, filename)
+        return json_bytes_response(load_profile_json(user_id, filename), response)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -0,0 +1,60 @@
+# app/api/webapp.py
+# Flutter 웹 빌드 제공 (WEB_APP_DIR 를 설정했을 때만 main 에서 등록)
+# - {경로}/_v/{빌드 ID}/... : 현재 빌드 ID 면 1년 immutable 캐시
+# - index.html, flutter_service_worker.js, version.json 과 그 밖의 경로: no-cache + ETag 재검증 (304)
+import os
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import FileResponse
+from app.core.conditional import etag_matches
+from app.core.config import WEB_APP_PATH
+from app.services.webapp import web_build
+
+router = APIRouter(prefix=WEB_APP_PATH.rstrip("/"), include_in_schema=False)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# 새 배포를 바로 알아야 하므로 버전 경로 아래에서도 항상 재검증
+ALWAYS_REVALIDATE = {"index.html", "flutter_service_worker.js", "version.json"}
+
+class WebFileResponse(FileResponse):
+    ##서버가 ASGI pathsend 확장을 지원하면 파일 경로만 넘겨 서버가 직접(sendfile) 보내게 함##
+    async def __call__(self, scope, receive, send):
+        if "http.response.pathsend" not in scope.get("extensions", {}) or scope["method"] == "HEAD" \
+                or any(key == b"range" for key, _ in scope["headers"]):
+            return await super().__call__(scope, receive, send)
+        self.set_stat_headers(self.stat_result or os.stat(self.path))
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+
+@router.get("/")
+@router.get("/{file_path:path}")
+async def serve_web_app(request: Request, file_path: str = ""):
+    versioned = False
+    parts = file_path.split("/", 2)
+    if len(parts) >= 2 and parts[0] == "_v":
+        # 이전 빌드 ID 로 온 요청도 내용은 주되 immutable 로 표시하지 않음
+        versioned = parts[1] == web_build.build_id
+        file_path = parts[2] if len(parts) == 3 else ""
+
+    asset = web_build.lookup(file_path or "index.html")
+    if asset is None:
+        # 확장자 없는 경로는 앱 내부 라우트로 보고 index.html 반환
+        if "." in file_path.rsplit("/", 1)[-1]:
+            return Response(status_code=404)
+        file_path, asset = "index.html", web_build.lookup("index.html")
+        if asset is None:
+            return Response(status_code=404)
+
+    path, encoding = web_build.choose(asset, request.headers.get("accept-encoding", ""))
+    etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+    name = file_path.rsplit("/", 1)[-1] or "index.html"
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": IMMUTABLE if versioned and name not in ALWAYS_REVALIDATE else REVALIDATE,
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return WebFileResponse(path, media_type=asset.media_type, headers=headers)
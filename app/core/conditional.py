@@ -0,0 +1,44 @@
+# core/conditional.py
+# 조건부 GET (ETag / If-None-Match) 도우미
+# - 검증자(validator)는 파일 stat(inode, mtime, 크기)이나 manifest 버전처럼 JSON 을 읽지 않고 얻을 수 있는 값
+# - 쓰기는 원자적 교체(새 inode)나 버전 증가로 검증자를 바꿈
+# - If-None-Match 가 같으면 본문을 만들지 않고 304 (HTTPException 으로 던지면 FastAPI 가 본문 없이 응답)
+import hashlib
+import os
+from pathlib import Path
+from fastapi import HTTPException, Request, Response
+
+# 사용자별 데이터이므로 공유 캐시에는 저장하지 않고, 브라우저는 매번 재검증
+CACHE_CONTROL = "private, no-cache"
+
+def file_validator(path: Path) -> tuple[int, int, int] | None:
+    ##파일 (inode, mtime_ns, 크기), 없으면 None##
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def make_etag(validator, *variant) -> str | None:
+    ##검증자 + 응답 형태를 바꾸는 값(쿼리 등)으로 약한 ETag 생성, 검증자가 None 이면 None (조건부 응답 안 함)##
+    if validator is None:
+        return None
+    return 'W/"' + hashlib.blake2b(repr((validator, *variant)).encode(), digest_size=12).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    ##If-None-Match 의 태그 중 하나가 etag 와 같은지 (약한 비교)##
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") in (target, "*") for tag in header.split(","))
+
+def check_not_modified(request: Request, response: Response, validator, *variant):
+    ##ETag/Cache-Control 을 응답에 넣고, 클라이언트가 가진 것과 같으면 304 로 중단##
+    etag = make_etag(validator, *variant)
+    if etag is None:
+        return
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
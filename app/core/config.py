@@ -4,3 +4,100 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# LLM SDK 미리 준비: off(첫 호출 때 로드) / background(기동 직후 백그라운드 로드) / blocking(로드 후 기동 완료)
+LLM_PREWARM = os.getenv("LLM_PREWARM", "background")
+
+# LLM 동시 호출 상한 (워커 프로세스 하나 기준)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+
+# 변환 결과 캐시 (크기 / TTL 초 / 디스크 저장 경로, 경로가 비어 있으면 메모리만 사용)
+CONVERT_CACHE_SIZE = int(os.getenv("CONVERT_CACHE_SIZE", "1024"))
+CONVERT_CACHE_TTL = int(os.getenv("CONVERT_CACHE_TTL", "86400"))
+CONVERT_CACHE_PATH = os.getenv("CONVERT_CACHE_PATH", "")
+
+# 배치 변환: 프롬프트 하나에 담을 최대 글자 수 / 문장 수
+CONVERT_BATCH_MAX_CHARS = int(os.getenv("CONVERT_BATCH_MAX_CHARS", "12000"))
+CONVERT_BATCH_MAX_ITEMS = int(os.getenv("CONVERT_BATCH_MAX_ITEMS", "50"))
+
+# 자동 프리셋 선택: 1, 2위 유사도 차이가 이 값보다 작으면 상위 후보만 LLM 에 물어봄
+PRESET_MATCH_MARGIN = float(os.getenv("PRESET_MATCH_MARGIN", "0.05"))
+PRESET_MATCH_TOP_K = int(os.getenv("PRESET_MATCH_TOP_K", "3"))
+
+# 메시지 히스토리: 사용자별 보관 개수, 로그가 보관 개수의 몇 배가 되면 압축할지
+HISTORY_MAX_ITEMS = int(os.getenv("HISTORY_MAX_ITEMS", "100"))
+HISTORY_COMPACT_FACTOR = int(os.getenv("HISTORY_COMPACT_FACTOR", "2"))
+
+# 분석 결과 임시 저장소 (/analyze -> /save 사이)
+# memory: 프로세스 내 LRU+TTL, sqlite: 여러 워커가 공유하는 SQLite(WAL) 파일
+RESULT_STORE_BACKEND = os.getenv("RESULT_STORE_BACKEND", "memory")
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "app/output/_staging.sqlite3")
+RESULT_STORE_TTL = int(os.getenv("RESULT_STORE_TTL", "3600"))
+RESULT_STORE_MAX_ITEMS = int(os.getenv("RESULT_STORE_MAX_ITEMS", "1000"))
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# 프리셋 캐시에 보관할 최대 프리셋 수
+PRESET_CACHE_SIZE = int(os.getenv("PRESET_CACHE_SIZE", "512"))
+
+# 분석 결과 캐시: 같은 대화(잘라낸 결과 기준)를 다시 분석하면 TTL(초) 동안 재사용
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "600"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+
+# 분석 프롬프트에 넣을 대화의 토큰 예산 (로컬 추정치 기준)과 한 줄의 최대 토큰 수
+ANALYZE_TOKEN_BUDGET = int(os.getenv("ANALYZE_TOKEN_BUDGET", "2000"))
+ANALYZE_LINE_MAX_TOKENS = int(os.getenv("ANALYZE_LINE_MAX_TOKENS", "80"))
+
+# 분석 작업 큐 (/analyze/jobs): 워커 수 / 전체 대기 상한 / 사용자별 대기 상한 / 저장 경로 / 완료 결과 보관 시간(초)
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "4"))
+ANALYSIS_JOB_MAX_QUEUED = int(os.getenv("ANALYSIS_JOB_MAX_QUEUED", "100"))
+ANALYSIS_JOB_MAX_PER_USER = int(os.getenv("ANALYSIS_JOB_MAX_PER_USER", "5"))
+ANALYSIS_JOB_PATH = os.getenv("ANALYSIS_JOB_PATH", "app/output/_jobs.sqlite3")
+ANALYSIS_JOB_RESULT_TTL = int(os.getenv("ANALYSIS_JOB_RESULT_TTL", "3600"))
+# 실행 중 작업의 임대 시간(초): 실행하는 프로세스가 주기적으로 갱신하고, 갱신이 끊긴 작업만 다른 워커가 다시 가져감
+ANALYSIS_JOB_LEASE = float(os.getenv("ANALYSIS_JOB_LEASE", "60"))
+# 쉬는 워커가 다른 프로세스에서 들어온 작업을 확인하는 간격(초)
+ANALYSIS_JOB_POLL_INTERVAL = float(os.getenv("ANALYSIS_JOB_POLL_INTERVAL", "1.0"))
+
+# LLM 모델 체인: 쉼표로 구분, 앞 모델이 실패하거나 차단(circuit open)되면 다음 모델 사용
+LLM_MODELS = os.getenv("LLM_MODELS", "models/gemini-1.5-pro-latest")
+LLM_ANALYZE_MODELS = os.getenv("LLM_ANALYZE_MODELS", "models/gemini-2.0-pro-exp,models/gemini-1.5-pro-latest")
+# 호출 한 번의 전체 제한 시간 / 시도 한 번의 제한 시간 (초)
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "90"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "45"))
+# 재시도 가능한 오류(429/5xx/시간 초과)일 때 모델별 재시도 횟수와 백오프(초, full jitter)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", "0.5"))
+LLM_RETRY_MAX = float(os.getenv("LLM_RETRY_MAX", "4"))
+# 헤지 요청: 첫 응답이 이 시간(초) 안에 오지 않으면 같은 요청을 하나 더 보냄 (0 이면 사용 안 함)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+# 서킷 브레이커: 모델별 연속 실패가 이 횟수에 이르면 COOLDOWN(초) 동안 해당 모델 호출을 건너뜀
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# 격식 전환(반말 <-> 존댓말) 로컬 빠른 경로: 사용 여부 / 규칙 변환 결과를 그대로 쓸 최소 신뢰도
+FORMALITY_FAST_PATH = os.getenv("FORMALITY_FAST_PATH", "true").lower() in ("1", "true", "yes")
+FORMALITY_MIN_CONFIDENCE = float(os.getenv("FORMALITY_MIN_CONFIDENCE", "0.85"))
+
+# Flutter 웹 빌드 제공 (비어 있으면 사용 안 함, 예: "tone_web/build/web")
+WEB_APP_DIR = os.getenv("WEB_APP_DIR", "")
+WEB_APP_PATH = os.getenv("WEB_APP_PATH", "/web")
+# 미리 만든 gzip/brotli 압축본과 base href 를 바꾼 index.html 저장 위치
+WEB_APP_CACHE_DIR = os.getenv("WEB_APP_CACHE_DIR", "app/output/_web")
+
+# 사용자별 요청 한도 (토큰 버킷: 분당 충전 수 / 최대 누적 수, 0 이면 제한 없음)
+ANALYZE_RATE_PER_MINUTE = float(os.getenv("ANALYZE_RATE_PER_MINUTE", "6"))
+ANALYZE_BURST = int(os.getenv("ANALYZE_BURST", "3"))
+CONVERT_RATE_PER_MINUTE = float(os.getenv("CONVERT_RATE_PER_MINUTE", "60"))
+CONVERT_BURST = int(os.getenv("CONVERT_BURST", "20"))
+# LLM_MAX_CONCURRENCY 가 찼을 때의 대기열: 전체/사용자별 상한, 사용자 가중치 ("user_a:2,user_b:0.5")
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "200"))
+LLM_QUEUE_MAX_PER_USER = int(os.getenv("LLM_QUEUE_MAX_PER_USER", "20"))
+LLM_USER_WEIGHTS = os.getenv("LLM_USER_WEIGHTS", "")
+
+# 증분 분석 (POST /analyze?incremental=true): 마지막 저장 프로필 + 새 줄만 보내 프로필을 고침
+# 증분 갱신이 이 횟수만큼 쌓였거나 마지막 전체 분석 후 이 시간(초)이 지났으면 전체 재분석 (누적 오차 방지)
+INCREMENTAL_FULL_EVERY = int(os.getenv("INCREMENTAL_FULL_EVERY", "5"))
+INCREMENTAL_FULL_MAX_AGE = int(os.getenv("INCREMENTAL_FULL_MAX_AGE", str(7 * 86400)))
+# 새 줄이 이보다 많으면 증분보다 전체 분석이 나음 / 이어진 위치를 찾을 때 비교하는 마지막 줄 수
+INCREMENTAL_MAX_NEW_LINES = int(os.getenv("INCREMENTAL_MAX_NEW_LINES", "100"))
+INCREMENTAL_ANCHOR_LINES = int(os.getenv("INCREMENTAL_ANCHOR_LINES", "8"))
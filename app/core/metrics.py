@@ -0,0 +1,218 @@
+# app/core/metrics.py
+# Prometheus 텍스트 형식 메트릭 (외부 라이브러리 없이 최소 구현)
+# - Counter / Gauge / Histogram, 라벨별 값은 dict 에 보관
+# - 요청마다 로그를 찍는 대신 숫자만 올리므로 오버헤드가 작음
+import bisect
+import threading
+import time
+from functools import wraps
+from typing import Callable, Iterable
+
+# 기본 지연 버킷(초): 파일 I/O(ms 이하) ~ LLM 호출(수십 초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> [버킷별 개수..., 합계, 전체 개수]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, *labels) -> int:
+        state = self._values.get(labels)
+        return int(state[-1]) if state else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        lines = self.header()
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {int(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {int(state[-1])}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        # 수집 시점에 값을 채우는 콜백 (캐시 통계 등)
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# HTTP
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency including response body", ("method", "route", "status")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",)))
+
+# LLM
+llm_call_duration = registry.register(Histogram(
+    "llm_call_duration_seconds", "Gemini call latency by call site", ("call_site", "model", "outcome")))
+llm_prompt_chars = registry.register(Histogram(
+    "llm_prompt_chars", "Prompt size in characters by call site", ("call_site",), buckets=SIZE_BUCKETS))
+llm_response_chars = registry.register(Histogram(
+    "llm_response_chars", "Response size in characters by call site", ("call_site",), buckets=SIZE_BUCKETS))
+llm_calls_in_flight = registry.register(Gauge(
+    "llm_calls_in_flight", "Gemini calls currently in flight", ("call_site",)))
+
+llm_retries_total = registry.register(Counter(
+    "llm_retries_total", "Gemini call retries after a retryable error", ("call_site", "model")))
+llm_timeouts_total = registry.register(Counter(
+    "llm_timeouts_total", "Gemini attempts that hit their timeout", ("call_site", "model")))
+llm_hedges_total = registry.register(Counter(
+    "llm_hedges_total", "Hedged second requests (launched / won)", ("call_site", "outcome")))
+llm_fallbacks_total = registry.register(Counter(
+    "llm_fallbacks_total", "Calls that moved on to the next model in the chain", ("call_site", "from_model")))
+llm_breaker_rejections_total = registry.register(Counter(
+    "llm_breaker_rejections_total", "Calls skipped because the model circuit was open", ("model",)))
+llm_breaker_state = registry.register(Gauge(
+    "llm_breaker_state", "Circuit breaker state per model (0 closed, 1 open, 2 half-open)", ("model",)))
+
+# 파일 I/O
+file_io_duration = registry.register(Histogram(
+    "file_io_duration_seconds", "Storage/preset/history service call latency", ("service", "op", "outcome")))
+
+def observe_io(service: str, op: str | None = None):
+    ##서비스 함수의 실행 시간을 file_io_duration 에 기록하는 데코레이터##
+    def decorator(fn):
+        name = op or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "ok"
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                file_io_duration.observe(service, name, outcome, value=time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    ##요청 지연/상태/동시 처리 수를 기록하는 ASGI 미들웨어 (스트리밍 본문이 끝날 때까지 측정)##
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method)
+            # 라우트 템플릿(/presets/{user_id})을 라벨로 써서 경로 값마다 시계열이 생기지 않게 함
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            labels = (method, route_path, str(status[0]))
+            http_requests_total.inc(*labels)
+            http_request_duration.observe(*labels, value=time.perf_counter() - started)
@@ -0,0 +1,117 @@
+# core/serialization.py
+# JSON 직렬화 공용 모듈 (프로필/프리셋/히스토리 저장과 API 응답)
+# - 모델 <-> JSON: pydantic v2 네이티브 경로 (model_dump_json / model_validate_json, dict 를 거치지 않음)
+# - 그 밖의 dict/list: orjson (없으면 표준 json, 만들어지는 바이트는 같음)
+# - 저장 형식: 들여쓰기/공백 없는 UTF-8 JSON (한글을 \uXXXX 로 바꾸지 않음)
+#   예전 indent=2 파일도 그대로 읽고, 다시 쓸 때 새 형식이 됨
+# - 내용 해시: 모델 내용의 정규 해시 하나(model_hash)를 캐시 키/변경 확인에 공통으로 사용
+# - 검증된 파일 바로 응답: 한 번 모델 검증을 통과했고 저장 형식 그대로인 파일은
+#   (inode, mtime, 크기) 가 같은 동안 모델로 되돌리지 않고 읽은 바이트를 그대로 응답 본문으로 씀
+#
+# 마이크로 벤치마크: python -m benchmarks.bench_serialization
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, TypeVar
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.utils.files import atomic_write_bytes
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 같은 형식을 만듦 (느릴 뿐 동작은 같음)
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+# 검증을 통과한 파일 버전 (경로, inode, mtime_ns, 크기) 보관 수
+VERIFIED_CACHE_SIZE = 4096
+
+def dumps(data: Any) -> bytes:
+    ##dict/list 등을 저장 형식(공백 없는 UTF-8 JSON) 바이트로##
+    if orjson is not None:
+        # 표준 json 처럼 숫자 등 문자열이 아닌 키도 허용
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def model_to_json(model: BaseModel) -> bytes:
+    ##모델을 저장 형식 바이트로 (pydantic-core 가 바로 bytes 를 만듦, dumps(model.model_dump()) 와 같은 결과)##
+    return model.__pydantic_serializer__.to_json(model)
+
+def model_from_json(model_type: type[M], data: bytes | str) -> M:
+    ##JSON 을 파싱과 검증 한 번에 모델로 (json.loads 후 Model(**data) 보다 빠름)##
+    return model_type.model_validate_json(data)
+
+def model_hash(model: BaseModel) -> str:
+    ##모델 내용의 sha256 hex (키 정렬 JSON 기준이라 필드 순서와 무관, 프로세스/재시작 사이에도 같음)##
+    payload = json.dumps(model.model_dump(mode="json"), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def read_model(path: Path, model_type: type[M]) -> M:
+    with open(path, "rb") as f:
+        return model_from_json(model_type, f.read())
+
+def write_model(path: Path, model: BaseModel):
+    ##원자적 교체로 저장 (새 inode 라 조건부 GET 검증자도 바뀜)##
+    atomic_write_bytes(path, model_to_json(model))
+
+class VerifiedFiles:
+    ##검증을 통과했고 저장 형식 그대로인 파일 버전 목록 (프로세스 내, LRU)##
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, path: Path, model_type: type[BaseModel]) -> bytes:
+        ##파일 내용을 model_type 으로 검증된 저장 형식 바이트로 반환, 이미 확인한 버전이면 검증 생략##
+        # stat 과 읽기를 같은 fd 로 해서 그 사이 파일이 교체돼도 다른 버전을 확인된 것으로 기록하지 않음
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        key = (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        canonical = model_to_json(model_from_json(model_type, data))
+        if canonical != data:
+            # 예전 형식(들여쓰기)이거나 모델에 없는 필드가 있는 파일: 검증한 결과로 응답하고 기록하지 않음
+            return canonical
+        with self._lock:
+            self._entries[key] = None
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return data
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+verified_files = VerifiedFiles(VERIFIED_CACHE_SIZE)
+
+class FastJSONResponse(JSONResponse):
+    ##orjson 으로 렌더링하는 JSON 응답, 이미 직렬화된 bytes 는 그대로 본문으로 씀##
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        if isinstance(content, BaseModel):
+            return model_to_json(content)
+        return dumps(content)
+
+def json_bytes_response(data: bytes, response: Response | None = None) -> FastJSONResponse:
+    ##직렬화된 JSON 을 그대로 응답, 의존성으로 받은 response 에 넣어 둔 헤더(ETag 등)는 옮김##
+    ##(라우트가 Response 를 직접 반환하면 FastAPI 가 response_model 직렬화와 헤더 병합을 건너뜀)##
+    return FastJSONResponse(data, headers=dict(response.headers) if response is not None else None)
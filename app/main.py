@@ -1,15 +1,26 @@
 # main.py (FastAPI entrypoint)
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from app.core.config import GEMINI_API_KEY
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.logging_config import setup_logger
+from app.core.metrics import registry, MetricsMiddleware, Gauge
+from app.core.serialization import FastJSONResponse, verified_files
+from app.services.cache import conversion_cache
+from app.services.preset import preset_cache, pack_cache
+from app.services.analysis_cache import analysis_cache
+from app.services.jobs import job_queue
+from app.services.llm import LLMUnavailableError, LLMBusyError, prewarm as prewarm_llm
+from app.services.admission import RateLimitedError
+from app.services.webapp import web_build
+from app.core.config import WEB_APP_DIR
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
+import asyncio
 import logging
 import sys
 
 # API 라우터들
-from app.api import analyze, storage, convert, preset, history ,user
+from app.api import analyze, storage, convert, preset, history ,user, webapp
 
 # 전역 경로 기준 설정
 BASE_DIR = Path(__file__).resolve().parent
@@ -17,22 +28,28 @@ BASE_DIR = Path(__file__).resolve().parent
 # 로깅 설정 (모듈화된 로거 사용)
 logger = setup_logger("app")
 
-app = FastAPI(title="Tone Analyzer API", version="1.0.0")
+# 응답 JSON 은 orjson 으로 렌더링 (core/serialization.py)
+app = FastAPI(title="Tone Analyzer API", version="1.0.0", default_response_class=FastJSONResponse)
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Application startup")
+    # 이전 실행에서 남은 분석 작업을 복구하고 워커 시작
+    await job_queue.start()
+    # Gemini SDK 는 import 비용이 커서 첫 사용 시 로드 (LLM_PREWARM 설정에 따라 미리 준비)
+    await prewarm_llm()
+    if WEB_APP_DIR:
+        # 파일 목록/빌드 ID 는 바로 준비, 압축본 생성은 오래 걸릴 수 있어 백그라운드 (끝나기 전엔 원본 제공)
+        await run_in_threadpool(web_build.scan)
+        asyncio.get_running_loop().run_in_executor(None, web_build.precompress)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutdown")
+    await job_queue.stop()
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Request: {request.method} {request.url}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code}")
-    return response
+# 요청마다 로그 두 줄을 남기는 대신 /metrics 로 지연/상태 분포를 집계
+app.add_middleware(MetricsMiddleware)
 
 # CORS 설정
 origins = [
@@ -58,6 +75,9 @@ app.include_router(convert.router)
 app.include_router(preset.router)
 app.include_router(history.router)
 app.include_router(user.router)
+# 웹 앱을 같은 출처에서 제공 (CORS preflight 없음)
+if WEB_APP_DIR:
+    app.include_router(webapp.router)
 
 @app.get("/")
 async def root():
@@ -67,6 +87,47 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# 캐시 적중률 확인용
+def _cache_stats() -> dict:
+    return {
+        "conversion": conversion_cache.stats(),
+        "preset": preset_cache.stats(),
+        "preset_pack": pack_cache.stats(),
+        "analysis": analysis_cache.stats(),
+        "verified_files": verified_files.stats(),
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return _cache_stats()
+
+# 캐시 통계도 스크레이프 시점에 게이지로 내보냄
+cache_stats_gauge = registry.register(Gauge("app_cache_stats", "Cache size/hit statistics", ("cache", "stat")))
+
+def _collect_cache_stats():
+    for name, stats in _cache_stats().items():
+        for stat, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cache_stats_gauge.set(name, stat, value=value)
+
+registry.add_collector(_collect_cache_stats)
+
+# Prometheus 스크레이프용
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# 재시도/폴백을 모두 거친 LLM 장애는 잠시 후 다시 시도하라는 503 으로 응답
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+# 사용자별 요청 한도 초과 / LLM 대기열 가득 참: 잠시 후 다시 시도하도록 429
+@app.exception_handler(RateLimitedError)
+@app.exception_handler(LLMBusyError)
+async def too_many_requests_handler(request: Request, exc: RateLimitedError | LLMBusyError):
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global error: {str(exc)}", exc_info=True)
@@ -1,6 +1,6 @@
 # schemas/__init__.py
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 # 분석 요청: 사용자가 대화를 분석 요청할 때 사용하는 형식
 class AnalyzeRequest(BaseModel):
@@ -52,8 +52,38 @@ class ConvertWithAutoPresetRequest(BaseModel):
 # 변환 응답: 변환된 문장 반환
 class ConvertResponse(BaseModel):
     converted_text: str = Field(..., description="변환된 최종 문장")
+    cached: bool = Field(False, description="변환 캐시 적중 여부")
 
 # 자동 추천 변환 응답: 변환 결과 + 선택된 프리셋 이름 포함
 class ConvertWithAutoPresetResponse(BaseModel):
     converted_text: str = Field(..., description="변환된 최종 문장")
     selected_preset: str = Field(..., description="자동 추천된 프리셋 이름")
+    cached: bool = Field(False, description="변환 캐시 적중 여부")
+
+# 배치 변환 요청: 여러 문장을 하나의 목표(톤 이름 / 프로필 / 프리셋) 중 하나로 변환
+class ConvertBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, description="변환할 문장 목록")
+    target_tone: Optional[str] = Field(None, description="원하는 말투 스타일 (톤 이름 방식)")
+    tone_profile: Optional[ToneProfile] = Field(None, description="말투 프로필 전체 (프로필 방식)")
+    preset_name: Optional[str] = Field(None, description="사용할 프리셋 이름 (프리셋 방식)")
+    user_id: Optional[str] = Field(None, description="프리셋 소유 사용자 ID (프리셋 방식일 때 필수)")
+
+# 배치 변환 응답: 입력 순서대로 변환된 문장 목록
+class ConvertBatchResponse(BaseModel):
+    converted_texts: List[str] = Field(..., description="입력 순서와 같은 변환 결과 목록")
+    cached_count: int = Field(0, description="캐시에서 바로 가져온 문장 수")
+    llm_calls: int = Field(0, description="이번 요청에 사용된 LLM 호출 수")
+
+# 분석 작업 상태: queued / running / done / failed, 완료되면 result 에 프로필
+class AnalyzeJobStatus(BaseModel):
+    job_id: str = Field(..., description="작업 ID")
+    status: str = Field(..., description="작업 상태: queued / running / done / failed")
+    result: Optional[ToneProfile] = Field(None, description="분석 결과 (done 일 때)")
+    error: Optional[str] = Field(None, description="실패 사유 (failed 일 때)")
+
+# 프리셋 일괄 조회 응답: 이름순 프로필 목록 (fields 를 지정하면 해당 필드 + name 만)
+class PresetPage(BaseModel):
+    total: int = Field(..., description="전체 프리셋 수")
+    offset: int = Field(0, description="건너뛴 프리셋 수")
+    limit: Optional[int] = Field(None, description="최대 항목 수 (없으면 전체)")
+    items: List[dict] = Field(..., description="프리셋 프로필 목록")
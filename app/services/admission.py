@@ -0,0 +1,192 @@
+# services/admission.py
+# 사용자별 유입 제어 (Gemini 앞단)
+# - 요청 단계: 사용자(user_id, 없으면 클라이언트 IP)별 토큰 버킷을 분석/변환 따로 두고, 비면 RateLimitedError (429)
+# - 호출 단계: 프로세스 전체 동시 LLM 호출을 LLM_MAX_CONCURRENCY 로 제한하고, 다 찼으면 사용자별 가중 공정 큐로 대기
+#   (한 사용자가 요청을 많이 쌓아도 다른 사용자 요청이 사이사이 먼저 나감)
+# - 대기열이 전체/사용자별 상한을 넘으면 LLMBusyError (429 + Retry-After)
+# - 대기 시간은 llm_queue_wait_seconds 로, LLM 호출 시간(llm_call_duration_seconds)과 따로 기록
+#
+# 현재 사용자는 컨텍스트 변수로 전달: API 에서 admit() 로 설정하면 같은 요청 안의 LLM 호출이 그 사용자로 줄을 섬
+# (스케줄러 인스턴스는 llm.py 의 llm_scheduler)
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import Counter as Tally, OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from app.core.config import (
+    ANALYZE_RATE_PER_MINUTE,
+    ANALYZE_BURST,
+    CONVERT_RATE_PER_MINUTE,
+    CONVERT_BURST,
+)
+from app.core.metrics import registry, Counter, Gauge, Histogram
+
+current_user: ContextVar[str | None] = ContextVar("current_user", default=None)
+
+admission_rejections_total = registry.register(Counter(
+    "admission_rejections_total", "Requests rejected by per-user rate limits or LLM backlog", ("kind", "reason")))
+llm_queue_wait = registry.register(Histogram(
+    "llm_queue_wait_seconds", "Time spent waiting for an LLM concurrency slot", ("call_site",)))
+llm_queue_depth = registry.register(Gauge("llm_queue_depth", "LLM calls waiting for a concurrency slot"))
+
+class RateLimitedError(Exception):
+    ##사용자별 요청 한도 초과 (API 에서 429 + Retry-After)##
+    def __init__(self, kind: str, retry_after: int):
+        super().__init__("요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+        self.kind = kind
+        self.retry_after = retry_after
+
+def parse_weights(value: str) -> dict[str, float]:
+    weights = {}
+    for item in value.split(","):
+        user_id, _, weight = item.strip().rpartition(":")
+        if user_id and weight:
+            weights[user_id] = float(weight)
+    return weights
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        ##토큰 하나를 쓰고 0 반환, 없으면 다음 토큰까지 남은 초 반환##
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class RateLimiter:
+    ##(종류, 사용자) -> TokenBucket, 오래 안 쓴 버킷부터 정리 (가득 찬 버킷과 같으므로 잃는 정보 없음)##
+    def __init__(self, limits: dict[str, tuple[float, int]], max_buckets: int = 10000):
+        self.limits = limits
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, kind: str, key: str):
+        rate_per_minute, burst = self.limits.get(kind, (0, 0))
+        if rate_per_minute <= 0 or burst <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get((kind, key))
+            if bucket is None:
+                bucket = self._buckets[(kind, key)] = TokenBucket(rate_per_minute / 60, burst)
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end((kind, key))
+            wait = bucket.take()
+        if wait > 0:
+            admission_rejections_total.inc(kind, "rate")
+            raise RateLimitedError(kind, max(1, math.ceil(wait)))
+
+class FairScheduler:
+    ##동시 실행 capacity 개, 넘치면 사용자별 가중 공정 큐 (가상 종료 시각이 가장 이른 요청부터)##
+    ##대기열이 가득 차면 busy_error(message, retry_after=...) 를 던짐##
+    def __init__(self, capacity: int, max_queued: int, max_per_user: int, weights: dict[str, float] | None = None,
+                 busy_error: type[Exception] = RuntimeError):
+        self.capacity = capacity
+        self.busy_error = busy_error
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.weights = weights or {}
+        self.active = 0
+        self._heap: list[tuple[float, int, float, asyncio.Future]] = []
+        self._waiting = 0
+        self._queued_per_user: Tally[str] = Tally()
+        self._finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        # 한 번 호출에 슬롯을 잡고 있는 평균 시간 (Retry-After 추정용)
+        self._hold_seconds = 1.0
+
+    def saturated(self) -> bool:
+        return self.active >= self.capacity
+
+    def retry_after(self) -> int:
+        return max(1, min(60, math.ceil(self._hold_seconds * (self._waiting + 1) / max(1, self.capacity))))
+
+    @asynccontextmanager
+    async def slot(self, call_site: str):
+        ##LLM 호출 한 번 동안 슬롯을 잡음##
+        started = time.perf_counter()
+        if self.active < self.capacity and not self._waiting:
+            self.active += 1
+        else:
+            await self._wait(current_user.get() or "anonymous")
+        acquired = time.perf_counter()
+        llm_queue_wait.observe(call_site, value=acquired - started)
+        try:
+            yield
+        finally:
+            self._hold_seconds = 0.9 * self._hold_seconds + 0.1 * (time.perf_counter() - acquired)
+            self._release()
+
+    async def _wait(self, user_id: str):
+        if self._waiting >= self.max_queued or self._queued_per_user[user_id] >= self.max_per_user:
+            admission_rejections_total.inc("llm", "backlog")
+            raise self.busy_error("LLM 대기열이 가득 찼습니다.", retry_after=self.retry_after())
+
+        # 가상 시작 = max(현재 가상 시각, 이 사용자의 직전 종료), 종료 = 시작 + 1/가중치
+        start = max(self._virtual_time, self._finish.get(user_id, 0.0))
+        finish = start + 1.0 / self.weights.get(user_id, 1.0)
+        self._finish[user_id] = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (finish, next(self._seq), start, future))
+        self._waiting += 1
+        self._queued_per_user[user_id] += 1
+        llm_queue_depth.set(value=self._waiting)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨: 다음 대기자에게 넘김
+                self._release()
+            else:
+                future.cancel()
+                self._waiting -= 1
+                llm_queue_depth.set(value=self._waiting)
+            raise
+        finally:
+            self._queued_per_user[user_id] -= 1
+            if not self._queued_per_user[user_id]:
+                del self._queued_per_user[user_id]
+
+    def _release(self):
+        ##슬롯 반환: 대기자가 있으면 가상 종료 시각이 가장 이른 대기자에게 바로 넘김##
+        while self._heap:
+            _, _, start, future = heapq.heappop(self._heap)
+            if future.done():
+                # 취소된 대기자 (대기 수는 취소할 때 이미 뺌)
+                continue
+            self._waiting -= 1
+            llm_queue_depth.set(value=self._waiting)
+            if future.get_loop().is_closed():
+                continue
+            self._virtual_time = start
+            future.set_result(None)
+            return
+        self.active -= 1
+        self._waiting = 0
+        # 대기열이 비면 가상 시각을 초기화 (쉬던 사용자가 몰아서 쓰지 않도록 이전 몫은 이월하지 않음)
+        self._finish.clear()
+        self._virtual_time = 0.0
+
+rate_limiter = RateLimiter({
+    "analyze": (ANALYZE_RATE_PER_MINUTE, ANALYZE_BURST),
+    "convert": (CONVERT_RATE_PER_MINUTE, CONVERT_BURST),
+})
+
+def admit(kind: str, key: str):
+    ##요청 한도를 확인하고, 이 요청에서 나가는 LLM 호출을 key 사용자로 줄 세움##
+    rate_limiter.check(kind, key)
+    current_user.set(key)
@@ -0,0 +1,90 @@
+# services/analysis_cache.py
+# analyze_tone 결과 캐시 (내용 해시 기반) + single-flight
+# - 키: cut_dialogue_by_date 결과(잘라낸 대화)의 SHA-256
+# - 같은 키로 동시에 들어온 요청은 진행 중인 Gemini 호출 하나를 함께 기다림
+# - 완료된 결과는 ANALYSIS_CACHE_TTL 동안 재사용
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from app.schemas import ToneProfile
+from app.core.config import ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_SIZE
+
+# get_or_compute 가 돌려주는 상태값
+HIT = "hit"          # 완료된 캐시에서 반환
+SHARED = "shared"    # 진행 중인 다른 요청의 결과를 함께 사용
+MISS = "miss"        # 새로 분석
+
+class AnalysisCache:
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, ToneProfile]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(dialogue: list[str]) -> str:
+        digest = hashlib.sha256()
+        for line in dialogue:
+            digest.update(line.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> ToneProfile | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, profile: ToneProfile):
+        self._entries[key] = (time.time() + self.ttl, profile)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[ToneProfile]]) -> tuple[ToneProfile, str]:
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, HIT
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            # 한 클라이언트가 끊겨도 공유 중인 호출은 취소되지 않도록 shield
+            return await asyncio.shield(task), SHARED
+
+        self.misses += 1
+
+        async def run() -> ToneProfile:
+            profile = await compute()
+            self.set(key, profile)
+            return profile
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 첫 요청자가 취소돼도 호출은 끝까지 진행되고 결과는 캐시에 남음
+        return await asyncio.shield(task), MISS
+
+    def stats(self) -> dict:
+        total = self.hits + self.shared + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.shared) / total if total else 0.0,
+        }
+
+analysis_cache = AnalysisCache(ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_SIZE)
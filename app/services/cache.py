@@ -0,0 +1,130 @@
+# services/cache.py
+# 변환 결과 캐시: (정규화된 입력 문장 + 목표 말투/프로필 해시) -> 변환된 문장
+# - 메모리 계층: LRU + TTL
+# - 디스크 계층(선택): SQLite 파일, 재시작 후에도 유지
+# - 태그 단위 무효화: 프리셋이 다시 저장되면 해당 프리셋으로 만든 항목 삭제
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from app.schemas import ToneProfile
+from app.core.config import CONVERT_CACHE_SIZE, CONVERT_CACHE_TTL, CONVERT_CACHE_PATH
+from app.core.logging_config import setup_logger
+from app.core.serialization import model_hash
+
+cache_logger = setup_logger("cache")
+
+def normalize_text(text: str) -> str:
+    ##유니코드 정규화 + 공백 정리##
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def tone_key(target_tone: str) -> str:
+    return f"tone:{normalize_text(target_tone)}"
+
+def profile_key(profile: ToneProfile) -> str:
+    return "profile:" + model_hash(profile)
+
+def preset_tag(user_id: str, preset_name: str) -> str:
+    return f"preset:{user_id}/{preset_name}"
+
+class ConversionCache:
+    def __init__(self, max_size: int, ttl: float, path: str | Path | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, tag)
+        self._entries: OrderedDict[str, tuple[float, str, str | None]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._open_disk(Path(path))
+
+    def _open_disk(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, tag TEXT, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries(tag)")
+        self._db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+
+    @staticmethod
+    def make_key(text: str, target: str) -> str:
+        raw = f"{normalize_text(text)}\x00{target}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, tag, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[2] >= now:
+                    self._remember(key, row[0], row[1], row[2])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str, tag: str | None = None):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, tag, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, tag, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, value, tag, expires_at),
+                )
+
+    def _remember(self, key: str, value: str, tag: str | None, expires_at: float):
+        self._entries[key] = (expires_at, value, tag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_tag(self, tag: str):
+        ##태그가 붙은 항목을 메모리/디스크에서 모두 삭제##
+        with self._lock:
+            stale = [key for key, (_, _, entry_tag) in self._entries.items() if entry_tag == tag]
+            for key in stale:
+                del self._entries[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+        if stale:
+            cache_logger.debug(f"Invalidated {len(stale)} cached conversions for {tag}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "disk": self._db is not None,
+            }
+
+conversion_cache = ConversionCache(CONVERT_CACHE_SIZE, CONVERT_CACHE_TTL, CONVERT_CACHE_PATH or None)
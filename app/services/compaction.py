@@ -0,0 +1,127 @@
+# services/compaction.py
+# 분석 프롬프트용 대화 압축 (cut_dialogue_by_date 와 analyze_tone 사이 단계)
+# - 시스템 메시지/첨부 알림 줄 제거, 시간 표기 제거
+# - ㅋㅋㅋㅋㅋ, !!!!!, 이모지 연속 같은 반복을 짧게 줄임
+# - 같거나 거의 같은 줄은 한 번만 남김
+# - 줄마다 말투 정보량/토큰 비율로 점수를 매겨 토큰 예산 안에서 고른 뒤 원래 순서로 반환
+import math
+import re
+from app.core.config import ANALYZE_TOKEN_BUDGET, ANALYZE_LINE_MAX_TOKENS
+from app.core.metrics import registry, Histogram, SIZE_BUCKETS
+from app.services.preset_match import MARKER_RULES, EMOJI_PATTERN
+from app.utils.dialogue import date_pattern
+
+# 카카오톡 내보내기의 시스템 줄 / 말투와 무관한 첨부 알림
+SYSTEM_LINE = re.compile("|".join([
+    r"님과 카카오톡 대화$",
+    r"^저장한 날짜\s*:",
+    r"님이 (들어왔습니다|나갔습니다|퇴장했습니다)\.?$",
+    r"님을 초대(했습니다|하였습니다)\.?$",
+    r"^(사진|동영상|이모티콘|음성메시지|파일)(\s*\d+장)?$",
+    r"^(삭제된 메시지입니다|메시지가 삭제되었습니다)\.?$",
+    r"^(사진|동영상|파일)\s*:",
+]))
+# 메시지 앞의 시간 표기
+#   PC:     [이름] [오후 3:12] 메시지
+#   모바일: 2024. 4. 10. 오후 3:12, 이름 : 메시지
+PC_LINE = re.compile(r"^\[([^\]]+)\]\s*\[(?:오전|오후)\s*\d{1,2}:\d{2}\]\s*(.*)$")
+MOBILE_LINE = re.compile(r"^\d{4}\.\s*\d{1,2}\.\s*\d{1,2}\.\s*(?:오전|오후)\s*\d{1,2}:\d{2},\s*(.+?)\s*:\s*(.*)$")
+
+# 같은 글자 4번 이상 반복 -> 3번, 이모지 4개 이상 연속 -> 앞의 3개
+REPEAT_RUN = re.compile(r"(.)\1{3,}")
+EMOJI_RUN = re.compile(f"(?:{EMOJI_PATTERN.pattern}){{4,}}")
+# 중복 판정용 정규화: 공백/문장부호/반복 제거
+DEDUP_STRIP = re.compile(r"[\s.,!?~…'\"()\[\]]+")
+DEDUP_REPEAT = re.compile(r"(.)\1+")
+
+dialogue_tokens = registry.register(Histogram(
+    "analyze_dialogue_tokens", "Estimated dialogue tokens before/after compaction", ("stage",),
+    buckets=SIZE_BUCKETS))
+
+def estimate_tokens(text: str) -> int:
+    ##로컬 토큰 추정: ASCII 는 4글자당 1, 한글 등은 글자당 1 (실제보다 약간 크게 잡음)##
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars) + 1  # 줄바꿈 1
+
+def is_system_line(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or date_pattern.match(stripped):
+        return True
+    return SYSTEM_LINE.search(stripped) is not None
+
+def _strip_timestamp(line: str) -> tuple[str, str]:
+    ##(화자, 메시지) 로 나눔. 형식을 모르면 화자는 빈 문자열##
+    match = PC_LINE.match(line) or MOBILE_LINE.match(line)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return "", line.strip()
+
+def _collapse_runs(text: str) -> str:
+    text = EMOJI_RUN.sub(lambda m: m.group()[:3], text)
+    return REPEAT_RUN.sub(lambda m: m.group(1) * 3, text)
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 긴 문단은 앞부분만 남김 (말투는 문장 몇 개로도 충분히 드러남)
+    cut = text
+    while cut and estimate_tokens(cut + "…") > max_tokens:
+        cut = cut[: max(1, int(len(cut) * 0.8))] if len(cut) > 1 else ""
+    return cut.rstrip() + "…"
+
+def _dedup_key(message: str) -> str:
+    return DEDUP_REPEAT.sub(r"\1", DEDUP_STRIP.sub("", message.lower()))
+
+def _style_score(message: str) -> float:
+    ##말투 표지 개수 + 글자 다양성. 'ㅇㅇ' 같은 줄은 낮고 어미/표지가 많은 줄은 높음##
+    markers = sum(1 for pattern, _ in MARKER_RULES.values() if pattern.search(message))
+    diversity = min(len(set(message.replace(" ", ""))) / 12, 1.0)
+    return markers + diversity + 0.1
+
+def compact_dialogue(
+    dialogue: list[str],
+    token_budget: int = ANALYZE_TOKEN_BUDGET,
+    line_max_tokens: int = ANALYZE_LINE_MAX_TOKENS,
+) -> list[str]:
+    ##토큰 예산 안에서 말투 정보가 많은 줄을 골라 시간순으로 반환##
+    candidates: list[tuple[int, str, float, int]] = []  # (순서, 줄, 점수, 토큰)
+    seen: set[str] = set()
+    raw_tokens = 0
+    for index, line in enumerate(dialogue):
+        raw_tokens += estimate_tokens(line)
+        if is_system_line(line):
+            continue
+        speaker, message = _strip_timestamp(line)
+        if not message or is_system_line(message):
+            continue
+        message = _collapse_runs(message)
+        key = speaker + "\0" + _dedup_key(message)
+        if key in seen:
+            continue
+        seen.add(key)
+        text = _truncate(f"[{speaker}] {message}" if speaker else message, line_max_tokens)
+        tokens = estimate_tokens(text)
+        candidates.append((index, text, _style_score(message), tokens))
+
+    if not candidates:
+        # 모두 걸러졌으면 원래 줄을 그대로 쓰되 예산은 지킴
+        candidates = [
+            (index, text, 1.0, estimate_tokens(text))
+            for index, text in ((i, _truncate(line.strip(), line_max_tokens)) for i, line in enumerate(dialogue))
+            if text.strip("…")
+        ]
+
+    # 토큰당 정보량 순으로 채우고, 같으면 최근 줄을 우선
+    ranked = sorted(candidates, key=lambda c: (c[2] / c[3], c[0]), reverse=True)
+    chosen: list[tuple[int, str]] = []
+    used = 0
+    for index, text, _, tokens in ranked:
+        if used + tokens > token_budget:
+            continue
+        chosen.append((index, text))
+        used += tokens
+
+    chosen.sort()
+    dialogue_tokens.observe("raw", value=raw_tokens)
+    dialogue_tokens.observe("compacted", value=used)
+    return [text for _, text in chosen]
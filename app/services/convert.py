@@ -1,67 +1,101 @@
-import google.generativeai as genai
-from app.core.config import GEMINI_API_KEY
-from app.services.preset import load_preset,list_presets
+import asyncio
+import json
+import re
+from app.core.config import CONVERT_BATCH_MAX_CHARS, CONVERT_BATCH_MAX_ITEMS, PRESET_MATCH_MARGIN, PRESET_MATCH_TOP_K
+from app.core.config import FORMALITY_FAST_PATH, FORMALITY_MIN_CONFIDENCE
+from typing import AsyncIterator
+from app.services.llm import generate_text, stream_text, LLMUnavailableError
+from app.services.cache import conversion_cache, tone_key, profile_key, preset_tag
+from app.services.preset import list_presets,load_preset_entry,render_profile_style
+from app.services.preset_match import rank_presets, is_ambiguous
+from app.services.formality import FormalityTarget, target_from_tone, try_local
 from app.schemas import ConvertRequest, ConvertResponse,ConvertWithProfileRequest,ConvertFromPresetRequest,ConvertWithAutoPresetRequest,ConvertWithAutoPresetResponse
+from app.schemas import ConvertBatchRequest, ConvertBatchResponse
 
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-1.5-pro-latest")
-
-def convert_tone(data: ConvertRequest) -> ConvertResponse:
-    prompt = f"""
-아래 문장을 '{data.target_tone}' 스타일로 자연스럽게 바꿔줘. 존댓말, 반말, 이모지 등도 반영해줘.
+def build_tone_prompt(text: str, target_tone: str) -> str:
+    return f"""
+아래 문장을 '{target_tone}' 스타일로 자연스럽게 바꿔줘. 존댓말, 반말, 이모지 등도 반영해줘.
 설명 없이 바뀐 문장만 출력해줘.
 
 입력 문장:
-{data.text}
+{text}
 """
-    response = model.generate_content(prompt)
-    return ConvertResponse(converted_text=response.text.strip())
 
-def convert_with_tone_profile(data: ConvertWithProfileRequest) -> ConvertResponse:
-    profile = data.tone_profile
-
-    prompt = f"""
+# style: render_profile_style 로 만든 말투 설명 (프리셋은 캐시된 조각을 그대로 사용)
+def build_profile_prompt(text: str, style: str) -> str:
+    return f"""
 다음 문장을 아래의 말투 스타일에 맞게 자연스럽게 변환해줘. 말투 특성(말끝 흐림, 줄임말, 이모지 등)을 반영해서 설명 없이 바뀐 문장만 하나만 출력해줘.
 
 변환할 문장:
-{data.text}
+{text}
 
 목표 말투 스타일:
-- 말투 이름: {profile.name}
-- 전반적 톤: {profile.tone}
-- 감정 경향성: {profile.emotion_tendency}
-- 격식 수준: {profile.formality}
-- 어휘 스타일: {", ".join(profile.vocab_style)}
-- 문장 스타일: {", ".join(profile.sentence_style)}
-- 표현 빈도: {", ".join(profile.expression_freq)}
-- 의도 성향: {", ".join(profile.intent_bias)}
+{style}
 
 """
 
-    response = model.generate_content(prompt)
-    return ConvertResponse(converted_text=response.text.strip())
+# 단순 격식 전환이면 규칙 변환기로 먼저 처리 (신뢰도가 낮으면 None -> LLM)
+# target_tone 변환에만 사용: 프로필/프리셋 변환은 어휘, 문장 스타일, 이모지 등 프로필 특성을 살려야 하므로 항상 LLM
+def _local_conversion(text: str, target: FormalityTarget | None) -> str | None:
+    if not FORMALITY_FAST_PATH:
+        return None
+    return try_local(text, target, FORMALITY_MIN_CONFIDENCE)
+
+async def convert_tone(data: ConvertRequest) -> ConvertResponse:
+    local_text = _local_conversion(data.text, target_from_tone(data.target_tone))
+    if local_text is not None:
+        return ConvertResponse(converted_text=local_text)
+
+    cache_key = conversion_cache.make_key(data.text, tone_key(data.target_tone))
+    cached_text = conversion_cache.get(cache_key)
+    if cached_text is not None:
+        return ConvertResponse(converted_text=cached_text, cached=True)
+
+    prompt = build_tone_prompt(data.text, data.target_tone)
+    converted_text = await generate_text(prompt, call_site="convert_tone")
+    conversion_cache.set(cache_key, converted_text)
+    return ConvertResponse(converted_text=converted_text)
+
+# 말투 설명(style)과 변환 캐시용 프로필 해시로 변환하는 공통 함수
+# cache_tag: 프리셋에서 온 프로필이면 프리셋 재저장 시 캐시가 무효화되도록 태그를 붙임
+async def _convert_with_style(text: str, style: str, profile_hash: str, cache_tag: str | None = None) -> ConvertResponse:
+    cache_key = conversion_cache.make_key(text, profile_hash)
+    cached_text = conversion_cache.get(cache_key)
+    if cached_text is not None:
+        return ConvertResponse(converted_text=cached_text, cached=True)
+
+    prompt = build_profile_prompt(text, style)
+    converted_text = await generate_text(prompt, call_site="convert_with_style")
+    conversion_cache.set(cache_key, converted_text, tag=cache_tag)
+    return ConvertResponse(converted_text=converted_text)
+
+async def convert_with_tone_profile(data: ConvertWithProfileRequest, cache_tag: str | None = None) -> ConvertResponse:
+    profile = data.tone_profile
+    return await _convert_with_style(data.text, render_profile_style(profile), profile_key(profile), cache_tag)
 # 프리셋 이름과 사용자 ID를 받아서 변환 요청을 처리하는 함수
-def convert_from_preset(data: ConvertFromPresetRequest) -> ConvertResponse:
-    profile = load_preset(data.user_id, data.preset_name)
-    request_data = ConvertWithProfileRequest(text=data.text, tone_profile=profile)
-    return convert_with_tone_profile(request_data)
-#AI가 추천하는 프리셋을 사용하여 변환하는 함수
-def choose_best_preset_name(context_lines: list[str], user_id: str) -> str:
-    preset_names = list_presets(user_id)
+async def convert_from_preset(data: ConvertFromPresetRequest) -> ConvertResponse:
+    preset = load_preset_entry(data.user_id, data.preset_name)
+    return await _convert_with_style(data.text, preset.fragment, preset.profile_hash, preset_tag(data.user_id, data.preset_name))
+# 대화 맥락에 가장 어울리는 프리셋 이름을 고르는 함수
+# 로컬 유사도 순위로 먼저 고르고, 상위 후보끼리 점수가 비슷할 때만 그 후보들로 LLM 에 물어봄
+async def choose_best_preset_name(context_lines: list[str], user_id: str) -> str:
+    presets = {name: load_preset_entry(user_id, name) for name in list_presets(user_id)}
+    if not presets:
+        raise FileNotFoundError("프리셋이 존재하지 않습니다.")
+
+    ranked = rank_presets(context_lines, {name: preset.profile for name, preset in presets.items()})
+    if not is_ambiguous(ranked, PRESET_MATCH_MARGIN):
+        return ranked[0][0]
+
+    candidates = [name for name, _ in ranked[:PRESET_MATCH_TOP_K]]
     preset_descriptions = []
 
-    for name in preset_names:
-        profile = load_preset(user_id, name)
+    for name in candidates:
+        preset = presets[name]
         summary = f"""
-- 프리셋 이름: {profile.name}
-- 톤: {profile.tone}
-- 감정: {profile.emotion_tendency}
-- 격식: {profile.formality}
-- 어휘 스타일: {", ".join(profile.vocab_style)}
-- 문장 스타일: {", ".join(profile.sentence_style)}
-- 표현 빈도: {", ".join(profile.expression_freq)}
-- 의도 성향: {", ".join(profile.intent_bias)}
-- 요약: {profile.notes}
+- 프리셋 이름: {name}
+{preset.fragment}
+- 요약: {preset.profile.notes}
 """
         preset_descriptions.append(summary.strip())
 
@@ -78,16 +112,200 @@ def choose_best_preset_name(context_lines: list[str], user_id: str) -> str:
 반환은 **정확히 프리셋 이름만** 첫 줄에 적어주세요.
 """
 
-    response = model.generate_content(prompt)
-    return response.text.strip().splitlines()[0]
+    try:
+        output = await generate_text(prompt, call_site="choose_best_preset_name")
+    except LLMUnavailableError:
+        # 순위 보정용 호출이므로 LLM 장애 시에는 로컬 1순위로 진행
+        return ranked[0][0]
+    lines = output.splitlines()
+    chosen = lines[0].strip().strip("*'\"` ") if lines else ""
+    # 목록에 없는 이름을 돌려주면 로컬 1순위를 사용
+    return chosen if chosen in candidates else ranked[0][0]
 # 프리셋 이름과 사용자 ID를 받아서 자동으로 변환 요청을 처리하는 함수 
-def convert_with_auto_preset(data: ConvertWithAutoPresetRequest) -> ConvertWithAutoPresetResponse:
-    preset_name = choose_best_preset_name(data.dialogue_context, data.user_id)
-    tone_profile = load_preset(data.user_id, preset_name)
-    request_data = ConvertWithProfileRequest(text=data.text, tone_profile=tone_profile)
-    result = convert_with_tone_profile(request_data)
+async def convert_with_auto_preset(data: ConvertWithAutoPresetRequest) -> ConvertWithAutoPresetResponse:
+    preset_name = await choose_best_preset_name(data.dialogue_context, data.user_id)
+    preset = load_preset_entry(data.user_id, preset_name)
+    result = await _convert_with_style(data.text, preset.fragment, preset.profile_hash, preset_tag(data.user_id, preset_name))
 
     return ConvertWithAutoPresetResponse(
         converted_text=result.converted_text,
-        selected_preset=preset_name
-    )
\ No newline at end of file
+        selected_preset=preset_name,
+        cached=result.cached
+    )
+
+# 여러 문장을 한 번의 LLM 호출로 변환하는 배치 함수
+# - 캐시에 있는 문장은 바로 사용하고, 나머지는 프롬프트 길이 한도 안에서 묶어서 요청
+# - 응답은 번호별 JSON 객체로 받아 순서를 복원, 파싱에 실패한 문장만 단건 호출로 재시도
+async def convert_batch(data: ConvertBatchRequest) -> ConvertBatchResponse:
+    targets = [data.target_tone, data.tone_profile, data.preset_name]
+    if sum(target is not None for target in targets) != 1:
+        raise ValueError("target_tone, tone_profile, preset_name 중 하나만 지정해야 합니다.")
+
+    profile = data.tone_profile
+    cache_tag = None
+    if data.preset_name is not None:
+        if not data.user_id:
+            raise ValueError("preset_name 을 사용할 때는 user_id 가 필요합니다.")
+        preset = load_preset_entry(data.user_id, data.preset_name)
+        profile, fragment, cache_target = preset.profile, preset.fragment, preset.profile_hash
+        cache_tag = preset_tag(data.user_id, data.preset_name)
+    elif profile is not None:
+        fragment, cache_target = render_profile_style(profile), profile_key(profile)
+
+    if profile is not None:
+        style = f"아래의 말투 스타일에 맞게 자연스럽게 변환해줘. 말투 특성(말끝 흐림, 줄임말, 이모지 등)을 반영해줘.\n\n목표 말투 스타일:\n{fragment}"
+    else:
+        cache_target = tone_key(data.target_tone)
+        style = f"'{data.target_tone}' 스타일로 자연스럽게 바꿔줘. 존댓말, 반말, 이모지 등도 반영해줘."
+
+    target = None if profile is not None else target_from_tone(data.target_tone)
+    results: list[str | None] = [None] * len(data.texts)
+    pending: dict[str, list[int]] = {}  # 캐시 키 -> 해당 문장의 위치들 (같은 문장은 한 번만 요청)
+    cached_count = 0
+    for i, text in enumerate(data.texts):
+        local_text = _local_conversion(text, target)
+        if local_text is not None:
+            results[i] = local_text
+            continue
+        cache_key = conversion_cache.make_key(text, cache_target)
+        cached_text = conversion_cache.get(cache_key)
+        if cached_text is not None:
+            results[i] = cached_text
+            cached_count += 1
+        else:
+            pending.setdefault(cache_key, []).append(i)
+
+    items = [(cache_key, data.texts[positions[0]]) for cache_key, positions in pending.items()]
+    chunks = _pack_batch(items, len(style))
+    outputs = await asyncio.gather(*(_convert_chunk(style, chunk) for chunk in chunks))
+
+    fallback: list[tuple[str, str]] = []
+    for chunk, converted in zip(chunks, outputs):
+        for n, (cache_key, text) in enumerate(chunk, start=1):
+            value = converted.get(str(n))
+            if isinstance(value, str) and value.strip():
+                conversion_cache.set(cache_key, value.strip(), tag=cache_tag)
+                for i in pending[cache_key]:
+                    results[i] = value.strip()
+            else:
+                fallback.append((cache_key, text))
+
+    # 파싱 실패 문장만 단건 변환으로 처리 (단건 함수가 캐시에 저장함)
+    if fallback:
+        if profile is not None:
+            singles = [_convert_with_style(text, fragment, cache_target, cache_tag) for _, text in fallback]
+        else:
+            singles = [
+                convert_tone(ConvertRequest(text=text, target_tone=data.target_tone))
+                for _, text in fallback
+            ]
+        for (cache_key, _), response in zip(fallback, await asyncio.gather(*singles)):
+            for i in pending[cache_key]:
+                results[i] = response.converted_text
+
+    return ConvertBatchResponse(
+        converted_texts=results,
+        cached_count=cached_count,
+        llm_calls=len(chunks) + len(fallback),
+    )
+
+# (캐시 키, 문장) 목록을 프롬프트 길이/개수 한도에 맞게 나눔
+def _pack_batch(items: list[tuple[str, str]], header_chars: int) -> list[list[tuple[str, str]]]:
+    chunks: list[list[tuple[str, str]]] = []
+    current: list[tuple[str, str]] = []
+    current_chars = header_chars
+    for item in items:
+        item_chars = len(item[1]) + 16  # 번호, 따옴표 등 여유분
+        if current and (current_chars + item_chars > CONVERT_BATCH_MAX_CHARS or len(current) >= CONVERT_BATCH_MAX_ITEMS):
+            chunks.append(current)
+            current = []
+            current_chars = header_chars
+        current.append(item)
+        current_chars += item_chars
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def _convert_chunk(style: str, chunk: list[tuple[str, str]]) -> dict:
+    numbered = {str(n): text for n, (_, text) in enumerate(chunk, start=1)}
+    prompt = f"""
+다음 번호가 붙은 문장들을 각각 {style}
+
+설명 없이 JSON 객체만 출력해줘. 키는 입력과 같은 번호, 값은 바뀐 문장 하나야.
+예: {{"1": "바뀐 문장", "2": "바뀐 문장"}}
+
+입력 문장(JSON):
+{json.dumps(numbered, ensure_ascii=False)}
+"""
+    # LLM 장애/대기열 초과는 그대로 올려 503/429 로 응답 (문장마다 단건 재시도하면 호출만 늘어남)
+    raw_output = await generate_text(prompt, call_site="convert_batch")
+    match = re.search(r'\{[\s\S]*\}', raw_output)
+    if not match:
+        return {}
+    try:
+        parsed = json.loads(match.group())
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+# 스트리밍 변환: ("token", 텍스트 조각) 을 순서대로 내보내고 마지막에 ("done", 응답 모델) 을 보냄
+# 캐시에 있으면 전체 문장을 토큰 하나로 바로 보냄
+async def _stream_conversion(
+    prompt: str, cache_key: str, cache_tag: str | None = None, local_text: str | None = None
+) -> AsyncIterator[tuple[str, object]]:
+    # 규칙 변환으로 끝난 문장은 토큰 하나로 바로 보냄
+    if local_text is not None:
+        yield "token", local_text
+        yield "done", ConvertResponse(converted_text=local_text)
+        return
+
+    cached_text = conversion_cache.get(cache_key)
+    if cached_text is not None:
+        yield "token", cached_text
+        yield "done", ConvertResponse(converted_text=cached_text, cached=True)
+        return
+
+    chunks: list[str] = []
+    async for chunk in stream_text(prompt, call_site="stream_convert"):
+        chunks.append(chunk)
+        yield "token", chunk
+    converted_text = "".join(chunks).strip()
+    conversion_cache.set(cache_key, converted_text, tag=cache_tag)
+    yield "done", ConvertResponse(converted_text=converted_text)
+
+def stream_convert_tone(data: ConvertRequest) -> AsyncIterator[tuple[str, object]]:
+    cache_key = conversion_cache.make_key(data.text, tone_key(data.target_tone))
+    local_text = _local_conversion(data.text, target_from_tone(data.target_tone))
+    return _stream_conversion(build_tone_prompt(data.text, data.target_tone), cache_key, local_text=local_text)
+
+def stream_convert_with_tone_profile(data: ConvertWithProfileRequest) -> AsyncIterator[tuple[str, object]]:
+    profile = data.tone_profile
+    cache_key = conversion_cache.make_key(data.text, profile_key(profile))
+    return _stream_conversion(build_profile_prompt(data.text, render_profile_style(profile)), cache_key)
+
+def stream_convert_from_preset(data: ConvertFromPresetRequest) -> AsyncIterator[tuple[str, object]]:
+    # 프리셋이 없으면 스트림 시작 전에 FileNotFoundError 가 발생
+    preset = load_preset_entry(data.user_id, data.preset_name)
+    cache_key = conversion_cache.make_key(data.text, preset.profile_hash)
+    prompt = build_profile_prompt(data.text, preset.fragment)
+    return _stream_conversion(prompt, cache_key, preset_tag(data.user_id, data.preset_name))
+
+async def stream_convert_with_auto_preset(data: ConvertWithAutoPresetRequest) -> AsyncIterator[tuple[str, object]]:
+    # 프리셋 선택은 스트림 시작 전에 끝냄 (프리셋이 없으면 여기서 FileNotFoundError)
+    preset_name = await choose_best_preset_name(data.dialogue_context, data.user_id)
+    request_data = ConvertFromPresetRequest(text=data.text, preset_name=preset_name, user_id=data.user_id)
+    events = stream_convert_from_preset(request_data)
+
+    async def stream() -> AsyncIterator[tuple[str, object]]:
+        yield "preset", {"selected_preset": preset_name}
+        async for event, payload in events:
+            if event == "done":
+                payload = ConvertWithAutoPresetResponse(
+                    converted_text=payload.converted_text,
+                    selected_preset=preset_name,
+                    cached=payload.cached
+                )
+            yield event, payload
+
+    return stream()
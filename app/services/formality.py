@@ -0,0 +1,368 @@
+# services/formality.py
+# 규칙 기반 존댓말 <-> 반말 변환기 (convert 의 로컬 빠른 경로)
+# - 문장마다 마지막 어절의 어미를 바꾸고(-어/-어요, -니?/-나요?, -자/-ㅂ시다, -습니다/-어 ...)
+#   1인칭 대명사(나/저, 내가/제가 ...)를 맞춤
+# - 정중한 말투로 바꿀 때는 웃음(ㅋㅋ)/이모지/물결을 지움
+# - 톤 이름(target_tone) 변환 전용: 프로필 변환은 어휘/문장 스타일 등 격식 외 특성을 재현할 수 없으므로 대상이 아님
+# - 문장별 신뢰도의 최솟값을 결과 신뢰도로 사용, 기준 이상일 때만 LLM 대신 사용
+# - 마지막 어절만 바꾸므로, 문장부호 없이 이어진 앞 절(쉼표 절, 이미 끝난 말)이 있으면 신뢰도를 기준 아래로 낮춤
+import re
+from typing import NamedTuple
+from app.core.metrics import registry, Counter
+from app.services.preset_match import EMOJI_PATTERN
+
+POLITE = "높음"
+CASUAL = "낮음"
+
+# 톤 이름이 순수한 격식 전환일 때만 로컬 처리 ('친근한' 처럼 다른 뜻이 섞인 톤은 LLM 으로)
+POLITE_TONES = {"정중한", "정중하게", "정중", "존댓말", "존대", "공손한", "공손하게", "격식", "격식있는", "높임말"}
+CASUAL_TONES = {"반말", "편한반말", "낮춤말", "평어"}
+TONE_SUFFIX = re.compile(r"(말투|스타일|체|으로|로)$")
+
+formality_fast_path_total = registry.register(Counter(
+    "formality_fast_path_total", "Formality conversions answered locally or sent to the LLM", ("outcome",)))
+
+class FormalityTarget(NamedTuple):
+    level: str                 # POLITE / CASUAL
+    strip_decorations: bool    # 웃음/이모지/물결 제거 여부
+
+class FormalityResult(NamedTuple):
+    text: str
+    confidence: float
+
+# ---------------------------------------------------------------- 한글 자모
+HANGUL_BASE = 0xAC00
+FINAL_B = 17
+FINAL_N = 4
+FINAL_L = 8
+# 중성 번호
+V_A, V_AE, V_EO, V_E, V_YEO, V_O, V_WA, V_WAE, V_OE, V_U, V_WO, V_EU, V_I = 0, 1, 4, 5, 6, 8, 9, 10, 11, 13, 14, 18, 20
+BRIGHT_VOWELS = {V_A, V_O, 2, V_WA, 12}  # ㅏ ㅗ ㅑ ㅘ ㅛ
+HAE_VOWELS = {V_A, V_AE, V_EO, V_E, V_YEO, V_WA, V_WAE, V_WO}
+# 어간 모음 + 아/어 축약 (가+아=가, 보+아=봐, 주+어=줘, 쓰+어=써, 마시+어=마셔, 되+어=돼)
+CONTRACTION = {V_A: V_A, V_EO: V_EO, V_O: V_WA, V_U: V_WO, V_EU: V_EO, V_I: V_YEO, V_AE: V_AE, V_E: V_E, V_OE: V_WAE, V_YEO: V_YEO}
+
+def _split(ch: str) -> tuple[int, int, int] | None:
+    code = ord(ch) - HANGUL_BASE
+    if not 0 <= code < 11172:
+        return None
+    return code // 588, (code % 588) // 28, code % 28
+
+def _join(initial: int, medial: int, final: int) -> str:
+    return chr(HANGUL_BASE + (initial * 21 + medial) * 28 + final)
+
+def _with_final(ch: str, final: int) -> str:
+    parts = _split(ch)
+    return _join(parts[0], parts[1], final) if parts else ch
+
+def _has_final(ch: str) -> bool:
+    parts = _split(ch)
+    return bool(parts and parts[2])
+
+# ---------------------------------------------------------------- 공통 패턴
+LAUGHTER = re.compile(r"[ㅋㅎ]{2,}|[ㅠㅜ]{2,}|\^\^|;;")
+TRAILING_DECOR = re.compile(f"((?:\\s*(?:[ㅋㅎ]{{2,}}|[ㅠㅜ]{{2,}}|\\^\\^|;;|{EMOJI_PATTERN.pattern}))*)\\s*$")
+SEGMENT = re.compile(r"[^.!?~\n]+[.!?~\n]*|[.!?~\n]+")
+SEGMENT_PARTS = re.compile(r"^(.*?)([.!?~\s]*)$", re.S)
+HANGUL = re.compile(r"[가-힣]")
+
+def _word_pattern(words) -> re.Pattern:
+    return re.compile(r"(?<![가-힣])(" + "|".join(sorted(words, key=len, reverse=True)) + r")(?![가-힣])")
+
+TO_POLITE_PRONOUNS = {
+    "나는": "저는", "난": "전", "내가": "제가", "나도": "저도", "나랑": "저랑", "나를": "저를",
+    "날": "절", "나한테": "저한테", "내": "제", "나": "저", "우리": "저희", "우리는": "저희는",
+}
+TO_CASUAL_PRONOUNS = {
+    "저는": "나는", "전": "난", "제가": "내가", "저도": "나도", "저랑": "나랑", "저를": "나를",
+    "절": "날", "저한테": "나한테", "제": "내", "저희": "우리", "저희는": "우리는",
+}
+TO_POLITE_PRONOUN_PATTERN = _word_pattern(TO_POLITE_PRONOUNS)
+TO_CASUAL_PRONOUN_PATTERN = _word_pattern(TO_CASUAL_PRONOUNS)
+# 상대를 부르는 말은 호칭을 골라야 하므로 규칙으로 처리하지 않음
+SECOND_PERSON = _word_pattern(["너", "니가", "네가", "너는", "넌", "너도", "너랑", "너를", "널", "너한테", "니", "당신", "자네"])
+AMBIGUOUS_CASUAL = _word_pattern(["저", "당신", "선생님", "님"])
+# 문장 첫머리의 부름말(민수야, 지민아)도 존댓말에선 호칭(~씨)을 골라야 함
+VOCATIVE = re.compile(r"^[가-힣]+[아야]\s")
+
+# 문장 전체가 이 말이면 바로 바꿈
+POLITE_LEXICON = {
+    "응": "네", "어": "네", "웅": "네", "ㅇㅇ": "네", "그래": "네", "아니": "아니요", "ㄴㄴ": "아니요",
+    "ㄱㅅ": "감사합니다", "땡큐": "감사합니다", "ㅇㅋ": "알겠어요", "오케이": "알겠어요", "알았어": "알겠어요",
+    "미안": "미안해요", "ㅈㅅ": "죄송해요", "안녕": "안녕하세요", "잘자": "안녕히 주무세요",
+    "뭐야": "뭐예요", "뭐냐": "뭐예요", "왜": "왜요", "진짜": "진짜요", "정말": "정말요",
+}
+CASUAL_LEXICON = {
+    "네": "응", "예": "응", "아니요": "아니", "아뇨": "아니", "감사합니다": "고마워", "고맙습니다": "고마워",
+    "감사해요": "고마워", "고마워요": "고마워", "죄송합니다": "미안해", "죄송해요": "미안해", "미안해요": "미안해",
+    "안녕하세요": "안녕", "안녕하십니까": "안녕", "알겠습니다": "알겠어", "알겠어요": "알겠어",
+    "수고하세요": "수고해", "안녕히 주무세요": "잘 자", "안녕히 계세요": "잘 있어", "안녕히 가세요": "잘 가",
+}
+# 마지막 어절이 이 말이면 바로 바꿈 (늦어서 미안 -> 늦어서 미안해요)
+POLITE_LAST_WORDS = {"미안": "미안해요", "고마워": "고마워요", "알았어": "알겠어요"}
+CASUAL_LAST_WORDS = {"죄송해요": "미안해", "죄송합니다": "미안해", "감사합니다": "고마워", "감사해요": "고마워", "봬요": "봐"}
+POLITE_ENDINGS = ("요", "니다", "니까", "세요", "죠", "십시오", "습니까")
+# -자 로 끝나는 흔한 명사 (청유형으로 보지 않음)
+JA_NOUNS = {"남자", "여자", "의자", "과자", "모자", "혼자", "글자", "숫자", "부자", "감자", "상자", "왕자", "피자", "사자", "액자", "원자"}
+JI_NOUNS = {"아버지", "편지", "돼지", "바지", "지지", "휴지", "숙제지", "이미지", "메시지", "페이지"}
+# 반말로 바로 +요 를 붙이면 되는 어미
+# 앞 절이 이미 끝난 것으로 보는 반말 어미 (응 알았어 내일 봐 -> '알았어' 에서 한 문장이 끝남)
+CASUAL_CLAUSE_ENDINGS = ("었어", "았어", "였어", "했어", "겠어", "었다", "았다", "였다", "했다", "겠다", "잖아", "거든", "구나", "는데", "을게", "ㄹ게", "할게", "갈게", "이야", "거야", "니", "냐", "자", "지")
+# 앞 어절이 이 꼴이면 비교적 확실한 주체 높임(-시-) (도와주실 수 있나요 -> 반말로 바꾸면 어색함)
+HONORIFIC_INFIX = re.compile(r"(?<=[가-힣])(시|실|신|십|셨|셔)")
+# -시- 처럼 보이지만 높임이 아닌 흔한 말
+NON_HONORIFIC = re.compile(r"다시|혹시|역시|잠시|당시|도시|자신|당신|마시|마셔|마실|마신|실수|실제|출신|정신|걱정시")
+# 앞 절이 남아 있을 때의 신뢰도 (FORMALITY_MIN_CONFIDENCE 기본값 0.85 보다 낮게)
+OPEN_CLAUSE_CONFIDENCE = 0.6
+YO_ENDINGS = ("거든", "잖아", "는데", "은데", "던데", "구먼", "네", "게", "걸", "래", "까", "데", "어", "아", "여", "해", "워", "와", "봐", "줘", "돼", "써", "져", "겨", "거", "서")
+
+# ---------------------------------------------------------------- 반말 -> 존댓말
+def _to_polite_word(word: str, question: bool) -> tuple[str, float]:
+    if word.endswith(POLITE_ENDINGS):
+        return word, 1.0
+    if not word or not HANGUL.search(word[-1]):
+        return word, 0.4
+    stem, last = word[:-1], word[-1]
+
+    if last == "니":
+        return (stem + "나요", 0.9) if question and stem else (word, 0.5)
+    if last == "냐" and stem:
+        return stem + "나요", 0.85
+    if word.endswith("구나"):
+        return word[:-2] + "군요", 0.9
+    if last == "자" and stem and word not in JA_NOUNS and word[-2:] not in JA_NOUNS:
+        # 가자 -> 갑시다, 놀자 -> 놉시다, 먹자 -> 먹읍시다
+        parts = _split(stem[-1])
+        if parts is None:
+            return word, 0.4
+        if parts[2] in (0, FINAL_L):
+            return stem[:-1] + _with_final(stem[-1], FINAL_B) + "시다", 0.85
+        return stem + "읍시다", 0.85
+    if last == "지" and stem and word not in JI_NOUNS:
+        return stem + "죠", 0.9
+    if last == "야":
+        if word.endswith("이야"):
+            return word[:-2] + "이에요", 0.9
+        if word.endswith(("거야", "뭐야", "게야")):
+            return stem + "예요", 0.9
+        if stem and not _has_final(stem[-1]):
+            return stem + "예요", 0.75
+        return word, 0.5
+    if last == "다" and stem:
+        return _plain_to_formal(word)
+    if word.endswith(YO_ENDINGS):
+        return word + "요", 0.9
+    parts = _split(last)
+    if parts and not parts[2] and parts[1] in HAE_VOWELS:
+        # 받침 없는 아/어 계열 모음으로 끝나면 해체 (배고파, 예뻐, 몰라)
+        return word + "요", 0.85
+    # 명사로 끝나는 짧은 문장 (사과 -> 사과요)
+    return word + "요", 0.7
+
+def _plain_to_formal(word: str) -> tuple[str, float]:
+    ##평서형 -다 -> -ㅂ니다/-습니다##
+    stem, prev = word[:-1], word[-2]
+    if word.endswith("는다") and len(word) > 2:
+        return word[:-2] + "습니다", 0.9
+    if prev in "었았였했겠":
+        return stem + "습니다", 0.92
+    if word.endswith("이다"):
+        return word[:-2] + "입니다", 0.85
+    parts = _split(prev)
+    if parts is None:
+        return word, 0.4
+    if parts[2] == FINAL_N:
+        # 간다 -> 갑니다, 한다 -> 합니다
+        return stem[:-1] + _with_final(prev, FINAL_B) + "니다", 0.85
+    if parts[2]:
+        return stem + "습니다", 0.85
+    # 크다 -> 큽니다 (명사 '바다' 등과 구분이 안 되므로 낮게)
+    return stem[:-1] + _with_final(prev, FINAL_B) + "니다", 0.75
+
+# ---------------------------------------------------------------- 존댓말 -> 반말
+LIEUL_STEMS = {"압": "알아", "삽": "살아", "놉": "놀아", "만듭": "만들어", "팝": "팔아", "엽": "열어", "듭": "들어", "웁": "울어", "붑": "불어"}
+# 받침이 ㄷ/ㅂ/ㅅ/ㅎ 인 어간 중 자주 쓰는 것: 불규칙은 활용형, 규칙은 그대로 (None)
+IRREGULAR_STEMS = {
+    "돕": "도와", "그렇": "그래", "어떻": "어때", "이렇": "이래", "저렇": "저래", "듣": "들어", "걷": "걸어", "묻": "물어",
+    "덥": "더워", "춥": "추워", "어렵": "어려워", "쉽": "쉬워", "고맙": "고마워", "반갑": "반가워", "무섭": "무서워",
+    "귀엽": "귀여워", "짓": "지어", "낫": "나아", "붓": "부어",
+}
+REGULAR_STEMS = {"좋", "놓", "넣", "낳", "쌓", "닿", "입", "잡", "좁", "씹", "업", "뽑", "접", "받", "믿", "얻", "닫", "벗", "웃", "씻"}
+SEYO_LEXICON = {"하세요": "해", "가세요": "가", "오세요": "와", "보세요": "봐", "드세요": "먹어", "계세요": "있어", "주무세요": "자", "있으세요": "있어"}
+
+def _informal_from_stem(stem: str) -> tuple[str, float]:
+    ##받침 있는 어간 + 아/어 (먹 -> 먹어, 좋 -> 좋아, 했 -> 했어)##
+    parts = _split(stem[-1])
+    if parts is None:
+        return stem, 0.4
+    if stem[-1] in "었았였했겠있없":
+        return stem + "어", 0.95
+    for key, value in IRREGULAR_STEMS.items():
+        if stem.endswith(key):
+            return stem[: -len(key)] + value, 0.9
+    ending = "아" if parts[1] in BRIGHT_VOWELS else "어"
+    # 그 밖의 ㄷ/ㅂ/ㅅ/ㅎ 받침은 불규칙 활용일 수 있음
+    irregular_risk = parts[2] in (7, FINAL_B, 19, 27) and stem[-1] not in REGULAR_STEMS
+    return stem + ending, 0.7 if irregular_risk else 0.9
+
+def _informal_from_vowel_stem(stem: str) -> tuple[str, float]:
+    ##받침 없는 어간 + 아/어 축약 (가 -> 가, 보 -> 봐, 하 -> 해, 마시 -> 마셔)##
+    last = stem[-1]
+    if last == "하":
+        return stem[:-1] + "해", 0.95
+    if last == "르" and len(stem) > 1 and _split(stem[-2]) and not _has_final(stem[-2]):
+        # 르 불규칙: 모르 -> 몰라, 부르 -> 불러
+        prev = _split(stem[-2])
+        ending = "라" if prev[1] in BRIGHT_VOWELS else "러"
+        return stem[:-2] + _with_final(stem[-2], FINAL_L) + ending, 0.85
+    parts = _split(last)
+    if parts is None or parts[1] not in CONTRACTION:
+        return stem, 0.5
+    return stem[:-1] + _join(parts[0], CONTRACTION[parts[1]], 0), 0.85
+
+def _to_casual_word(word: str) -> tuple[str, float]:
+    if not word.endswith(POLITE_ENDINGS):
+        return word, 0.9
+    converted, confidence = _drop_polite_ending(word)
+    # 주체 높임(-시-, -셨-)이 남으면 반말이 어색해지므로 LLM 으로
+    if "셨" in converted or re.search(r"시(니|어|지|나|야)?$", converted):
+        confidence = min(confidence, 0.7)
+    return converted, confidence
+
+def _drop_polite_ending(word: str) -> tuple[str, float]:
+    if word.endswith(("습니다", "습니까")):
+        stem = word[:-3]
+        return _informal_from_stem(stem) if stem else (word, 0.4)
+    if word.endswith(("니다", "니까")) and len(word) > 2 and _split(word[-3]) and _split(word[-3])[2] == FINAL_B:
+        head, syllable = word[:-3], word[-3]
+        if syllable == "입":
+            # 학생입니다 -> 학생이야, 친구입니다 -> 친구야
+            return (head + "이야", 0.9) if head and _has_final(head[-1]) else (head + "야", 0.9)
+        for key, value in LIEUL_STEMS.items():
+            if (head + syllable).endswith(key):
+                return (head + syllable)[: -len(key)] + value, 0.85
+        return _informal_from_vowel_stem(head + _with_final(syllable, 0))
+    if word.endswith("십시오"):
+        return word, 0.5
+    if word.endswith("세요"):
+        for key, value in SEYO_LEXICON.items():
+            if word.endswith(key):
+                return word[: -len(key)] + value, 0.9
+        if word.endswith("주세요"):
+            return word[:-3] + "줘", 0.9
+        if word.endswith("으세요") and len(word) > 3:
+            return _informal_from_stem(word[:-3])[0], 0.75
+        return word, 0.5
+    if word.endswith("이에요"):
+        return word[:-3] + "이야", 0.9
+    if word.endswith("예요"):
+        return word[:-2] + "야", 0.9
+    if word.endswith("죠"):
+        return word[:-1] + "지", 0.9
+    if word.endswith("군요"):
+        return word[:-2] + "구나", 0.9
+    if word.endswith("나요") and len(word) > 2 and word[-3] in "었았였했겠있없":
+        # 먹었나요 -> 먹었니 (끝나요 의 '나' 는 어간이므로 아래에서 요만 뗌)
+        return word[:-2] + "니", 0.85
+    if word.endswith("요") and len(word) > 1:
+        return word[:-1], 0.9
+    return word, 0.5
+
+# ---------------------------------------------------------------- 문장 단위
+def _has_open_clause(head: str, level: str) -> bool:
+    ##마지막 어절 앞에 따로 바꿔야 할 절(쉼표 절, 원래 격식으로 끝난 말)이 있는지##
+    if "," in head:
+        return True
+    lexicon, last_words = (POLITE_LEXICON, POLITE_LAST_WORDS) if level == POLITE else (CASUAL_LEXICON, CASUAL_LAST_WORDS)
+    for word in head.split():
+        if word in lexicon or word in last_words:
+            return True
+        if level == POLITE and len(word) > 1 and word.endswith(CASUAL_CLAUSE_ENDINGS) and word not in JA_NOUNS | JI_NOUNS:
+            return True
+        if level == CASUAL and len(word) > 1 and word.endswith(POLITE_ENDINGS):
+            return True
+    return False
+
+def _has_subject_honorific(head: str) -> bool:
+    return HONORIFIC_INFIX.search(NON_HONORIFIC.sub("", head)) is not None
+
+def _convert_segment(core: str, question: bool, level: str) -> tuple[str, float]:
+    stripped = core.strip()
+    if not stripped:
+        return core, 1.0
+    lexicon = POLITE_LEXICON if level == POLITE else CASUAL_LEXICON
+    if stripped in lexicon:
+        return core.replace(stripped, lexicon[stripped]), 0.95
+
+    confidence = 1.0
+    if level == POLITE:
+        if SECOND_PERSON.search(stripped) or VOCATIVE.match(stripped):
+            confidence = 0.6
+        stripped = TO_POLITE_PRONOUN_PATTERN.sub(lambda m: TO_POLITE_PRONOUNS[m.group(1)], stripped)
+    else:
+        if AMBIGUOUS_CASUAL.search(stripped):
+            confidence = 0.7
+        stripped = TO_CASUAL_PRONOUN_PATTERN.sub(lambda m: TO_CASUAL_PRONOUNS[m.group(1)], stripped)
+
+    head, _, word = stripped.rpartition(" ")
+    if _has_open_clause(head, level):
+        confidence = min(confidence, OPEN_CLAUSE_CONFIDENCE)
+    if level == CASUAL and _has_subject_honorific(head):
+        # 주체 높임은 마지막 어절만이 아니라 앞 어절(도와주실, 오신)에도 있을 수 있음
+        confidence = min(confidence, 0.7)
+    last_words = POLITE_LAST_WORDS if level == POLITE else CASUAL_LAST_WORDS
+    if word in last_words:
+        word, word_confidence = last_words[word], 0.9
+    elif level == POLITE:
+        word, word_confidence = _to_polite_word(word, question)
+    else:
+        word, word_confidence = _to_casual_word(word)
+    leading = core[: len(core) - len(core.lstrip())]
+    return leading + (f"{head} {word}" if head else word), min(confidence, word_confidence)
+
+def transform(text: str, target: FormalityTarget) -> FormalityResult:
+    ##text 를 target 격식으로 바꾸고 신뢰도(0~1)와 함께 반환##
+    if not HANGUL.search(text):
+        return FormalityResult(text, 0.0)
+
+    pieces: list[str] = []
+    confidence = 1.0
+    for segment in SEGMENT.findall(text):
+        body, delimiter = SEGMENT_PARTS.match(segment).groups()
+        decoration = TRAILING_DECOR.search(body).group(1)
+        core = body[: len(body) - len(decoration)] if decoration else body
+        converted, segment_confidence = _convert_segment(core, "?" in delimiter, target.level)
+        confidence = min(confidence, segment_confidence)
+        if target.strip_decorations:
+            # 문장 중간의 웃음/이모지를 지우면 공백이 겹치므로 하나로 합침
+            converted = re.sub(r"\s{2,}", " ", EMOJI_PATTERN.sub("", LAUGHTER.sub("", converted))).rstrip()
+            decoration = ""
+            delimiter = delimiter.replace("~", ".")
+            delimiter = re.sub(r"([.!?])\1+", r"\1", delimiter)
+        pieces.append(converted + decoration + delimiter)
+
+    result = "".join(pieces).strip()
+    if not result:
+        return FormalityResult(text, 0.0)
+    return FormalityResult(result, round(confidence, 3))
+
+# ---------------------------------------------------------------- 대상 판별
+def target_from_tone(target_tone: str) -> FormalityTarget | None:
+    ##톤 이름이 순수한 격식 전환('정중한', '반말' 등)이면 대상, 아니면 None##
+    name = TONE_SUFFIX.sub("", re.sub(r"\s+", "", target_tone or ""))
+    if name in POLITE_TONES:
+        return FormalityTarget(POLITE, True)
+    if name in CASUAL_TONES:
+        return FormalityTarget(CASUAL, False)
+    return None
+
+def try_local(text: str, target: FormalityTarget | None, min_confidence: float) -> str | None:
+    ##신뢰도가 기준 이상이면 변환 결과, 아니면 None (LLM 으로 넘김)##
+    if target is None:
+        return None
+    result = transform(text, target)
+    if result.confidence >= min_confidence:
+        formality_fast_path_total.inc("local")
+        return result.text
+    formality_fast_path_total.inc("llm")
+    return None
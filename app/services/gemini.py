@@ -1,32 +1,21 @@
 # services/gemini.py
-import google.generativeai as genai
 import json
 import re
+from typing import AsyncIterator
 from app.schemas import ToneProfile
-from app.core.config import GEMINI_API_KEY
 from app.core.logging_config import setup_logger
+from app.core.serialization import model_hash
+from app.services.llm import generate_text, stream_text, ANALYZE_MODELS, LLMUnavailableError
+from app.services.analysis_cache import analysis_cache
 
 # 로거 생성: 순환 참조 없이 직접 설정
 # "gemini"는 이 모듈의 이름, ERROR 로거는 별도로 설정
 gemini_logger = setup_logger("gemini")
 error_logger = setup_logger("error", level=40)
 
-# Gemini 모델 초기화
-if not GEMINI_API_KEY:
-    raise EnvironmentError("GEMINI_API_KEY is not set in the environment.")
-
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-2.0-pro-exp")
-
-def analyze_tone(dialogue: list[str]) -> ToneProfile:
-    gemini_logger.info("Starting tone analysis")
-    gemini_logger.debug(f"Input dialogue length: {len(dialogue)}")
-
-    if not dialogue:
-        raise ValueError("Dialogue input is empty or not provided")
-
-    # Gemini 프롬프트 작성
-    prompt = f"""
+# Gemini 프롬프트 작성
+def build_analyze_prompt(dialogue: list[str]) -> str:
+    return f"""
 다음은 두 사람 간의 대화입니다:
 
 {chr(10).join(dialogue)}
@@ -57,18 +46,59 @@ JSON 형식:
 }}
 """
 
+# 모델 응답에서 JSON 블록을 찾아 ToneProfile 로 변환
+def parse_tone_profile(raw_output: str) -> ToneProfile:
+    match = re.search(r'\{[\s\S]*\}', raw_output)
+    if not match:
+        raise ValueError("Failed to find JSON block in Gemini response")
+
+    parsed_json = json.loads(match.group())
+    return ToneProfile.model_validate(parsed_json)
+
+async def analyze_tone(dialogue: list[str]) -> ToneProfile:
+    gemini_logger.info("Starting tone analysis")
+    gemini_logger.debug(f"Input dialogue length: {len(dialogue)}")
+
+    if not dialogue:
+        raise ValueError("Dialogue input is empty or not provided")
+
+    return await _generate_profile(build_analyze_prompt(dialogue), "analyze_tone")
+
+# 기존 프로필 + 새 대화만 보내 프로필을 고치는 프롬프트 (증분 분석)
+def build_revise_prompt(profile: ToneProfile, new_lines: list[str]) -> str:
+    return f"""
+다음은 두 사람 간의 이전 대화를 분석한 말투 프로필입니다:
+
+{json.dumps(profile.model_dump(), ensure_ascii=False)}
+
+그 뒤에 이어진 새 대화입니다:
+
+{chr(10).join(new_lines)}
+
+새 대화를 반영해서 위 프로필을 고쳐주세요.
+- 새 대화에서 확인되는 특징은 추가하거나 바꾸고, 새 대화와 관계없는 기존 내용은 유지하세요.
+- 목록 항목은 중복 없이 합치고, sample_phrases 는 새 대화의 대표 문장을 우선하세요.
+
+주의:
+- 설명 없이 위와 같은 JSON 형식의 데이터만 응답하세요.
+"""
+
+async def revise_tone(profile: ToneProfile, new_lines: list[str]) -> ToneProfile:
+    gemini_logger.info("Starting incremental tone analysis")
+    gemini_logger.debug(f"New dialogue length: {len(new_lines)}")
+
+    if not new_lines:
+        raise ValueError("Dialogue input is empty or not provided")
+
+    return await _generate_profile(build_revise_prompt(profile, new_lines), "revise_tone")
+
+async def _generate_profile(prompt: str, call_site: str) -> ToneProfile:
     try:
         gemini_logger.debug("Sending prompt to Gemini API")
-        response = model.generate_content(prompt)
-        raw_output = response.text.strip()
+        raw_output = await generate_text(prompt, ANALYZE_MODELS, call_site=call_site)
         gemini_logger.debug(f"Gemini raw output: {raw_output[:200]}...")
 
-        match = re.search(r'\{[\s\S]*\}', raw_output)
-        if not match:
-            raise ValueError("Failed to find JSON block in Gemini response")
-
-        parsed_json = json.loads(match.group())
-        result = ToneProfile(**parsed_json)
+        result = parse_tone_profile(raw_output)
         gemini_logger.info("Successfully parsed tone profile")
         return result
 
@@ -76,6 +106,50 @@ JSON 형식:
         error_logger.error("JSON decode error from Gemini response", exc_info=True)
         raise ValueError("Gemini 응답을 JSON으로 변환하는 데 실패했습니다.")
 
+    except LLMUnavailableError:
+        # 재시도/폴백을 모두 거친 일시적 장애는 API 에서 503 으로 응답
+        raise
+
     except Exception:
-        error_logger.error("Unhandled exception in analyze_tone", exc_info=True)
-        raise RuntimeError("Gemini 분석 중 알 수 없는 오류가 발생했습니다.")
\ No newline at end of file
+        error_logger.error(f"Unhandled exception in {call_site}", exc_info=True)
+        raise RuntimeError("Gemini 분석 중 알 수 없는 오류가 발생했습니다.")
+
+# 같은 대화는 캐시/진행 중인 호출을 재사용하는 분석 함수
+# 반환: (프로필, "hit" | "shared" | "miss")
+async def analyze_tone_cached(dialogue: list[str]) -> tuple[ToneProfile, str]:
+    key = analysis_cache.make_key(dialogue)
+    return await analysis_cache.get_or_compute(key, lambda: analyze_tone(dialogue))
+
+# 같은 (프로필, 새 대화) 조합은 캐시/진행 중인 호출을 재사용
+async def revise_tone_cached(profile: ToneProfile, new_lines: list[str]) -> tuple[ToneProfile, str]:
+    key = analysis_cache.make_key(["\0revise", model_hash(profile), *new_lines])
+    return await analysis_cache.get_or_compute(key, lambda: revise_tone(profile, new_lines))
+
+# 스트리밍 분석: ("chunk", JSON 조각) 을 도착하는 대로 내보내고
+# 마지막에 전체 응답을 검증한 ("profile", ToneProfile) 을 보냄
+async def stream_analyze_tone(dialogue: list[str]) -> AsyncIterator[tuple[str, object]]:
+    gemini_logger.info("Starting streamed tone analysis")
+
+    if not dialogue:
+        raise ValueError("Dialogue input is empty or not provided")
+
+    # 이미 분석한 대화면 스트리밍 없이 결과만 보냄
+    key = analysis_cache.make_key(dialogue)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        yield "profile", cached
+        return
+
+    chunks: list[str] = []
+    async for chunk in stream_text(build_analyze_prompt(dialogue), ANALYZE_MODELS, call_site="stream_analyze_tone"):
+        chunks.append(chunk)
+        yield "chunk", chunk
+
+    try:
+        result = parse_tone_profile("".join(chunks))
+    except json.JSONDecodeError:
+        error_logger.error("JSON decode error from streamed Gemini response", exc_info=True)
+        raise ValueError("Gemini 응답을 JSON으로 변환하는 데 실패했습니다.")
+    gemini_logger.info("Successfully parsed streamed tone profile")
+    analysis_cache.set(key, result)
+    yield "profile", result
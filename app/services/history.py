@@ -0,0 +1,136 @@
+# services/history.py
+# 메시지 히스토리 저장소
+# - 사용자별 append-only JSONL 로그 (app/history/{user_id}.jsonl), 한 줄에 메시지 하나
+# - 쓰기는 파일 잠금 후 한 줄 추가만 하므로 O(1), 여러 워커가 동시에 써도 유실 없음
+# - 로그가 HISTORY_MAX_ITEMS * HISTORY_COMPACT_FACTOR 줄을 넘으면 최근 HISTORY_MAX_ITEMS 줄로 압축
+# - 읽기는 파일 끝에서부터 필요한 만큼만 읽음
+import threading
+import time
+from pathlib import Path
+from app.core.config import HISTORY_MAX_ITEMS, HISTORY_COMPACT_FACTOR
+from app.utils.files import locked, atomic_write_bytes, iter_lines_reverse
+from app.core.metrics import observe_io
+from app.core.conditional import file_validator
+from app.core.serialization import dumps, loads
+
+HISTORY_BASE = Path("app/history")
+
+# 로그 파일별 (파일 크기, 줄 수) 캐시: 크기가 그대로면 다시 세지 않음
+_line_counts: dict[Path, tuple[int, int]] = {}
+_counts_lock = threading.Lock()
+
+def get_history_path(user_id: str) -> Path:
+    return HISTORY_BASE / f"{user_id}.jsonl"
+
+def _encode(text: str) -> bytes:
+    return dumps({"text": text, "ts": time.time()}) + b"\n"
+
+def _decode(line: bytes) -> str | None:
+    try:
+        return loads(line)["text"]
+    except (ValueError, KeyError, TypeError):
+        # 쓰다가 끊긴 마지막 줄 등은 건너뜀
+        return None
+
+def _migrate_legacy(user_id: str, path: Path):
+    ##예전 형식({user_id}.json 배열)이 있으면 JSONL 로 옮김. 잠금 안에서 호출##
+    legacy = HISTORY_BASE / f"{user_id}.json"
+    if path.exists() or not legacy.exists():
+        return
+    history = loads(legacy.read_bytes())
+    atomic_write_bytes(path, b"".join(_encode(text) for text in history[-HISTORY_MAX_ITEMS:]))
+    legacy.replace(legacy.with_name(legacy.name + ".migrated"))
+
+def _count_lines(path: Path, size: int) -> int:
+    with _counts_lock:
+        cached = _line_counts.get(path)
+    if cached is not None and cached[0] == size:
+        return cached[1]
+    with open(path, "rb") as f:
+        count = sum(1 for line in f if line.strip())
+    with _counts_lock:
+        _line_counts[path] = (size, count)
+    return count
+
+def _read_tail(path: Path, count: int) -> list[tuple[bytes, str]]:
+    ##마지막 count 개의 메시지를 (원래 줄, 텍스트) 로 시간순 반환##
+    ##읽을 수 없는 줄(쓰다가 끊긴 줄 등)은 개수에 넣지 않음##
+    lines: list[tuple[bytes, str]] = []
+    with open(path, "rb") as f:
+        for line in iter_lines_reverse(f):
+            text = _decode(line) if line.strip() else None
+            if text is not None:
+                lines.append((line, text))
+                if len(lines) >= count:
+                    break
+    lines.reverse()
+    return lines
+
+@observe_io("history")
+def compact_history(user_id: str):
+    ##최근 HISTORY_MAX_ITEMS 개만 남기고 로그를 다시 씀##
+    path = get_history_path(user_id)
+    with locked(path):
+        if path.exists():
+            _compact(path)
+
+def _compact(path: Path):
+    tail = _read_tail(path, HISTORY_MAX_ITEMS)
+    data = b"".join(line + b"\n" for line, _ in tail)
+    atomic_write_bytes(path, data)
+    with _counts_lock:
+        _line_counts[path] = (len(data), len(tail))
+
+@observe_io("history")
+def append_history(user_id: str, text: str) -> int:
+    ##메시지 하나를 추가하고 보관 중인 메시지 수를 반환##
+    path = get_history_path(user_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with locked(path):
+        _migrate_legacy(user_id, path)
+        size_before = path.stat().st_size if path.exists() else 0
+        count = _count_lines(path, size_before) if size_before else 0
+
+        with open(path, "ab") as f:
+            f.write(_encode(text))
+            f.flush()
+            size_after = f.tell()
+        count += 1
+        with _counts_lock:
+            _line_counts[path] = (size_after, count)
+
+        if count > HISTORY_MAX_ITEMS * HISTORY_COMPACT_FACTOR:
+            _compact(path)
+    return min(count, HISTORY_MAX_ITEMS)
+
+@observe_io("history")
+def read_history(user_id: str, offset: int = 0, limit: int | None = None) -> list[str]:
+    ##보관 중인 메시지를 시간순으로 반환##
+    ##offset: 최근 메시지부터 건너뛸 개수, limit: 최대 개수 (없으면 보관 개수 전체)##
+    path = get_history_path(user_id)
+    if not path.exists():
+        legacy = HISTORY_BASE / f"{user_id}.json"
+        if not legacy.exists():
+            return []
+        with locked(path):
+            _migrate_legacy(user_id, path)
+
+    if offset >= HISTORY_MAX_ITEMS:
+        return []
+    if limit is None:
+        limit = HISTORY_MAX_ITEMS
+    limit = min(limit, HISTORY_MAX_ITEMS - offset)
+
+    lines = _read_tail(path, offset + limit)
+    if offset:
+        lines = lines[:-offset]
+    return [text for _, text in lines[-limit:]]
+
+def history_validator(user_id: str) -> tuple | None:
+    ##조건부 GET 검증자: 로그 파일 stat (추가하면 크기가, 압축하면 inode 가 바뀜)##
+    path = get_history_path(user_id)
+    stat = file_validator(path)
+    if stat is None:
+        # 아직 옮기지 않은 예전 형식이 있으면 검증자 없이 읽게 함
+        return None if (HISTORY_BASE / f"{user_id}.json").exists() else ("empty",)
+    return stat
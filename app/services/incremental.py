@@ -0,0 +1,97 @@
+# services/incremental.py
+# 증분 분석: 마지막으로 저장한 프로필 + 그 뒤에 이어진 새 줄만 LLM 에 보내 프로필을 고침
+# - 워터마크: 분석에 쓴 대화(잘라낸 결과)의 마지막 INCREMENTAL_ANCHOR_LINES 줄 해시
+#   새 대화에서 이 줄들이 이어 나오는 마지막 위치를 찾고, 그 뒤를 새 줄로 봄
+# - 워터마크는 manifest 에 pending 으로 남기고, 그 결과를 /save 하면 저장 파일의 것으로 확정
+#   (저장하지 않은 분석 결과를 기준으로 새 줄을 고르지 않도록)
+# - 전체 분석으로 돌아가는 경우
+#   저장된 프로필/워터마크가 없음, 이어진 위치를 못 찾음, 새 줄이 너무 많음,
+#   증분 갱신 횟수(INCREMENTAL_FULL_EVERY)나 마지막 전체 분석 후 시간(INCREMENTAL_FULL_MAX_AGE) 초과
+import hashlib
+import time
+from typing import NamedTuple
+from app.schemas import ToneProfile
+from app.core.config import (
+    INCREMENTAL_FULL_EVERY,
+    INCREMENTAL_FULL_MAX_AGE,
+    INCREMENTAL_MAX_NEW_LINES,
+    INCREMENTAL_ANCHOR_LINES,
+)
+from app.core.metrics import registry, Counter
+from app.services import manifest
+from app.services.compaction import compact_dialogue
+from app.services.gemini import analyze_tone_cached, revise_tone_cached
+from app.services.storage import get_user_dir, load_profile
+
+# 분석 방식: 전체 / 증분 / 새 줄 없음(저장된 프로필 그대로)
+FULL = "full"
+INCREMENTAL = "incremental"
+UNCHANGED = "unchanged"
+
+incremental_analyses_total = registry.register(Counter(
+    "incremental_analyses_total", "Incremental analyze requests by mode and reason", ("mode", "reason")))
+
+class IncrementalResult(NamedTuple):
+    profile: ToneProfile
+    cache_status: str
+    mode: str
+    new_lines: int
+
+def line_hash(line: str) -> str:
+    return hashlib.blake2b(line.strip().encode("utf-8"), digest_size=8).hexdigest()
+
+def find_new_lines(dialogue: list[str], anchor: list[str]) -> list[str] | None:
+    ##anchor(줄 해시 목록)가 이어 나오는 마지막 위치 뒤의 줄, 못 찾으면 None##
+    if not anchor:
+        return None
+    hashes = [line_hash(line) for line in dialogue]
+    size = len(anchor)
+    for end in range(len(hashes), size - 1, -1):
+        if hashes[end - size:end] == anchor:
+            return dialogue[end:]
+    return None
+
+def _plan(user_id: str, dialogue: list[str]) -> tuple[str, str, ToneProfile | None, list[str], dict]:
+    ##(방식, 이유, 기준 프로필, 새 줄, 이전 워터마크)##
+    saved = manifest.saved_watermark(get_user_dir(user_id))
+    if saved is None:
+        return FULL, "no_watermark", None, dialogue, {}
+    filename, watermark = saved
+    if watermark["updates"] >= INCREMENTAL_FULL_EVERY:
+        return FULL, "max_updates", None, dialogue, watermark
+    if time.time() - watermark["full_at"] >= INCREMENTAL_FULL_MAX_AGE:
+        return FULL, "max_age", None, dialogue, watermark
+    new_lines = find_new_lines(dialogue, watermark["anchor"])
+    if new_lines is None:
+        return FULL, "no_overlap", None, dialogue, watermark
+    if len(new_lines) > INCREMENTAL_MAX_NEW_LINES:
+        return FULL, "too_many_lines", None, dialogue, watermark
+    try:
+        base = load_profile(user_id, filename)
+    except FileNotFoundError:
+        return FULL, "no_profile", None, dialogue, watermark
+    return (INCREMENTAL if new_lines else UNCHANGED), "", base, new_lines, watermark
+
+async def analyze_incremental(user_id: str, dialogue: list[str]) -> IncrementalResult:
+    ##dialogue: cut_dialogue_by_date 등으로 잘라낸 원본 줄 (압축 전, 워터마크는 원본 줄 기준)##
+    mode, reason, base, new_lines, watermark = _plan(user_id, dialogue)
+    compacted = compact_dialogue(new_lines) if new_lines else []
+    if mode == INCREMENTAL and not compacted:
+        # 새 줄이 시스템 줄/첨부 알림뿐이면 고칠 것이 없음
+        mode = UNCHANGED
+    incremental_analyses_total.inc(mode, reason)
+
+    if mode == UNCHANGED:
+        profile, cache_status = base, "hit"
+    elif mode == INCREMENTAL:
+        profile, cache_status = await revise_tone_cached(base, compacted)
+    else:
+        profile, cache_status = await analyze_tone_cached(compacted)
+
+    now = time.time()
+    manifest.set_pending_watermark(get_user_dir(user_id), profile, {
+        "anchor": [line_hash(line) for line in dialogue[-INCREMENTAL_ANCHOR_LINES:]],
+        "updates": 0 if mode == FULL else watermark["updates"] + (mode == INCREMENTAL),
+        "full_at": now if mode == FULL else watermark["full_at"],
+    })
+    return IncrementalResult(profile, cache_status, mode, len(new_lines))
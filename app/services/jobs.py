@@ -0,0 +1,344 @@
+# services/jobs.py
+# 분석 작업 큐 (/analyze/jobs)
+# - 요청은 작업 ID 만 받고 바로 반환, 고정 개수의 워커가 순서대로 처리
+# - 작업 목록은 SQLite(WAL) 파일 하나가 기준이라 여러 워커 프로세스가 같은 큐를 나눠 씀
+#   (어느 프로세스에 들어온 작업이든 쉬는 워커가 가져감, 대기 상한도 전체 기준)
+# - 사용자별로 번갈아 가져가(각 사용자의 n 번째 작업끼리 먼저) 한 사용자가 큐를 독차지하지 못하게 함
+# - 전체/사용자별 대기 상한을 넘으면 QueueFullError (API 에서 429 + Retry-After)
+# - 실행 중 작업은 소유자(호스트:pid)와 임대(updated_at 을 주기적으로 갱신)를 기록하고,
+#   임대가 끊긴 작업(프로세스가 죽음)만 다시 대기 상태로 돌림 -> 다른 워커가 실행 중인 작업은 건드리지 않음
+# - SQLite 호출은 모두 스레드 풀에서 실행 (다른 프로세스가 잠그고 있어도 이벤트 루프는 멈추지 않음)
+# - 프로세스마다 확인 태스크 하나가 poll_interval 마다 끊긴 임대 정리 + 대기 작업 확인, 있으면 워커를 깨움
+import asyncio
+import json
+import math
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+from fastapi.concurrency import run_in_threadpool
+from app.schemas import ToneProfile
+from app.core.config import (
+    ANALYSIS_JOB_WORKERS,
+    ANALYSIS_JOB_MAX_QUEUED,
+    ANALYSIS_JOB_MAX_PER_USER,
+    ANALYSIS_JOB_PATH,
+    ANALYSIS_JOB_RESULT_TTL,
+    ANALYSIS_JOB_LEASE,
+    ANALYSIS_JOB_POLL_INTERVAL,
+)
+from app.core.logging_config import setup_logger
+from app.core.metrics import registry, Gauge, Histogram
+from app.core.serialization import model_to_json, model_from_json
+
+jobs_logger = setup_logger("jobs")
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+analysis_jobs_queued = registry.register(Gauge("analysis_jobs_queued", "Analysis jobs waiting for a worker"))
+analysis_job_seconds = registry.register(Histogram(
+    "analysis_job_seconds", "Analysis job time spent waiting in the queue and running", ("phase",)))
+
+# 사용자별 n 번째 대기 작업끼리 먼저, 그중에서는 가장 오래전에 처리받은 사용자부터 (라운드 로빈)
+# 처리 시각은 그 사용자의 실행 중/끝난 작업의 마지막 updated_at
+NEXT_JOB_SQL = (
+    "SELECT q.id FROM ("
+    " SELECT id, user_id, created_at, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at) AS turn"
+    " FROM jobs WHERE status = ?"
+    ") AS q LEFT JOIN ("
+    " SELECT user_id, MAX(updated_at) AS served FROM jobs WHERE status != ? GROUP BY user_id"
+    ") AS s USING (user_id) ORDER BY q.turn, COALESCE(s.served, 0), q.created_at LIMIT 1"
+)
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("분석 대기열이 가득 찼습니다.")
+        self.retry_after = retry_after
+
+class JobQueue:
+    def __init__(self, path: str | Path, workers: int, max_queued: int, max_per_user: int, result_ttl: float,
+                 lease: float = ANALYSIS_JOB_LEASE, poll_interval: float = ANALYSIS_JOB_POLL_INTERVAL):
+        self.path = Path(path)
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.handler: Callable[[str, list[str]], Awaitable[ToneProfile]] | None = None
+        # 이 프로세스의 워커를 나타내는 소유자 ID (워커를 띄울 때 정함, fork 된 프로세스는 새 ID)
+        self.owner = ""
+        self._queued = 0
+        # 작업 한 건의 평균 실행 시간 (Retry-After 추정용, 지수 이동 평균)
+        self._avg_run = 5.0
+        self._schema_path: Path | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        ready = self._schema_path == self.path
+        if not ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, status TEXT NOT NULL,"
+                " dialogue TEXT NOT NULL, result TEXT, error TEXT,"
+                " created_at REAL NOT NULL, updated_at REAL NOT NULL, owner TEXT)"
+            )
+            # 소유자 열이 없던 예전 파일
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+            self._schema_path = self.path
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    def set_handler(self, handler: Callable[[str, list[str]], Awaitable[ToneProfile]]):
+        ##(user_id, 대화) 를 받아 프로필을 돌려주는 분석 함수 등록##
+        self.handler = handler
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil((self._queued + 1) * self._avg_run / max(1, self.workers)))
+
+    def _set_queued(self, conn: sqlite3.Connection):
+        self._queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+        analysis_jobs_queued.set(value=self._queued)
+
+    async def submit(self, user_id: str, dialogue: list[str]) -> str:
+        self._ensure_workers()
+        job_id = await run_in_threadpool(self._insert, user_id, dialogue)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def _insert(self, user_id: str, dialogue: list[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            # 상한 확인과 추가를 한 쓰기 트랜잭션으로 묶어 여러 프로세스가 동시에 넣어도 전체 상한을 지킴
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._set_queued(conn)
+                user_queued = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND user_id = ?", (QUEUED, user_id)
+                ).fetchone()[0]
+                if self._queued >= self.max_queued or user_queued >= self.max_per_user:
+                    conn.execute("ROLLBACK")
+                    raise QueueFullError(self.retry_after())
+                conn.execute(
+                    "INSERT INTO jobs (id, user_id, status, dialogue, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, user_id, QUEUED, json.dumps(dialogue, ensure_ascii=False), now, now),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        self._queued += 1
+        analysis_jobs_queued.set(value=self._queued)
+        return job_id
+
+    async def get(self, job_id: str) -> dict | None:
+        return await run_in_threadpool(self._get, job_id)
+
+    def _get(self, job_id: str) -> dict | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, user_id, status, result, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "user_id": row[1],
+            "status": row[2],
+            "result": model_from_json(ToneProfile, row[3]) if row[3] else None,
+            "error": row[4],
+        }
+
+    def requeue_expired(self) -> int:
+        ##임대가 끊긴 실행 중 작업(실행하던 프로세스가 죽음)을 다시 대기 상태로##
+        now = time.time()
+        return self._execute(
+            "UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE status = ? AND updated_at < ?",
+            (QUEUED, now, RUNNING, now - self.lease),
+        )
+
+    def _sweep(self) -> int:
+        ##끊긴 임대 정리 후 대기 작업 수 반환 (확인 태스크가 poll_interval 마다 호출)##
+        self.requeue_expired()
+        conn = self._connect()
+        try:
+            self._set_queued(conn)
+        finally:
+            conn.close()
+        return self._queued
+
+    async def start(self):
+        ##오래된 결과 정리, 임대가 끊긴 작업 복구 후 워커 시작 (다른 프로세스가 실행 중인 작업은 그대로)##
+        await run_in_threadpool(
+            self._execute, "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (DONE, FAILED, time.time() - self.result_ttl),
+        )
+        recovered = await run_in_threadpool(self.requeue_expired)
+        if recovered:
+            jobs_logger.info(f"Recovered {recovered} analysis jobs with expired leases")
+        self._ensure_workers()
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # 이벤트 루프가 바뀌었으면(테스트 등) 새 루프에서 워커를 다시 띄움
+        self._loop = loop
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        if self.workers:
+            self._tasks.append(loop.create_task(self._poller()))
+
+    def _claim(self) -> tuple[str, str, str, float] | None:
+        ##다음 작업 하나를 이 프로세스 소유로 바꾸고 (ID, user_id, 대화, 생성 시각) 반환##
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(NEXT_JOB_SQL, (QUEUED, QUEUED)).fetchone()
+                claimed = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, self.owner, time.time(), row[0]),
+                    )
+                    claimed = (row[0], *conn.execute(
+                        "SELECT user_id, dialogue, created_at FROM jobs WHERE id = ?", (row[0],)
+                    ).fetchone())
+                self._set_queued(conn)
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return claimed
+
+    async def _poller(self):
+        ##다른 프로세스에 들어온 작업과 끊긴 임대는 알림이 없으므로 주기적으로 확인해 워커를 깨움##
+        while True:
+            try:
+                if await run_in_threadpool(self._sweep):
+                    self._wakeup.set()
+            except sqlite3.Error as e:
+                jobs_logger.warning(f"Analysis job poll failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _worker(self):
+        while True:
+            await self._wakeup.wait()
+            try:
+                claimed = await run_in_threadpool(self._claim)
+            except sqlite3.Error as e:
+                # 다른 프로세스가 오래 잠그고 있으면 다음 확인 때 다시 시도
+                jobs_logger.warning(f"Analysis job claim failed: {str(e)}")
+                claimed = None
+            if claimed is None:
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(*claimed)
+            except sqlite3.Error as e:
+                # 결과 기록 실패: 임대가 끊기면 다른 워커가 다시 실행, 이 워커는 계속 동작
+                jobs_logger.error(f"Analysis job {claimed[0]} result not recorded: {str(e)}")
+
+    async def _heartbeat(self, job_id: str):
+        ##실행하는 동안 임대 갱신 (한 번 실패해도 다음 주기에 다시 시도)##
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await run_in_threadpool(
+                    self._execute, "UPDATE jobs SET updated_at = ? WHERE id = ? AND owner = ?",
+                    (time.time(), job_id, self.owner),
+                )
+            except sqlite3.Error as e:
+                jobs_logger.warning(f"Analysis job {job_id} lease renewal failed: {str(e)}")
+
+    async def _run(self, job_id: str, user_id: str, dialogue: str, created_at: float):
+        analysis_job_seconds.observe("wait", value=max(0.0, time.time() - created_at))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id))
+        started = time.perf_counter()
+        try:
+            profile = await self.handler(user_id, json.loads(dialogue))
+        except asyncio.CancelledError:
+            # 종료 중 취소: 다른 워커나 다음 시작 때 바로 다시 처리되도록 대기 상태로 되돌림
+            # (취소된 태스크라 더 기다리지 않고 바로 실행, 실패해도 임대가 끊기면 다시 처리됨)
+            try:
+                self._execute(
+                    "UPDATE jobs SET status = ?, owner = NULL WHERE id = ? AND owner = ?", (QUEUED, job_id, self.owner)
+                )
+            except sqlite3.Error as e:
+                jobs_logger.warning(f"Analysis job {job_id} not requeued on shutdown: {str(e)}")
+            raise
+        except Exception as e:
+            jobs_logger.error(f"Analysis job {job_id} failed: {str(e)}", exc_info=True)
+            await run_in_threadpool(
+                self._execute, "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND owner = ?",
+                (FAILED, str(e), time.time(), job_id, self.owner),
+            )
+        else:
+            await run_in_threadpool(
+                self._execute, "UPDATE jobs SET status = ?, result = ?, dialogue = '[]', updated_at = ? WHERE id = ? AND owner = ?",
+                (DONE, model_to_json(profile).decode("utf-8"), time.time(), job_id, self.owner),
+            )
+        finally:
+            heartbeat.cancel()
+        elapsed = time.perf_counter() - started
+        self._avg_run = self._avg_run * 0.8 + elapsed * 0.2
+        analysis_job_seconds.observe("run", value=elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queued,
+            "max_queued": self.max_queued,
+            "lease_seconds": self.lease,
+            "avg_run_seconds": round(self._avg_run, 3),
+        }
+
+job_queue = JobQueue(
+    ANALYSIS_JOB_PATH,
+    ANALYSIS_JOB_WORKERS,
+    ANALYSIS_JOB_MAX_QUEUED,
+    ANALYSIS_JOB_MAX_PER_USER,
+    ANALYSIS_JOB_RESULT_TTL,
+)
@@ -0,0 +1,386 @@
+# services/llm.py
+# Gemini 호출을 한 곳에서 관리하는 비동기 클라이언트
+# - SDK의 비동기 생성 경로(generate_content_async)를 사용해 이벤트 루프를 막지 않음
+# - 프로세스당 동시 호출 수를 LLM_MAX_CONCURRENCY 로 제한, 다 찼으면 사용자별 가중 공정 큐로 대기 (admission.py)
+# - 호출 위치(call_site)별 지연/프롬프트·응답 크기를 메트릭으로 기록
+# - 복원력: 전체/시도별 제한 시간, 재시도(지수 백오프 + jitter), 헤지 요청,
+#   모델별 서킷 브레이커, 모델 체인 폴백. 각각 메트릭 카운터로 관찰 가능
+# - SDK(google.generativeai, grpc 포함)는 처음 LLM 을 쓸 때 스레드에서 import 하고 한 번만 설정
+#   (키가 없어도 앱은 뜨고, LLM 을 쓰는 요청만 503)
+import asyncio
+import importlib
+import random
+import threading
+import time
+from typing import AsyncIterator
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import (
+    GEMINI_API_KEY,
+    LLM_PREWARM,
+    LLM_MAX_CONCURRENCY,
+    LLM_MODELS,
+    LLM_ANALYZE_MODELS,
+    LLM_DEADLINE,
+    LLM_ATTEMPT_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE,
+    LLM_RETRY_MAX,
+    LLM_HEDGE_AFTER,
+    LLM_BREAKER_THRESHOLD,
+    LLM_BREAKER_COOLDOWN,
+    LLM_QUEUE_MAX,
+    LLM_QUEUE_MAX_PER_USER,
+    LLM_USER_WEIGHTS,
+)
+from app.core.logging_config import setup_logger
+from app.core.metrics import (
+    llm_call_duration,
+    llm_prompt_chars,
+    llm_response_chars,
+    llm_calls_in_flight,
+    llm_retries_total,
+    llm_timeouts_total,
+    llm_hedges_total,
+    llm_fallbacks_total,
+    llm_breaker_rejections_total,
+    llm_breaker_state,
+)
+from app.services.admission import FairScheduler, parse_weights
+
+llm_logger = setup_logger("llm")
+
+def _parse_models(value: str) -> tuple[str, ...]:
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+# 용도별 모델 체인 (앞에서부터 시도)
+CONVERT_MODELS = _parse_models(LLM_MODELS)
+ANALYZE_MODELS = _parse_models(LLM_ANALYZE_MODELS) or CONVERT_MODELS
+
+# 재시도할 HTTP 상태 (요청 한도 초과 / 서버 오류 / 시간 초과), 모델 자체 문제로 보고 다음 모델로 넘길 상태
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+FALLBACK_CODES = {404}
+
+_random = random.Random()
+
+class LLMUnavailableError(RuntimeError):
+    ##모델 체인 전체가 실패했거나 차단된 상태 (API 에서 503 으로 응답)##
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMNotConfiguredError(LLMUnavailableError):
+    ##GEMINI_API_KEY 가 없어 LLM 을 쓸 수 없음 (재시도/폴백 대상 아님)##
+    pass
+
+class LLMBusyError(LLMUnavailableError):
+    ##동시 호출 대기열이 가득 참 (API 에서 429 로 응답, 재시도/폴백 대상 아님)##
+    pass
+
+llm_scheduler = FairScheduler(
+    LLM_MAX_CONCURRENCY, LLM_QUEUE_MAX, LLM_QUEUE_MAX_PER_USER, parse_weights(LLM_USER_WEIGHTS), busy_error=LLMBusyError
+)
+
+class ModelRegistry:
+    ##SDK import/설정과 GenerativeModel 생성을 처음 필요할 때 한 번만 수행##
+    def __init__(self, api_key: str | None):
+        self.api_key = api_key
+        self.load_seconds: float | None = None
+        self._sdk = None
+        self._models: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._sdk is not None
+
+    def load(self):
+        ##SDK import + configure (블로킹, 스레드에서 호출)##
+        if self._sdk is not None:
+            return self._sdk
+        if not self.api_key:
+            raise LLMNotConfiguredError("GEMINI_API_KEY is not set in the environment.")
+        with self._lock:
+            if self._sdk is None:
+                started = time.perf_counter()
+                sdk = importlib.import_module("google.generativeai")
+                sdk.configure(api_key=self.api_key)
+                self._sdk = sdk
+                self.load_seconds = time.perf_counter() - started
+                llm_logger.info(f"Gemini SDK loaded in {self.load_seconds * 1000:.0f} ms")
+        return self._sdk
+
+    def get(self, model_name: str):
+        ##모델 이름별로 GenerativeModel 인스턴스를 한 번만 생성##
+        model = self._models.get(model_name)
+        if model is None:
+            sdk = self.load()
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = self._models[model_name] = sdk.GenerativeModel(model_name)
+        return model
+
+    async def get_async(self, model_name: str):
+        ##이벤트 루프를 막지 않도록 첫 로드는 스레드 풀에서 수행##
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        if not self.api_key:
+            raise LLMNotConfiguredError("GEMINI_API_KEY is not set in the environment.")
+        return await run_in_threadpool(self.get, model_name)
+
+    async def prewarm(self, model_names: tuple[str, ...]):
+        if not self.api_key:
+            llm_logger.warning("GEMINI_API_KEY is not set; LLM routes will return 503")
+            return
+        try:
+            for model_name in model_names:
+                await self.get_async(model_name)
+        except Exception as e:
+            # 미리 준비하지 못해도 첫 호출 때 다시 시도하므로 기동은 계속
+            llm_logger.warning(f"LLM prewarm failed: {e!r}")
+
+model_registry = ModelRegistry(GEMINI_API_KEY)
+
+async def prewarm():
+    ##startup 훅에서 호출: LLM_PREWARM 이 off 가 아니면 SDK/모델을 미리 준비##
+    models = tuple(dict.fromkeys(ANALYZE_MODELS + CONVERT_MODELS))
+    if LLM_PREWARM == "blocking":
+        await model_registry.prewarm(models)
+    elif LLM_PREWARM == "background":
+        # 기동은 바로 끝내고 SDK 로드는 뒤에서 진행 (첫 LLM 요청이 로드를 기다릴 수는 있음)
+        asyncio.ensure_future(model_registry.prewarm(models))
+
+# 상태: 닫힘(정상) -> 연속 실패 threshold 회 -> 열림(cooldown 동안 호출 안 함)
+#       -> 반열림(시험 호출 하나만 허용) -> 성공하면 닫힘, 실패하면 다시 열림
+CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+class CircuitBreaker:
+    def __init__(self, model_name: str, threshold: int, cooldown: float):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+
+    def _set_state(self, state: int):
+        self.state = state
+        llm_breaker_state.set(self.model_name, value=state)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self._set_state(HALF_OPEN)
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            llm_logger.info(f"Circuit closed: model={self.model_name}")
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state != OPEN:
+                llm_logger.warning(f"Circuit opened: model={self.model_name}, failures={self.failures}")
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+def get_breaker(model_name: str) -> CircuitBreaker:
+    breaker = _breakers.get(model_name)
+    if breaker is None:
+        breaker = _breakers[model_name] = CircuitBreaker(model_name, LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN)
+    return breaker
+
+def _error_code(exc: BaseException) -> int | None:
+    # google.api_core 예외는 HTTP 상태를 code 로 가짐 (SDK 를 import 하지 않고 판별)
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or _error_code(exc) in RETRYABLE_CODES
+
+def _backoff(attempt: int) -> float:
+    # full jitter: 0 ~ min(MAX, BASE * 2^attempt)
+    return _random.uniform(0, min(LLM_RETRY_MAX, LLM_RETRY_BASE * (2 ** attempt)))
+
+def _record(call_site: str, model_name: str, started: float, outcome: str, response_chars: int | None):
+    llm_call_duration.observe(call_site, model_name, outcome, value=time.perf_counter() - started)
+    if response_chars is not None:
+        llm_response_chars.observe(call_site, value=response_chars)
+
+async def _attempt(prompt: str, model_name: str, call_site: str) -> str:
+    ##동시 호출 슬롯을 잡고 한 번 호출##
+    async with llm_scheduler.slot(call_site):
+        llm_calls_in_flight.inc(call_site)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await (await model_registry.get_async(model_name)).generate_content_async(prompt)
+            text = response.text.strip()
+            outcome = "ok"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            llm_calls_in_flight.dec(call_site)
+            _record(call_site, model_name, started, outcome, len(text) if outcome == "ok" else None)
+    return text
+
+async def _hedged_attempt(prompt: str, model_name: str, call_site: str, timeout: float) -> str:
+    ##시도 한 번 (제한 시간 포함). 헤지가 켜져 있으면 느린 첫 요청과 두 번째 요청 중 먼저 성공한 것을 사용##
+    if LLM_HEDGE_AFTER <= 0 or LLM_HEDGE_AFTER >= timeout:
+        return await asyncio.wait_for(_attempt(prompt, model_name, call_site), timeout)
+
+    deadline = time.monotonic() + timeout
+    first = asyncio.ensure_future(_attempt(prompt, model_name, call_site))
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=LLM_HEDGE_AFTER)
+        # 동시 호출 한도가 이미 찼으면 헤지가 부하만 늘리므로 보내지 않음
+        if not done and not llm_scheduler.saturated():
+            tasks.add(asyncio.ensure_future(_attempt(prompt, model_name, call_site)))
+            llm_hedges_total.inc(call_site, "launched")
+
+        error: BaseException | None = None
+        while tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None:
+                    if task is not first:
+                        llm_hedges_total.inc(call_site, "won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def _with_resilience(models: tuple[str, ...], call_site: str, run):
+    ##모델 체인 x 재시도 루프. run(model_name, timeout) 이 한 번의 시도##
+    deadline = time.monotonic() + LLM_DEADLINE
+    last_error: BaseException | None = None
+    retry_after = LLM_BREAKER_COOLDOWN
+
+    for position, model_name in enumerate(models):
+        breaker = get_breaker(model_name)
+        if not breaker.allow():
+            llm_breaker_rejections_total.inc(model_name)
+            retry_after = min(retry_after, breaker.retry_after())
+            continue
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMUnavailableError("LLM 호출 제한 시간을 초과했습니다.") from last_error
+            try:
+                result = await run(model_name, min(LLM_ATTEMPT_TIMEOUT, remaining))
+            except asyncio.TimeoutError as e:
+                llm_timeouts_total.inc(call_site, model_name)
+                last_error = e
+            except LLMUnavailableError:
+                # 키 없음 / 대기열 가득 참: 모델 상태와 무관하므로 그대로 올림
+                raise
+            except Exception as e:
+                code = _error_code(e)
+                if not is_retryable(e) and code not in FALLBACK_CODES:
+                    # 요청 자체의 문제(잘못된 인자, 안전 필터 등)는 모델 상태와 무관하므로 그대로 올림
+                    breaker.record_success()
+                    raise
+                last_error = e
+                if code in FALLBACK_CODES:
+                    breaker.record_failure()
+                    break
+            else:
+                breaker.record_success()
+                return result
+
+            breaker.record_failure()
+            llm_logger.warning(f"LLM attempt failed: call_site={call_site}, model={model_name}, error={last_error!r}")
+            if attempt == LLM_MAX_RETRIES or breaker.state == OPEN:
+                break
+            llm_retries_total.inc(call_site, model_name)
+            await asyncio.sleep(min(_backoff(attempt), max(0.0, deadline - time.monotonic())))
+
+        if position < len(models) - 1:
+            llm_fallbacks_total.inc(call_site, model_name)
+
+    raise LLMUnavailableError(
+        "Gemini 를 일시적으로 사용할 수 없습니다.", retry_after=max(1, int(retry_after))
+    ) from last_error
+
+async def generate_text(prompt: str, models: tuple[str, ...] = CONVERT_MODELS, call_site: str = "unknown") -> str:
+    ##프롬프트를 보내고 응답 텍스트(앞뒤 공백 제거)를 반환##
+    llm_prompt_chars.observe(call_site, value=len(prompt))
+
+    async def run(model_name: str, timeout: float) -> str:
+        return await _hedged_attempt(prompt, model_name, call_site, timeout)
+
+    return await _with_resilience(models, call_site, run)
+
+async def _open_stream(prompt: str, model_name: str, timeout: float):
+    ##스트림을 열고 첫 조각까지 받아 둠 (첫 조각 전 실패만 재시도/폴백 대상)##
+    response = await (await model_registry.get_async(model_name)).generate_content_async(prompt, stream=True)
+    iterator = response.__aiter__()
+    try:
+        first = await asyncio.wait_for(iterator.__anext__(), timeout)
+    except StopAsyncIteration:
+        first = None
+    return iterator, first
+
+def _chunk_text(chunk) -> str:
+    try:
+        return chunk.text
+    except ValueError:
+        # 안전 필터 등으로 텍스트 파트가 없는 조각은 건너뜀
+        return ""
+
+async def stream_text(prompt: str, models: tuple[str, ...] = CONVERT_MODELS, call_site: str = "unknown") -> AsyncIterator[str]:
+    ##스트리밍 생성: 응답 텍스트 조각을 도착하는 대로 반환##
+    llm_prompt_chars.observe(call_site, value=len(prompt))
+    async with llm_scheduler.slot(call_site):
+        llm_calls_in_flight.inc(call_site)
+        opened: dict = {}
+
+        async def run(model_name: str, timeout: float):
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(_open_stream(prompt, model_name, timeout), timeout)
+            except BaseException:
+                _record(call_site, model_name, started, "error", None)
+                raise
+            opened.update(model_name=model_name, started=started)
+            return result
+
+        outcome = "error"
+        response_chars = 0
+        try:
+            iterator, chunk = await _with_resilience(models, call_site, run)
+            while chunk is not None:
+                text = _chunk_text(chunk)
+                if text:
+                    response_chars += len(text)
+                    yield text
+                try:
+                    # 조각 사이가 시도 제한 시간보다 길어지면 중단
+                    chunk = await asyncio.wait_for(iterator.__anext__(), LLM_ATTEMPT_TIMEOUT)
+                except StopAsyncIteration:
+                    chunk = None
+            outcome = "ok"
+        finally:
+            llm_calls_in_flight.dec(call_site)
+            if opened:
+                _record(call_site, opened["model_name"], opened["started"], outcome, response_chars if outcome == "ok" else None)
@@ -0,0 +1,252 @@
+# services/manifest.py
+# 사용자별 분석 결과 목록(manifest) 관리
+# - 사용자 폴더마다 SQLite 파일 하나(manifest.sqlite3)에 result_NNN.json 목록을 보관
+# - 번호 할당은 쓰기 트랜잭션 안에서 이루어지므로 동시에 저장해도 같은 번호를 받지 않음
+# - 삭제된 번호는 다시 쓰지 않음 (next_index 는 계속 증가)
+# - 같은 DB 에 검색용 역색인(search_index)도 함께 유지
+# - 목록이 바뀔 때마다 meta.version 을 올려 조건부 GET 의 검증자로 사용
+# - 증분 분석 워터마크(어디까지 분석했는지)도 보관: 분석 직후 pending, 그 결과를 /save 하면 saved 로 옮김
+#
+# 기존 폴더 재구성:  python -m app.services.manifest rebuild [user_id ...]
+import json
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+from app.schemas import ToneProfile
+from app.core.serialization import model_hash
+from app.services import search_index
+
+MANIFEST_NAME = "manifest.sqlite3"
+# 색인 구조가 바뀌면 올려서 기존 manifest 를 다시 만들게 함
+INDEX_VERSION = 1
+RESULT_PATTERN = "result_*.json"
+
+def result_filename(index: int) -> str:
+    return f"result_{index:03}.json"
+
+def _parse_index(filename: str) -> int | None:
+    stem = Path(filename).stem
+    if not stem.startswith("result_"):
+        return None
+    try:
+        return int(stem[len("result_"):])
+    except ValueError:
+        return None
+
+def _connect(user_dir: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(user_dir / MANIFEST_NAME, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS results ("
+        " idx INTEGER PRIMARY KEY, filename TEXT NOT NULL UNIQUE,"
+        " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+        " name TEXT NOT NULL DEFAULT '', tone TEXT NOT NULL DEFAULT '')"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS watermark (slot TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    search_index.create_tables(conn)
+    # manifest 가 처음 만들어졌거나 색인 버전이 다르면 기존 파일로 다시 채움
+    row = conn.execute("SELECT value FROM meta WHERE key = 'index_version'").fetchone()
+    if row is None or row[0] != INDEX_VERSION:
+        _rebuild(conn, user_dir)
+    return conn
+
+def _bump_version(conn: sqlite3.Connection):
+    ##쓰기 트랜잭션 안에서 호출##
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('version', 1) ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    )
+
+def _rebuild(conn: sqlite3.Connection, user_dir: Path) -> int:
+    entries = []
+    for file in user_dir.glob(RESULT_PATTERN):
+        index = _parse_index(file.name)
+        if index is None:
+            continue
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        mtime = file.stat().st_mtime
+        entries.append((index, file.name, mtime, mtime, str(data.get("name", "")), str(data.get("tone", "")), data))
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM results")
+        search_index.clear(conn)
+        conn.executemany(
+            "INSERT INTO results (idx, filename, created_at, updated_at, name, tone) VALUES (?, ?, ?, ?, ?, ?)",
+            [entry[:6] for entry in entries],
+        )
+        for entry in entries:
+            search_index.index_profile(conn, entry[0], entry[6])
+        # 이전에 할당된 번호보다 작아지지 않도록 유지
+        row = conn.execute("SELECT value FROM meta WHERE key = 'next_index'").fetchone()
+        next_index = max((entry[0] for entry in entries), default=0) + 1
+        if row is not None:
+            next_index = max(next_index, row[0])
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_index', ?)", (next_index,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('index_version', ?)", (INDEX_VERSION,))
+        _bump_version(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return len(entries)
+
+def rebuild(user_dir: Path) -> int:
+    ##폴더의 result_*.json 파일로 manifest 를 다시 만들고 항목 수를 반환##
+    with closing(_connect(user_dir)) as conn:
+        return _rebuild(conn, user_dir)
+
+def add_result(user_dir: Path, profile: ToneProfile, write_file: Callable[[Path], None]) -> Path:
+    ##다음 번호를 원자적으로 할당하고, 같은 트랜잭션 안에서 파일을 기록##
+    with closing(_connect(user_dir)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            next_index = conn.execute("SELECT value FROM meta WHERE key = 'next_index'").fetchone()[0]
+            # manifest 밖에서 만들어진 파일이 있으면 덮어쓰지 않도록 건너뜀
+            while (user_dir / result_filename(next_index)).exists():
+                next_index += 1
+            filename = result_filename(next_index)
+            file_path = user_dir / filename
+            write_file(file_path)
+            now = time.time()
+            conn.execute(
+                "INSERT INTO results (idx, filename, created_at, updated_at, name, tone) VALUES (?, ?, ?, ?, ?, ?)",
+                (next_index, filename, now, now, profile.name, profile.tone),
+            )
+            search_index.index_profile(conn, next_index, profile.model_dump())
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'next_index'", (next_index + 1,))
+            _promote_watermark(conn, profile, filename)
+            _bump_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return file_path
+
+def _promote_watermark(conn: sqlite3.Connection, profile: ToneProfile, filename: str):
+    ##저장하는 프로필이 마지막 분석 결과와 같으면 그 워터마크를 이 파일의 것으로 확정 (쓰기 트랜잭션 안)##
+    row = conn.execute("SELECT data FROM watermark WHERE slot = 'pending'").fetchone()
+    if row is None:
+        return
+    data = json.loads(row[0])
+    if data.pop("profile_key", None) != model_hash(profile):
+        return
+    data["filename"] = filename
+    conn.execute("INSERT OR REPLACE INTO watermark (slot, data) VALUES ('saved', ?)", (json.dumps(data),))
+    conn.execute("DELETE FROM watermark WHERE slot = 'pending'")
+
+def set_pending_watermark(user_dir: Path, profile: ToneProfile, data: dict):
+    ##분석 결과(profile)가 어디까지의 대화를 반영했는지 기록, 같은 프로필이 저장될 때 확정됨##
+    data = dict(data, profile_key=model_hash(profile))
+    with closing(_connect(user_dir)) as conn:
+        conn.execute("INSERT OR REPLACE INTO watermark (slot, data) VALUES ('pending', ?)", (json.dumps(data),))
+
+def saved_watermark(user_dir: Path) -> tuple[str, dict] | None:
+    ##가장 최근 저장 파일에 확정된 워터마크 (파일명, 데이터), 최근 파일이 다른 경로로 저장됐으면 None##
+    with closing(_connect(user_dir)) as conn:
+        latest = conn.execute("SELECT filename FROM results ORDER BY idx DESC LIMIT 1").fetchone()
+        row = conn.execute("SELECT data FROM watermark WHERE slot = 'saved'").fetchone()
+    if latest is None or row is None:
+        return None
+    data = json.loads(row[0])
+    if data.pop("filename", None) != latest[0]:
+        return None
+    return latest[0], data
+
+def version(user_dir: Path) -> int:
+    ##추가/수정/삭제/재구성 때마다 증가하는 목록 버전##
+    with closing(_connect(user_dir)) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return row[0] if row else 0
+
+def latest_filename(user_dir: Path) -> str | None:
+    with closing(_connect(user_dir)) as conn:
+        row = conn.execute("SELECT filename FROM results ORDER BY idx DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+def list_filenames(user_dir: Path, descending: bool = False) -> list[str]:
+    order = "DESC" if descending else "ASC"
+    with closing(_connect(user_dir)) as conn:
+        rows = conn.execute(f"SELECT filename FROM results ORDER BY idx {order}").fetchall()
+    return [row[0] for row in rows]
+
+def list_entries(user_dir: Path, descending: bool = False) -> list[dict]:
+    ##파일명, 생성/수정 시각, 프로필 이름과 톤을 함께 반환##
+    order = "DESC" if descending else "ASC"
+    with closing(_connect(user_dir)) as conn:
+        rows = conn.execute(
+            f"SELECT filename, created_at, updated_at, name, tone FROM results ORDER BY idx {order}"
+        ).fetchall()
+    return [
+        {"filename": row[0], "created_at": row[1], "updated_at": row[2], "name": row[3], "tone": row[4]}
+        for row in rows
+    ]
+
+def update_entry(user_dir: Path, filename: str, profile: ToneProfile):
+    with closing(_connect(user_dir)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT idx FROM results WHERE filename = ?", (filename,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE results SET updated_at = ?, name = ?, tone = ? WHERE idx = ?",
+                    (time.time(), profile.name, profile.tone, row[0]),
+                )
+                search_index.index_profile(conn, row[0], profile.model_dump())
+                _bump_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def remove_entry(user_dir: Path, filename: str):
+    with closing(_connect(user_dir)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT idx FROM results WHERE filename = ?", (filename,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM results WHERE idx = ?", (row[0],))
+                search_index.remove(conn, row[0])
+                _bump_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def search_filenames(user_dir: Path, query: str) -> list[str]:
+    ##역색인 검색 결과를 점수 높은 순의 파일명 목록으로 반환##
+    with closing(_connect(user_dir)) as conn:
+        ranked = search_index.search(conn, query)
+        if not ranked:
+            return []
+        names = dict(conn.execute(
+            f"SELECT idx, filename FROM results WHERE idx IN ({','.join('?' * len(ranked))})",
+            [idx for idx, _ in ranked],
+        ).fetchall())
+    return [names[idx] for idx, _ in ranked if idx in names]
+
+def main(argv: list[str]) -> int:
+    from app.services.storage import BASE_DIR, get_user_dir
+
+    if not argv or argv[0] != "rebuild":
+        print("usage: python -m app.services.manifest rebuild [user_id ...]")
+        return 2
+
+    user_ids = argv[1:] or [
+        path.name for path in BASE_DIR.iterdir()
+        if path.is_dir() and path.name != "presets" and any(path.glob(RESULT_PATTERN))
+    ]
+    for user_id in user_ids:
+        count = rebuild(get_user_dir(user_id))
+        print(f"{user_id}: {count} results")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,33 +1,248 @@
-import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from typing import NamedTuple
 from app.schemas import ToneProfile
+from pydantic import BaseModel, ValidationError
+from app.core.config import PRESET_CACHE_SIZE
+from app.core.metrics import observe_io
+from app.core.conditional import file_validator
+from app.core.serialization import read_model, write_model
+from app.utils.files import locked
+from app.services.cache import conversion_cache, preset_tag, profile_key
 
 PRESET_DIR = Path("app/output/presets").resolve()
+# 사용자별 프리셋 팩: 프리셋 전체를 한 파일로 모아 목록/일괄 조회를 한 번의 읽기로 처리
+PACK_SUFFIX = ".pack.json"
+PACK_KEY = "*"
+
+logger = logging.getLogger(__name__)
+
+# 프로필의 말투 특성을 프롬프트용 여러 줄 설명으로 변환
+def render_profile_style(profile: ToneProfile) -> str:
+    return f"""- 말투 이름: {profile.name}
+- 전반적 톤: {profile.tone}
+- 감정 경향성: {profile.emotion_tendency}
+- 격식 수준: {profile.formality}
+- 어휘 스타일: {", ".join(profile.vocab_style)}
+- 문장 스타일: {", ".join(profile.sentence_style)}
+- 표현 빈도: {", ".join(profile.expression_freq)}
+- 의도 성향: {", ".join(profile.intent_bias)}"""
+
+# 캐시된 프리셋: 검증된 프로필 + 미리 만든 프롬프트 조각 + 변환 캐시용 해시
+# 프로필 객체는 여러 요청이 공유하므로 수정하지 말 것
+class CachedPreset(NamedTuple):
+    profile: ToneProfile
+    fragment: str
+    profile_hash: str
+    mtime_ns: int
+    size: int
+
+# 캐시된 프리셋 팩: 이름순 프로필 + 팩 파일 mtime/크기 + 팩을 쓸 때의 사용자 폴더 mtime
+# (PresetCache 에 (user_id, PACK_KEY) 로 저장, 폴더 mtime 이 다르면 외부에서 파일이 추가/삭제된 것)
+class PresetPack(NamedTuple):
+    version: int
+    profiles: dict[str, ToneProfile]
+    mtime_ns: int
+    size: int
+    dir_mtime_ns: int
+
+# 팩 파일 내용: 프로필까지 한 번에 파싱/검증하고(model_validate_json) 그대로 직렬화해서 저장
+class PackFile(BaseModel):
+    version: int = 0
+    dir_mtime_ns: int = 0
+    presets: dict[str, ToneProfile] = {}
+
+class PresetCache:
+    ##(user_id, 프리셋 이름) -> CachedPreset (또는 (user_id, PACK_KEY) -> PresetPack), LRU 크기 제한 + 파일 mtime/크기로 유효성 확인##
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], CachedPreset] = OrderedDict()
+
+    def get(self, key: tuple[str, str], mtime_ns: int, size: int) -> CachedPreset | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == mtime_ns and entry.size == size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple[str, str], entry: CachedPreset):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: tuple[str, str]):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+preset_cache = PresetCache(PRESET_CACHE_SIZE)
+pack_cache = PresetCache(PRESET_CACHE_SIZE)
+# 팩 갱신(읽기-수정-쓰기)은 사용자별로 직렬화: 같은 프로세스 안은 스레드 락, 워커 프로세스 사이는 파일 잠금
+_pack_locks: dict[str, threading.Lock] = {}
+_pack_locks_guard = threading.Lock()
 
 def get_preset_dir(user_id: str) -> Path:
     dir_path = PRESET_DIR / user_id
     dir_path.mkdir(parents=True, exist_ok=True)
     return dir_path
 
-def save_preset(user_id: str, preset_name: str, profile: ToneProfile):
+@contextmanager
+def _pack_lock(user_id: str):
+    with _pack_locks_guard:
+        thread_lock = _pack_locks.setdefault(user_id, threading.Lock())
+    with thread_lock, locked(get_pack_path(user_id)):
+        yield
+
+def get_pack_path(user_id: str) -> Path:
+    # 사용자 폴더 밖(형제 파일)에 두어 폴더 mtime 으로 외부 변경을 감지하고 /user-ids 목록에도 안 섞이게 함
+    return PRESET_DIR / f"{user_id}{PACK_SUFFIX}"
+
+def _build_pack(user_id: str) -> PackFile:
+    ##개별 프리셋 파일들로 팩 내용을 새로 구성 (기존 데이터 이전, 외부에서 파일이 추가/삭제된 경우)##
+    dir_path = get_preset_dir(user_id)
+    presets = {}
+    for file in sorted(dir_path.glob("*.json")):
+        try:
+            presets[file.stem] = read_model(file, ToneProfile)
+        except (OSError, ValueError, ValidationError) as e:
+            logger.warning(f"프리셋 팩 구성 중 건너뜀: {file} ({e})")
+    return PackFile(dir_mtime_ns=dir_path.stat().st_mtime_ns, presets=presets)
+
+def _read_pack_file(user_id: str) -> PackFile | None:
+    try:
+        return read_model(get_pack_path(user_id), PackFile)
+    except (FileNotFoundError, ValueError):
+        # ValidationError 도 ValueError: 깨진 팩은 개별 파일로 다시 구성
+        return None
+
+def _current_pack_data(user_id: str) -> PackFile:
+    ##디스크의 팩 내용 (없거나 사용자 폴더가 팩 이후 바뀌었으면 다시 구성해 저장), 팩 락 안에서 호출##
+    data = _read_pack_file(user_id)
+    dir_mtime_ns = get_preset_dir(user_id).stat().st_mtime_ns
+    if data is None or data.dir_mtime_ns != dir_mtime_ns:
+        rebuilt = _build_pack(user_id)
+        rebuilt.version = (data.version if data is not None else 0) + 1
+        write_model(get_pack_path(user_id), rebuilt)
+        return rebuilt
+    return data
+
+def _update_pack(user_id: str, preset_name: str, profile: ToneProfile | None):
+    ##개별 프리셋 파일과 팩을 함께 갱신 (profile 이 None 이면 삭제)##
     file_path = get_preset_dir(user_id) / f"{preset_name}.json"
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(profile.dict(), f, ensure_ascii=False, indent=2)
+    with _pack_lock(user_id):
+        # 파일을 쓰기 전에 팩을 확인해야 방금 쓴 파일 때문에 팩 전체를 다시 구성하지 않음
+        data = _current_pack_data(user_id)
+        if profile is None:
+            file_path.unlink(missing_ok=True)
+            data.presets.pop(preset_name, None)
+        else:
+            # 새 파일로 교체해 inode 가 바뀌므로 조건부 GET 검증자도 바뀜
+            write_model(file_path, profile)
+            data.presets[preset_name] = profile
+        data.version += 1
+        data.dir_mtime_ns = get_preset_dir(user_id).stat().st_mtime_ns
+        write_model(get_pack_path(user_id), data)
+    pack_cache.invalidate((user_id, PACK_KEY))
 
-def load_preset(user_id: str, preset_name: str) -> ToneProfile:
+@observe_io("preset")
+def load_preset_pack(user_id: str) -> PresetPack:
+    ##사용자의 프리셋 전체를 팩 파일 한 번 읽어 반환, 팩/사용자 폴더가 바뀌지 않았으면 캐시에서 반환##
+    key = (user_id, PACK_KEY)
+    pack_path = get_pack_path(user_id)
+    dir_mtime_ns = get_preset_dir(user_id).stat().st_mtime_ns
+    try:
+        stat = pack_path.stat()
+        entry = pack_cache.get(key, stat.st_mtime_ns, stat.st_size)
+        if entry is not None and entry.dir_mtime_ns == dir_mtime_ns:
+            return entry
+    except FileNotFoundError:
+        pass
+
+    with _pack_lock(user_id):
+        data = _current_pack_data(user_id)
+        stat = pack_path.stat()
+    profiles = {name: data.presets[name] for name in sorted(data.presets)}
+    pack = PresetPack(data.version, profiles, stat.st_mtime_ns, stat.st_size, data.dir_mtime_ns)
+    pack_cache.put(key, pack)
+    return pack
+
+def pack_validator(user_id: str) -> tuple | None:
+    ##조건부 GET 검증자: 팩 파일 stat + 사용자 폴더 mtime (팩이 없으면 한 번 만듦)##
+    if not get_pack_path(user_id).exists():
+        load_preset_pack(user_id)
+    stat = file_validator(get_pack_path(user_id))
+    return (stat, get_preset_dir(user_id).stat().st_mtime_ns) if stat else None
+
+def preset_validator(user_id: str, preset_name: str) -> tuple | None:
+    return file_validator(get_preset_dir(user_id) / f"{preset_name}.json")
+
+@observe_io("preset")
+def save_preset(user_id: str, preset_name: str, profile: ToneProfile):
+    _update_pack(user_id, preset_name, profile)
+    preset_cache.invalidate((user_id, preset_name))
+    # 같은 이름으로 다시 저장되면 이전 프로필로 만든 변환 결과는 버림
+    conversion_cache.invalidate_tag(preset_tag(user_id, preset_name))
+
+@observe_io("preset")
+def load_preset_entry(user_id: str, preset_name: str) -> CachedPreset:
+    ##파일이 바뀌지 않았으면 디스크 읽기/검증 없이 캐시에서 반환##
     file_path = get_preset_dir(user_id) / f"{preset_name}.json"
-    if not file_path.exists():
+    key = (user_id, preset_name)
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        preset_cache.invalidate(key)
         raise FileNotFoundError("프리셋이 존재하지 않습니다.")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return ToneProfile(**json.load(f))
 
+    entry = preset_cache.get(key, stat.st_mtime_ns, stat.st_size)
+    if entry is not None:
+        return entry
+
+    profile = read_model(file_path, ToneProfile)
+    entry = CachedPreset(profile, render_profile_style(profile), profile_key(profile), stat.st_mtime_ns, stat.st_size)
+    preset_cache.put(key, entry)
+    return entry
+
+def load_preset(user_id: str, preset_name: str) -> ToneProfile:
+    return load_preset_entry(user_id, preset_name).profile
+
+@observe_io("preset")
 def list_presets(user_id: str) -> list[str]:
-    return [
-        file.stem
-        for file in get_preset_dir(user_id).glob("*.json")
-    ]
+    return list(load_preset_pack(user_id).profiles)
+
+def page_presets(user_id: str, fields: list[str] | None = None, offset: int = 0, limit: int | None = None) -> tuple[int, list[dict]]:
+    ##이름순 프리셋 전체 중 offset/limit 구간을 fields 만 남겨 반환 (전체 개수, 항목들)##
+    profiles = list(load_preset_pack(user_id).profiles.values())
+    end = None if limit is None else offset + limit
+    items = []
+    for profile in profiles[offset:end]:
+        # 이름은 항상 포함 (클라이언트가 항목을 구분하는 키)
+        items.append(profile.model_dump(include={"name", *fields}) if fields else profile.model_dump())
+    return len(profiles), items
 
+@observe_io("preset")
 def delete_preset(user_id: str, preset_name: str):
-    file_path = get_preset_dir(user_id) / f"{preset_name}.json"
-    if file_path.exists():
-        file_path.unlink()
+    _update_pack(user_id, preset_name, None)
+    preset_cache.invalidate((user_id, preset_name))
+    conversion_cache.invalidate_tag(preset_tag(user_id, preset_name))
@@ -0,0 +1,115 @@
+# services/preset_match.py
+# 로컬 프리셋 매칭 엔진
+# - 프로필마다 특징 벡터(문자 n-gram + 말투 표지)를 미리 계산해 두고
+# - 최근 대화에서 같은 방식으로 만든 벡터와 코사인 유사도로 순위를 매김
+import math
+import re
+from collections import Counter, OrderedDict
+from app.schemas import ToneProfile
+from app.services.cache import profile_key
+
+NGRAM_SIZES = (2, 3)
+# 말투 표지(존댓말, 웃음, 이모지 등)는 n-gram 보다 신호가 강하므로 가중치를 더 줌
+MARKER_WEIGHT = 3.0
+VECTOR_CACHE_SIZE = 256
+
+EMOJI_PATTERN = re.compile("[\U0001F300-\U0001FAFF☀-➿]")
+
+# 표지 이름 -> (대화 문장에서 찾을 패턴, 프로필 설명에서 찾을 키워드)
+MARKER_RULES: dict[str, tuple[re.Pattern, tuple[str, ...]]] = {
+    "honorific": (re.compile(r"(요|니다|세요|습니까|까요)[.!?~\s]*$"), ("존댓말", "정중", "공손", "격식")),
+    "casual": (re.compile(r"(야|어|지|냐|자|해|니|ㅇㅇ)[.!?~\s]*$"), ("반말", "친근", "편안")),
+    "laugh": (re.compile(r"[ㅋㅎ]{2,}"), ("ㅋㅋ", "ㅎㅎ", "웃음", "유머", "장난")),
+    "crying": (re.compile(r"[ㅠㅜ]{2,}"), ("ㅠㅠ", "귀여운", "애교")),
+    "emoji": (EMOJI_PATTERN, ("이모지", "이모티콘")),
+    "question": (re.compile(r"\?\s*$"), ("질문", "의문")),
+    "trailing": (re.compile(r"(\.\.|…|~)"), ("말끝 흐림", "말끝", "~")),
+    "abbrev": (re.compile(r"(^|\s)[ㄱ-ㅎ]{2,}($|\s)"), ("줄임말", "초성")),
+}
+
+FORMALITY_MARKERS = {
+    "높음": {"honorific": 1.0},
+    "중간": {"honorific": 0.5, "casual": 0.5},
+    "낮음": {"casual": 1.0},
+}
+
+_vector_cache: OrderedDict[str, dict[str, float]] = OrderedDict()
+
+def _ngrams(text: str) -> Counter:
+    grams: Counter = Counter()
+    compact = re.sub(r"\s+", " ", text.strip())
+    for n in NGRAM_SIZES:
+        for i in range(len(compact) - n + 1):
+            gram = compact[i:i + n]
+            if not gram.isspace():
+                grams[f"g:{gram}"] += 1
+    return grams
+
+def _normalize(grams: Counter) -> dict[str, float]:
+    ##n-gram 빈도를 길이 1로 정규화 (긴 대화가 유사도를 독차지하지 않도록)##
+    norm = math.sqrt(sum(v * v for v in grams.values()))
+    return {k: v / norm for k, v in grams.items()} if norm else {}
+
+def dialogue_vector(lines: list[str]) -> dict[str, float]:
+    lines = [line for line in lines if line.strip()]
+    vector = _normalize(_ngrams("\n".join(lines)))
+    if lines:
+        for marker, (pattern, _) in MARKER_RULES.items():
+            ratio = sum(1 for line in lines if pattern.search(line)) / len(lines)
+            if ratio:
+                vector[f"m:{marker}"] = ratio * MARKER_WEIGHT
+    return vector
+
+def profile_vector(profile: ToneProfile) -> dict[str, float]:
+    ##프로필 특징 벡터 (프로필 내용 해시 기준으로 캐시)##
+    key = profile_key(profile)
+    cached = _vector_cache.get(key)
+    if cached is not None:
+        _vector_cache.move_to_end(key)
+        return cached
+
+    descriptors = [
+        profile.tone, profile.emotion_tendency, profile.formality,
+        *profile.vocab_style, *profile.sentence_style,
+        *profile.expression_freq, *profile.intent_bias,
+    ]
+    # 예시 문장은 실제 대화 표면형과 직접 겹치므로 두 배로 반영
+    grams = _ngrams("\n".join(descriptors))
+    for gram, count in _ngrams("\n".join(profile.sample_phrases)).items():
+        grams[gram] += count * 2
+    vector = _normalize(grams)
+
+    description = " ".join(descriptors)
+    markers: dict[str, float] = dict(FORMALITY_MARKERS.get(profile.formality.strip(), {}))
+    for marker, (pattern, keywords) in MARKER_RULES.items():
+        score = 1.0 if any(keyword in description for keyword in keywords) else 0.0
+        if profile.sample_phrases:
+            sample_ratio = sum(1 for p in profile.sample_phrases if pattern.search(p)) / len(profile.sample_phrases)
+            score = max(score, sample_ratio)
+        markers[marker] = max(markers.get(marker, 0.0), score)
+    for marker, score in markers.items():
+        if score:
+            vector[f"m:{marker}"] = score * MARKER_WEIGHT
+
+    _vector_cache[key] = vector
+    while len(_vector_cache) > VECTOR_CACHE_SIZE:
+        _vector_cache.popitem(last=False)
+    return vector
+
+def cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(v * b.get(k, 0.0) for k, v in a.items())
+    norm_a = math.sqrt(sum(v * v for v in a.values()))
+    norm_b = math.sqrt(sum(v * v for v in b.values()))
+    return dot / (norm_a * norm_b) if norm_a and norm_b else 0.0
+
+def rank_presets(context_lines: list[str], profiles: dict[str, ToneProfile]) -> list[tuple[str, float]]:
+    ##프리셋 이름별 유사도를 높은 순으로 반환##
+    context = dialogue_vector(context_lines)
+    scores = [(name, cosine(context, profile_vector(profile))) for name, profile in profiles.items()]
+    return sorted(scores, key=lambda item: item[1], reverse=True)
+
+def is_ambiguous(ranked: list[tuple[str, float]], margin: float) -> bool:
+    ##1, 2위 점수 차이가 margin 보다 작으면 로컬에서 판단하기 어렵다고 봄##
+    return len(ranked) > 1 and ranked[0][1] - ranked[1][1] < margin
@@ -0,0 +1,150 @@
+# services/search_index.py
+# 사용자별 분석 결과 검색용 역색인 (manifest.sqlite3 안의 테이블을 사용)
+# - 한국어 부분 문자열 검색을 위해 문자 바이그램 단위로 색인
+# - 필드 원문도 함께 저장해 두고 후보를 원문으로 재확인하므로 결과 파일을 열지 않음
+# - 'tone:친근' 처럼 필드를 지정한 검색 지원
+import sqlite3
+import unicodedata
+from collections import Counter
+
+# 필드별 가중치 (이름/톤에서 맞으면 더 높은 순위)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tone": 3.0,
+    "emotion_tendency": 2.0,
+    "formality": 2.0,
+    "vocab_style": 1.5,
+    "sentence_style": 1.5,
+    "expression_freq": 1.0,
+    "intent_bias": 1.0,
+    "relationship_tendency": 1.0,
+    "sample_phrases": 1.5,
+    "notes": 1.0,
+    "ai_recommendation_tone": 1.0,
+}
+
+def create_tables(conn: sqlite3.Connection):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS search_fields ("
+        " idx INTEGER NOT NULL, field TEXT NOT NULL, text TEXT NOT NULL, PRIMARY KEY (idx, field))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS search_postings ("
+        " gram TEXT NOT NULL, idx INTEGER NOT NULL, field TEXT NOT NULL, tf INTEGER NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS search_postings_gram ON search_postings(gram, field)")
+    conn.execute("CREATE INDEX IF NOT EXISTS search_postings_idx ON search_postings(idx)")
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).lower()
+
+def bigrams(text: str) -> Counter:
+    grams: Counter = Counter()
+    for i in range(len(text) - 1):
+        gram = text[i:i + 2]
+        if not any(ch.isspace() for ch in gram):
+            grams[gram] += 1
+    return grams
+
+def _field_texts(data: dict) -> dict[str, str]:
+    ##프로필 dict 를 필드별 검색용 문자열로 변환##
+    texts = {}
+    for field in FIELD_WEIGHTS:
+        value = data.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            parts = []
+            for item in value:
+                if isinstance(item, dict):
+                    parts.append(" ".join(str(v) for v in item.values()))
+                else:
+                    parts.append(str(item))
+            value = "\n".join(parts)
+        texts[field] = normalize(str(value))
+    return texts
+
+def index_profile(conn: sqlite3.Connection, idx: int, data: dict):
+    ##한 결과의 색인을 새로 만듦 (기존 색인은 지움). 호출하는 쪽의 트랜잭션 안에서 실행##
+    remove(conn, idx)
+    for field, text in _field_texts(data).items():
+        conn.execute("INSERT INTO search_fields (idx, field, text) VALUES (?, ?, ?)", (idx, field, text))
+        conn.executemany(
+            "INSERT INTO search_postings (gram, idx, field, tf) VALUES (?, ?, ?, ?)",
+            [(gram, idx, field, tf) for gram, tf in bigrams(text).items()],
+        )
+
+def remove(conn: sqlite3.Connection, idx: int):
+    conn.execute("DELETE FROM search_fields WHERE idx = ?", (idx,))
+    conn.execute("DELETE FROM search_postings WHERE idx = ?", (idx,))
+
+def clear(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM search_fields")
+    conn.execute("DELETE FROM search_postings")
+
+def parse_query(query: str) -> list[tuple[str | None, str]]:
+    ##'tone:친근 반말' -> [('tone', '친근'), (None, '반말')]##
+    terms = []
+    for token in query.split():
+        field, sep, value = token.partition(":")
+        if sep and field in FIELD_WEIGHTS and value:
+            terms.append((field, normalize(value)))
+        else:
+            terms.append((None, normalize(token)))
+    return terms
+
+def _candidates(conn: sqlite3.Connection, field: str | None, value: str) -> set[int] | None:
+    ##바이그램 역색인으로 후보 결과 번호를 좁힘 (한 글자 검색어는 None -> 원문 전체 확인)##
+    grams = list(bigrams(value))
+    if not grams:
+        return None
+    candidates: set[int] | None = None
+    for gram in grams:
+        if field is None:
+            rows = conn.execute("SELECT DISTINCT idx FROM search_postings WHERE gram = ?", (gram,))
+        else:
+            rows = conn.execute("SELECT idx FROM search_postings WHERE gram = ? AND field = ?", (gram, field))
+        found = {row[0] for row in rows}
+        candidates = found if candidates is None else candidates & found
+        if not candidates:
+            return set()
+    return candidates
+
+def search(conn: sqlite3.Connection, query: str) -> list[tuple[int, float]]:
+    ##모든 검색어를 포함하는 결과를 (번호, 점수) 높은 순으로 반환##
+    terms = parse_query(query)
+    if not terms:
+        return []
+
+    scores: dict[int, float] | None = None
+    for field, value in terms:
+        candidates = _candidates(conn, field, value)
+        if candidates is not None and not candidates:
+            return []
+
+        sql = "SELECT idx, field, text FROM search_fields"
+        params: list = []
+        conditions = []
+        if field is not None:
+            conditions.append("field = ?")
+            params.append(field)
+        if candidates is not None:
+            conditions.append(f"idx IN ({','.join('?' * len(candidates))})")
+            params.extend(candidates)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        term_scores: dict[int, float] = {}
+        for idx, row_field, text in conn.execute(sql, params):
+            count = text.count(value)
+            if count:
+                term_scores[idx] = term_scores.get(idx, 0.0) + count * FIELD_WEIGHTS.get(row_field, 1.0)
+
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {idx: scores[idx] + score for idx, score in term_scores.items() if idx in scores}
+        if not scores:
+            return []
+
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,157 @@
+# services/staging.py
+# /analyze 결과를 /save 전까지 보관하는 임시 저장소
+# - MemoryResultStore: 프로세스 내, LRU + TTL + 메모리 사용량 상한
+# - SqliteResultStore: WAL 모드 SQLite 파일, 여러 uvicorn 워커가 같은 결과를 볼 수 있음
+# RESULT_STORE_BACKEND 설정으로 선택
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from app.schemas import ToneProfile
+from app.core.serialization import model_to_json, model_from_json
+from app.core.config import (
+    RESULT_STORE_BACKEND,
+    RESULT_STORE_PATH,
+    RESULT_STORE_TTL,
+    RESULT_STORE_MAX_ITEMS,
+    RESULT_STORE_MAX_BYTES,
+)
+
+def _encode(profile: ToneProfile) -> str:
+    return model_to_json(profile).decode("utf-8")
+
+class MemoryResultStore:
+    def __init__(self, ttl: float, max_items: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # user_id -> (expires_at, 직렬화 크기, 프로필)
+        self._entries: OrderedDict[str, tuple[float, int, ToneProfile]] = OrderedDict()
+
+    def set(self, user_id: str, profile: ToneProfile):
+        # 크기는 직렬화한 UTF-8 바이트 수로 근사
+        size = len(_encode(profile).encode("utf-8"))
+        with self._lock:
+            self._discard(user_id)
+            self._entries[user_id] = (time.time() + self.ttl, size, profile)
+            self.total_bytes += size
+            self._evict()
+
+    def get(self, user_id: str) -> ToneProfile | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._discard(user_id)
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[2]
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._discard(user_id)
+
+    def _discard(self, user_id: str):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def _evict(self):
+        now = time.time()
+        # 만료된 항목 먼저, 그다음 오래 안 쓴 항목부터 상한을 넘지 않을 때까지 제거
+        for user_id in [key for key, entry in self._entries.items() if entry[0] < now]:
+            self._discard(user_id)
+            self.evictions += 1
+        while self._entries and (len(self._entries) > self.max_items or self.total_bytes > self.max_bytes):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "items": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+class SqliteResultStore:
+    def __init__(self, path: str | Path, ttl: float, max_items: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_items = max_items
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS staged ("
+                " user_id TEXT PRIMARY KEY, payload TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, touched_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS staged_touched ON staged(touched_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def set(self, user_id: str, profile: ToneProfile):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO staged (user_id, payload, expires_at, touched_at) VALUES (?, ?, ?, ?)",
+                    (user_id, _encode(profile), now + self.ttl, now),
+                )
+                conn.execute("DELETE FROM staged WHERE expires_at < ?", (now,))
+                conn.execute(
+                    "DELETE FROM staged WHERE user_id IN ("
+                    " SELECT user_id FROM staged ORDER BY touched_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_items,),
+                )
+        finally:
+            conn.close()
+
+    def get(self, user_id: str) -> ToneProfile | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM staged WHERE user_id = ? AND expires_at >= ?", (user_id, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return model_from_json(ToneProfile, row[0]) if row else None
+
+    def delete(self, user_id: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM staged WHERE user_id = ?", (user_id,))
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        try:
+            items, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM staged").fetchone()
+        finally:
+            conn.close()
+        return {"backend": "sqlite", "items": items, "bytes": size, "max_items": self.max_items}
+
+def create_result_store(backend: str = RESULT_STORE_BACKEND):
+    if backend == "memory":
+        return MemoryResultStore(RESULT_STORE_TTL, RESULT_STORE_MAX_ITEMS, RESULT_STORE_MAX_BYTES)
+    if backend == "sqlite":
+        return SqliteResultStore(RESULT_STORE_PATH, RESULT_STORE_TTL, RESULT_STORE_MAX_ITEMS)
+    raise ValueError(f"Unknown RESULT_STORE_BACKEND: {backend}")
+
+result_store = create_result_store()
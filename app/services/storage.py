@@ -1,6 +1,9 @@
-import json
 from pathlib import Path
 from app.schemas import ToneProfile
+from app.services import manifest
+from app.core.metrics import observe_io
+from app.core.conditional import file_validator
+from app.core.serialization import model_to_json, read_model, write_model, verified_files
 
 BASE_DIR = Path("app/output").resolve()
 
@@ -10,67 +13,87 @@ def get_user_dir(user_id: str) -> Path:
     user_path.mkdir(parents=True, exist_ok=True)
     return user_path
 
+@observe_io("storage")
 def save_tone_profile(user_id: str, profile: ToneProfile) -> str:
     ##사용자별 폴더에 result_001.json, result_002.json 식으로 저장##
+    ##번호는 manifest 에서 원자적으로 할당##
     user_dir = get_user_dir(user_id)
-    existing_files = sorted(user_dir.glob("result_*.json"))
-    next_index = len(existing_files) + 1
-    file_path = user_dir / f"result_{next_index:03}.json"
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(profile.dict(), f, ensure_ascii=False, indent=2)
-    
+
+    def write_file(file_path: Path):
+        file_path.write_bytes(model_to_json(profile))
+
+    file_path = manifest.add_result(user_dir, profile, write_file)
     return str(file_path)
 
-def load_latest_profile(user_id: str) -> ToneProfile:
-    ##가장 최근 저장 파일 불러오기##
+def _latest_path(user_id: str) -> Path:
     user_dir = get_user_dir(user_id)
-    files = sorted(user_dir.glob("result_*.json"))
-    if not files:
+    latest = manifest.latest_filename(user_dir)
+    if latest is None:
         raise FileNotFoundError("저장된 분석 결과가 없습니다.")
-    
-    latest_file = files[-1]
-    with open(latest_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return ToneProfile(**data)
+    return user_dir / latest
+
+@observe_io("storage")
+def load_latest_profile(user_id: str) -> ToneProfile:
+    ##가장 최근 저장 파일 불러오기##
+    return read_model(_latest_path(user_id), ToneProfile)
+
+@observe_io("storage")
+def load_latest_profile_json(user_id: str) -> bytes:
+    ##가장 최근 저장 파일을 응답용 JSON 바이트로 (이미 검증한 파일이면 모델 변환 없이)##
+    return verified_files.read(_latest_path(user_id), ToneProfile)
 
+@observe_io("storage")
 def list_user_history(user_id: str, sort: str = "asc", query: str | None = None) -> list[str]:
     user_dir = get_user_dir(user_id)
-    files = sorted(user_dir.glob("result_*.json"))
 
-    # 정렬
-    if sort == "desc":
-        files = sorted(files, reverse=True)
-
-    # 검색
+    # 검색: 역색인에서 관련도 순으로 반환 ('tone:친근' 처럼 필드 지정 가능)
     if query:
-        filtered_files = []
-        for file in files:
-            with open(file, "r", encoding="utf-8") as f:
-                if query in f.read():
-                    filtered_files.append(file)
-        files = filtered_files
+        return manifest.search_filenames(user_dir, query)
 
-    return [file.name for file in files]
+    # 정렬 (manifest 에 저장 순서대로 들어 있음)
+    return manifest.list_filenames(user_dir, descending=(sort == "desc"))
 
 ## 파일 삭제 함수 추가 ##
+@observe_io("storage")
 def delete_profile(user_id: str, filename: str):
     file_path = get_user_dir(user_id) / filename
     if not file_path.exists():
         raise FileNotFoundError(f"{filename} 파일이 없습니다.")
     file_path.unlink()
+    manifest.remove_entry(get_user_dir(user_id), filename)
 
 ## 파일 업데이트 함수 추가 ##
+@observe_io("storage")
 def update_profile(user_id: str, filename: str, profile: ToneProfile):
     file_path = get_user_dir(user_id) / filename
     if not file_path.exists():
         raise FileNotFoundError(f"{filename} 파일이 없습니다.")
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(profile.dict(), f, ensure_ascii=False, indent=2)
+    # 새 파일로 교체해 inode 가 바뀌므로 조건부 GET 검증자도 바뀜
+    write_model(file_path, profile)
+    manifest.update_entry(get_user_dir(user_id), filename, profile)
 ## 파일 로드 함수 추가 ##
+@observe_io("storage")
 def load_profile(user_id: str, filename: str) -> ToneProfile:
     file_path = get_user_dir(user_id) / filename
     if not file_path.exists():
         raise FileNotFoundError(f"{filename} 파일이 없습니다.")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return ToneProfile(**json.load(f))
\ No newline at end of file
+    return read_model(file_path, ToneProfile)
+
+@observe_io("storage")
+def load_profile_json(user_id: str, filename: str) -> bytes:
+    file_path = get_user_dir(user_id) / filename
+    if not file_path.exists():
+        raise FileNotFoundError(f"{filename} 파일이 없습니다.")
+    return verified_files.read(file_path, ToneProfile)
+
+# 조건부 GET 검증자: JSON 을 읽지 않고 얻을 수 있는 값만 사용
+def latest_validator(user_id: str) -> tuple | None:
+    latest = manifest.latest_filename(get_user_dir(user_id))
+    stat = file_validator(get_user_dir(user_id) / latest) if latest else None
+    return (latest, stat) if stat else None
+
+def profile_validator(user_id: str, filename: str) -> tuple | None:
+    return file_validator(get_user_dir(user_id) / filename)
+
+def history_version(user_id: str) -> int:
+    return manifest.version(get_user_dir(user_id))
@@ -0,0 +1,180 @@
+# services/webapp.py
+# Flutter 웹 빌드(tone_web/build/web)를 API 와 같은 출처에서 제공하기 위한 준비
+# - 시작 시 빌드 파일 목록과 내용 해시를 만들고, 전체 해시로 빌드 ID 계산
+# - gzip/brotli 압축본을 캐시 폴더에 미리 만들어 두고 요청의 Accept-Encoding 으로 고름
+# - index.html 의 <base href> 를 {경로}/_v/{빌드 ID}/ 로 바꿔서 제공
+#   -> Flutter 파일 이름에는 해시가 없지만, 이 경로 아래 자산은 빌드가 바뀌면 URL 이 바뀌므로 immutable 캐시 가능
+#
+# 빌드 시점에 미리 압축: python -m app.services.webapp [빌드 폴더]
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import sys
+from pathlib import Path
+from typing import NamedTuple
+from app.core.config import WEB_APP_DIR, WEB_APP_PATH, WEB_APP_CACHE_DIR
+
+try:
+    import brotli
+except ImportError:  # brotli 가 없으면 gzip 만 만듦 (빌드 폴더에 미리 만든 .br 이 있으면 그것은 사용)
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# 압축 효과가 있는 파일 (이미지처럼 이미 압축된 형식은 제외, NOTICES 처럼 확장자 없는 텍스트 포함)
+# 디버깅용 .symbols/.map 은 브라우저가 받지 않으므로 압축 시간만 들어서 제외
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".wasm", ".json", ".html", ".css", ".svg", ".txt", ".otf", ".ttf", ".frag", ".bin", ""}
+MIN_COMPRESS_SIZE = 1024
+# 원본 대비 이 비율보다 작아질 때만 압축본 사용
+MAX_COMPRESSED_RATIO = 0.9
+# 선호 순서
+ENCODINGS = ("br", "gzip")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+BASE_HREF = re.compile(rb'<base href="[^"]*">')
+
+mimetypes.add_type("application/wasm", ".wasm")
+mimetypes.add_type("font/otf", ".otf")
+mimetypes.add_type("text/javascript", ".js")
+
+class WebAsset(NamedTuple):
+    path: Path
+    media_type: str
+    etag: str
+    # 인코딩 -> 압축본 경로 (압축이 끝나면 채워짐)
+    variants: dict[str, Path]
+
+def _media_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def parse_accept_encoding(header: str) -> set[str]:
+    ##Accept-Encoding 에서 받을 수 있는(q>0) 인코딩 집합##
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.add(name)
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+class WebBuild:
+    ##빌드 폴더의 파일 목록(상대 경로 -> WebAsset)과 압축본 관리, 목록에 있는 파일만 제공##
+    def __init__(self, root: str | Path, cache_dir: str | Path, mount_path: str):
+        self.root = Path(root)
+        self.cache_dir = Path(cache_dir)
+        self.mount_path = mount_path.rstrip("/")
+        self.build_id = ""
+        self.assets: dict[str, WebAsset] = {}
+
+    @property
+    def base_href(self) -> str:
+        return f"{self.mount_path}/_v/{self.build_id}/"
+
+    def scan(self):
+        ##파일 목록/해시/빌드 ID 계산, index.html 은 base href 를 바꾼 사본으로 대체##
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        assets: dict[str, WebAsset] = {}
+        build_digest = hashlib.sha256()
+        for path in sorted(self.root.rglob("*")):
+            relative = path.relative_to(self.root).as_posix()
+            if not path.is_file() or any(part.startswith(".") for part in Path(relative).parts):
+                continue
+            # 빌드 때 미리 만든 압축본은 원본의 변형으로만 사용
+            if path.suffix in (".gz", ".br") and path.with_suffix("").is_file():
+                continue
+            content_hash = _file_hash(path)
+            build_digest.update(f"{relative}\0{content_hash}\0".encode())
+            variants = {
+                encoding: path.with_name(path.name + suffix)
+                for encoding, suffix in ENCODING_SUFFIXES.items()
+                if path.with_name(path.name + suffix).is_file()
+            }
+            assets[relative] = WebAsset(path, _media_type(path.name), content_hash[:20], variants)
+        self.build_id = build_digest.hexdigest()[:12]
+
+        index = assets.get("index.html")
+        if index is not None:
+            html = BASE_HREF.sub(f'<base href="{self.base_href}">'.encode(), index.path.read_bytes())
+            content_hash = hashlib.sha256(html).hexdigest()
+            index_path = self.cache_dir / f"{content_hash}.html"
+            if not index_path.exists():
+                _write_atomic(index_path, html)
+            assets["index.html"] = WebAsset(index_path, index.media_type, content_hash[:20], {})
+        self.assets = assets
+        logger.info(f"웹 빌드 {self.build_id}: 파일 {len(assets)}개 ({self.root})")
+
+    def precompress(self):
+        ##압축본이 없는 파일의 gzip/brotli 사본을 캐시 폴더에 생성 (내용 해시로 이름을 정해 재시작해도 재사용)##
+        encodings = [encoding for encoding in ENCODINGS if encoding != "br" or brotli is not None]
+        created = 0
+        for relative, asset in list(self.assets.items()):
+            size = asset.path.stat().st_size
+            if asset.path.suffix not in COMPRESSIBLE_SUFFIXES or size < MIN_COMPRESS_SIZE:
+                continue
+            data = None
+            for encoding in encodings:
+                if encoding in asset.variants:
+                    continue
+                variant_path = self.cache_dir / f"{asset.etag}{ENCODING_SUFFIXES[encoding]}"
+                # 압축 효과가 없었던 파일은 빈 표시 파일만 남김
+                skip_path = variant_path.with_name(variant_path.name + ".skip")
+                if skip_path.exists():
+                    continue
+                if not variant_path.exists():
+                    data = data if data is not None else asset.path.read_bytes()
+                    compressed = _compress(data, encoding)
+                    if len(compressed) > size * MAX_COMPRESSED_RATIO:
+                        skip_path.touch()
+                        continue
+                    _write_atomic(variant_path, compressed)
+                    created += 1
+                asset.variants[encoding] = variant_path
+        logger.info(f"웹 빌드 {self.build_id}: 압축본 {created}개 생성")
+
+    def lookup(self, relative: str) -> WebAsset | None:
+        return self.assets.get(relative)
+
+    def choose(self, asset: WebAsset, accept_encoding: str) -> tuple[Path, str | None]:
+        ##Accept-Encoding 에 맞는 (파일 경로, Content-Encoding) 선택##
+        accepted = parse_accept_encoding(accept_encoding) if asset.variants else set()
+        for encoding in ENCODINGS:
+            if encoding in accepted and encoding in asset.variants:
+                return asset.variants[encoding], encoding
+        return asset.path, None
+
+web_build = WebBuild(WEB_APP_DIR or "tone_web/build/web", WEB_APP_CACHE_DIR, WEB_APP_PATH)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        web_build.root = Path(sys.argv[1])
+    logging.basicConfig(level=logging.INFO)
+    web_build.scan()
+    web_build.precompress()
@@ -1,17 +1,20 @@
 import re
 from datetime import datetime, timedelta
+from typing import BinaryIO
+from app.utils.files import iter_lines_reverse
 
 MAX_LINES = 200
 MAX_DAYS = 3
 
+# 카카오톡 날짜 구분선 예: "--------------- 2024년 4월 10일 수요일 ---------------"
+date_pattern = re.compile(r"-{3,}\s*(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일.*-{3,}")
+
 def cut_dialogue_by_date(dialogue: list[str]) -> list[str]:
     date_blocks = []
     current_block = []
     current_date = None
     has_date = False
 
-    date_pattern = re.compile(r"---\s*(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일.*---")
-
     for line in dialogue:
         match = date_pattern.match(line.strip())
         if match:
@@ -34,3 +37,41 @@ def cut_dialogue_by_date(dialogue: list[str]) -> list[str]:
     recent_blocks = [block for date, block in date_blocks if date >= cutoff]
     flat = [line for block in recent_blocks for line in block]
     return flat[-MAX_LINES:]
+
+# 대화 내보내기 파일을 끝에서부터 읽으며 잘라내는 함수 (업로드용)
+# - 날짜 구분선 아래의 줄은 그 날짜에 속함
+# - MAX_DAYS 보다 오래된 날짜 구분선을 만나면 바로 중단
+# - 보관하는 줄은 최대 MAX_LINES 개라서 파일 크기와 관계없이 메모리 사용량이 일정함
+def cut_dialogue_from_file(f: BinaryIO, max_lines: int = MAX_LINES, max_days: int = MAX_DAYS) -> list[str]:
+    cutoff = datetime.now() - timedelta(days=max_days)
+    accepted: list[str] = []   # 날짜가 확인된 줄 (역순)
+    pending: list[str] = []    # 아직 날짜 구분선을 못 만난 줄 (역순)
+    has_date = False
+
+    for raw_line in iter_lines_reverse(f):
+        line = raw_line.decode("utf-8", errors="replace").lstrip("﻿")
+        match = date_pattern.match(line.strip())
+        if not match:
+            if not line.strip():
+                continue
+            # 상한을 넘는 줄은 날짜 확인을 위해 스캔만 하고 보관하지 않음
+            if len(accepted) + len(pending) < max_lines:
+                pending.append(line)
+            continue
+
+        has_date = True
+        year, month, day = map(int, match.groups())
+        if datetime(year, month, day) < cutoff:
+            pending = []
+            break
+        accepted.extend(pending)
+        pending = []
+        if len(accepted) >= max_lines:
+            break
+
+    # 날짜 구분선이 없는 파일이거나 첫 구분선 위쪽의 줄
+    accepted.extend(pending)
+    if not has_date:
+        accepted = accepted[:max_lines]
+    accepted.reverse()
+    return accepted[-max_lines:]
@@ -0,0 +1,62 @@
+# utils/files.py
+# 파일 잠금, 원자적 쓰기, 역방향 줄 읽기 도우미
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+@contextmanager
+def locked(path: Path):
+    ##path 옆의 .lock 파일로 프로세스/스레드 간 배타 잠금##
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if os.name == "nt":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    ##임시 파일에 쓴 뒤 교체해서, 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 함##
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+def iter_lines_reverse(f: BinaryIO, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    ##바이너리 파일을 끝에서부터 블록 단위로 읽어 줄을 역순으로 반환 (줄바꿈 제외, 빈 줄 포함)##
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    buffer = b""
+    while position > 0:
+        size = min(block_size, position)
+        position -= size
+        f.seek(position)
+        buffer = f.read(size) + buffer
+        lines = buffer.split(b"\n")
+        # 첫 조각은 앞 블록과 이어질 수 있으므로 남겨 둠 (UTF-8 에서 0x0A 는 항상 줄바꿈)
+        buffer = lines.pop(0)
+        for line in reversed(lines):
+            yield line.rstrip(b"\r")
+    yield buffer.rstrip(b"\r")
@@ -0,0 +1,36 @@
+# utils/sse.py
+# Server-Sent Events 응답 도우미
+import json
+import logging
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+error_logger = logging.getLogger('error')
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # 프록시(nginx 등)가 응답을 모아서 보내지 않도록 버퍼링 해제
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(event: str, data: object) -> str:
+    ##이벤트 하나를 SSE 텍스트 형식으로 직렬화 (문자열은 {"text": ...} 로 감쌈)##
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    elif isinstance(data, str):
+        data = {"text": data}
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def sse_response(events: AsyncIterator[tuple[str, object]]) -> StreamingResponse:
+    ##(이벤트 이름, 데이터) 비동기 이터레이터를 SSE 스트리밍 응답으로 변환##
+    async def body():
+        try:
+            async for event, data in events:
+                yield format_sse(event, data)
+        except Exception as e:
+            # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 error 이벤트로 알림
+            error_logger.error(f"Streaming failed: {str(e)}", exc_info=True)
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,73 @@
+# benchmarks/bench_dialogue.py
+# 대화 자르기 벤치마크: 기존 cut_dialogue_by_date(전체 리스트) vs cut_dialogue_from_file(역방향 스캔)
+# 잘라낸 대화를 토큰 예산으로 압축했을 때의 추정 토큰 수도 출력
+#
+# 실행: python -m benchmarks.bench_dialogue [--lines 100000] [--days 100]
+import argparse
+import io
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from app.utils.dialogue import cut_dialogue_by_date, cut_dialogue_from_file
+from app.services.compaction import compact_dialogue, estimate_tokens
+
+def make_export(lines: int, days: int) -> bytes:
+    ##오늘로 끝나는 days 일치 합성 카카오톡 내보내기 (총 lines 줄)##
+    per_day = max(1, lines // days)
+    start = datetime.now() - timedelta(days=days - 1)
+    out = io.StringIO()
+    out.write("홍길동 님과 카카오톡 대화\n저장한 날짜 : 2025-04-21 12:00:00\n\n")
+    written = 0
+    for d in range(days):
+        date = start + timedelta(days=d)
+        out.write(f"--------------- {date.year}년 {date.month}월 {date.day}일 ---------------\n")
+        for i in range(per_day):
+            speaker = "나" if i % 2 else "친구"
+            out.write(f"[{speaker}] [오후 {i % 12 + 1}:{i % 60:02}] 오늘 뭐해? ㅋㅋ 메시지 {written}\n")
+            written += 1
+            if written >= lines:
+                break
+    return out.getvalue().encode("utf-8")
+
+def measure(label: str, fn, repeat: int):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed * 1000:9.2f} ms/run   peak {peak / 1024 / 1024:7.2f} MiB   lines={len(result)}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_export(args.lines, args.days)
+    print(f"synthetic export: {args.lines} lines, {args.days} days, {len(data) / 1024 / 1024:.1f} MiB")
+
+    # 기존 경로: 전체를 디코딩해 리스트로 만든 뒤 자름 (JSON 요청으로 받는 것과 같은 형태)
+    legacy = measure(
+        "cut_dialogue_by_date (list)",
+        lambda: cut_dialogue_by_date(data.decode("utf-8").splitlines()),
+        args.repeat,
+    )
+    streamed = measure(
+        "cut_dialogue_from_file (reverse)",
+        lambda: cut_dialogue_from_file(io.BytesIO(data)),
+        args.repeat,
+    )
+    # 기존 함수는 구분선 사이 블록에 다음 구분선 날짜를 붙이므로 경계 하루치는 다를 수 있음
+    print(f"same last line: {legacy[-1:] == streamed[-1:]}")
+
+    compacted = measure("compact_dialogue", lambda: compact_dialogue(streamed), args.repeat)
+    before = sum(estimate_tokens(line) for line in streamed)
+    after = sum(estimate_tokens(line) for line in compacted)
+    print(f"estimated tokens: {before} -> {after}")
+
+if __name__ == "__main__":
+    main()
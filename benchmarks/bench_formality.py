@@ -0,0 +1,80 @@
+# benchmarks/bench_formality.py
+# 격식 전환 로컬 빠른 경로 측정 (benchmarks/formality_corpus.jsonl)
+# - coverage: 신뢰도 기준을 넘어 로컬로 처리한 비율
+# - agreement: 로컬 처리한 문장 중 기준 문장(expected)과 같은 비율 (공백/문장부호 무시)
+# - --live: 실제 Gemini 로 같은 문장을 변환해 로컬 결과와 일치율 측정 (GEMINI_API_KEY 필요, 할당량 사용)
+#
+# 실행: python -m benchmarks.bench_formality [--min-confidence 0.85] [--live] [--verbose]
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from app.services.formality import target_from_tone, transform
+
+CORPUS_PATH = Path(__file__).with_name("formality_corpus.jsonl")
+
+def load_corpus(path: Path = CORPUS_PATH) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def normalize(text: str) -> str:
+    return re.sub(r"[\s.,!?~]+", "", text)
+
+def evaluate(corpus: list[dict], min_confidence: float) -> dict:
+    ##로컬 변환기의 처리 비율/기준 문장 일치율 계산##
+    rows = []
+    started = time.perf_counter()
+    for item in corpus:
+        result = transform(item["text"], target_from_tone(item["target_tone"]))
+        rows.append((item, result))
+    elapsed = time.perf_counter() - started
+
+    local = [(item, result) for item, result in rows if result.confidence >= min_confidence]
+    agreed = [(item, result) for item, result in local if normalize(result.text) == normalize(item["expected"])]
+    return {
+        "total": len(rows),
+        "local": len(local),
+        "agreed": len(agreed),
+        "coverage": len(local) / len(rows) if rows else 0.0,
+        "agreement": len(agreed) / len(local) if local else 0.0,
+        "us_per_item": elapsed / max(1, len(rows)) * 1e6,
+        "rows": rows,
+    }
+
+async def live_agreement(rows: list[tuple[dict, object]]) -> float:
+    ##로컬로 처리한 문장을 Gemini 로도 변환해 일치율 계산##
+    from app.services.convert import build_tone_prompt
+    from app.services.llm import generate_text
+
+    outputs = await asyncio.gather(*(
+        generate_text(build_tone_prompt(item["text"], item["target_tone"]), call_site="bench_formality")
+        for item, _ in rows
+    ))
+    matches = sum(normalize(output) == normalize(result.text) for (_, result), output in zip(rows, outputs))
+    return matches / len(rows) if rows else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-confidence", type=float, default=0.85)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    report = evaluate(load_corpus(), args.min_confidence)
+    print(f"corpus: {report['total']} sentences, min confidence {args.min_confidence}")
+    print(f"local coverage  {report['coverage'] * 100:5.1f}% ({report['local']}/{report['total']})")
+    print(f"agreement       {report['agreement'] * 100:5.1f}% ({report['agreed']}/{report['local']}) vs reference")
+    print(f"latency         {report['us_per_item']:7.1f} us/sentence")
+    if args.verbose:
+        for item, result in report["rows"]:
+            mark = "L" if result.confidence >= args.min_confidence else "-"
+            same = "=" if normalize(result.text) == normalize(item["expected"]) else "x"
+            print(f"  {mark}{same} {result.confidence:.2f}  {item['text']} -> {result.text}  (expected: {item['expected']})")
+    if args.live:
+        local_rows = [(item, result) for item, result in report["rows"] if result.confidence >= args.min_confidence]
+        print(f"live agreement  {asyncio.run(live_agreement(local_rows)) * 100:5.1f}% vs Gemini")
+
+if __name__ == "__main__":
+    main()
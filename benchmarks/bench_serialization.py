@@ -0,0 +1,99 @@
+# benchmarks/bench_serialization.py
+# 직렬화 경로 마이크로 벤치마크: 예전 방식(json + indent=2 + dict 를 거치는 model_dump/model_validate + FastAPI 응답 직렬화)과
+# app/core/serialization.py 방식을 같은 프로필로 비교 (임시 폴더 사용)
+#
+# 실행: python -m benchmarks.bench_serialization [--repeat 5000]
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from fastapi.responses import JSONResponse
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from app.schemas import ToneProfile
+from app.core import serialization
+from app.core.serialization import FastJSONResponse, dumps, loads, model_from_json, model_to_json, read_model, verified_files
+from app.services.preset import PackFile
+
+def bench(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+def compare(label: str, old, new, repeat: int):
+    old_time, new_time = bench(old, repeat), bench(new, repeat)
+    print(f"{label:<34} {old_time * 1e6:9.1f} us {new_time * 1e6:9.1f} us {old_time / new_time:7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="tone_bench_"))
+    # 실제 저장 결과에 가깝게 목록 필드를 조금 늘림
+    profile = ToneProfile.model_validate(dict(
+        DEFAULT_PROFILE,
+        sample_phrases=[f"예시 문장 {i} ㅋㅋ 진짜?" for i in range(10)],
+        notes="관찰된 말투 특징 요약입니다. " * 10,
+    ))
+    old_path, new_path = data_dir / "old.json", data_dir / "new.json"
+
+    def old_write():
+        with open(old_path, "w", encoding="utf-8") as f:
+            json.dump(profile.model_dump(), f, ensure_ascii=False, indent=2)
+
+    def old_read() -> ToneProfile:
+        with open(old_path, "r", encoding="utf-8") as f:
+            return ToneProfile.model_validate(json.load(f))
+
+    def old_response() -> bytes:
+        # FastAPI response_model 경로: 모델 -> dict -> 재검증 -> JSON 모드 dict -> json.dumps
+        loaded = old_read()
+        content = ToneProfile.model_validate(loaded.model_dump()).model_dump(mode="json")
+        return JSONResponse(content).body
+
+    def new_response() -> bytes:
+        return FastJSONResponse(verified_files.read(new_path, ToneProfile)).body
+
+    old_write()
+    new_path.write_bytes(model_to_json(profile))
+    assert old_read() == read_model(new_path, ToneProfile)
+    assert json.loads(old_response()) == json.loads(new_response())
+    print(f"orjson: {'yes' if serialization.orjson is not None else 'no (stdlib json fallback)'}")
+    print(f"file size: indent=2 {old_path.stat().st_size} B, compact {new_path.stat().st_size} B")
+    print(f"{'':<34} {'old':>12} {'new':>12} {'speedup':>8}")
+
+    compare("encode profile", lambda: json.dumps(profile.model_dump(), ensure_ascii=False, indent=2).encode("utf-8"),
+            lambda: model_to_json(profile), args.repeat)
+    text = old_path.read_bytes()
+    compact = new_path.read_bytes()
+    compare("decode + validate profile", lambda: ToneProfile.model_validate(json.loads(text)),
+            lambda: ToneProfile.model_validate_json(compact), args.repeat)
+    compare("save profile file", old_write, lambda: new_path.write_bytes(model_to_json(profile)), args.repeat)
+    compare("load profile file", old_read, lambda: read_model(new_path, ToneProfile), args.repeat)
+    compare("GET /load body (verified file)", old_response, new_response, args.repeat)
+
+    pack = PackFile(version=1, presets={f"preset{i}": profile for i in range(50)})
+    pack_text = model_to_json(pack)
+
+    def old_pack_decode() -> dict:
+        data = json.loads(pack_text)
+        return {name: ToneProfile.model_validate(item) for name, item in data["presets"].items()}
+
+    compare("preset pack encode (50)",
+            lambda: json.dumps(pack.model_dump(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            lambda: model_to_json(pack), args.repeat // 10)
+    compare("preset pack decode + validate (50)", old_pack_decode,
+            lambda: model_from_json(PackFile, pack_text), args.repeat // 10)
+
+    record = {"text": "히스토리 메시지 하나 😊", "ts": time.time()}
+    line = dumps(record)
+    compare("history line encode", lambda: (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"),
+            lambda: dumps(record) + b"\n", args.repeat)
+    compare("history line decode", lambda: json.loads(line), lambda: loads(line), args.repeat)
+    print(json.dumps({"verified_files": verified_files.stats()}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+# 콜드 스타트 측정: 새 프로세스에서 app.main import 시간, 첫 /health 응답까지 시간,
+# Gemini SDK 지연 로드 시간(실제 SDK, 네트워크 호출 없음)을 재고 예산을 넘으면 종료 코드 1
+#
+# 실행: python -m benchmarks.bench_startup [--runs 5] [--import-budget-ms 1000] [--ready-budget-ms 1200]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return (await client.get("/health")).status_code
+
+status = asyncio.run(first_request())
+ready = time.perf_counter()
+sdk_loaded_at_import = "google.generativeai" in sys.modules
+
+from app.services.llm import model_registry
+model_registry.api_key = model_registry.api_key or "bench-key"
+sdk_started = time.perf_counter()
+model_registry.load()
+sdk_loaded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "ready_ms": (ready - started) * 1000,
+    "sdk_ms": (sdk_loaded - sdk_started) * 1000,
+    "sdk_loaded_at_import": sdk_loaded_at_import,
+    "status": status,
+}))
+"""
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--ready-budget-ms", type=float, default=1200)
+    args = parser.parse_args()
+
+    env = dict(os.environ, LLM_PREWARM="off", PYTHONPATH=os.getcwd())
+    results = [run_once(env) for _ in range(args.runs)]
+    summary = {key: statistics.median(r[key] for r in results) for key in ("import_ms", "ready_ms", "sdk_ms")}
+
+    print(f"runs: {args.runs} (median)")
+    print(f"import app.main      {summary['import_ms']:8.1f} ms   budget {args.import_budget_ms:.0f} ms")
+    print(f"first /health        {summary['ready_ms']:8.1f} ms   budget {args.ready_budget_ms:.0f} ms")
+    print(f"lazy Gemini SDK load {summary['sdk_ms']:8.1f} ms   (paid on first LLM call or by prewarm)")
+    print(f"SDK imported at startup: {any(r['sdk_loaded_at_import'] for r in results)}")
+
+    over = summary["import_ms"] > args.import_budget_ms or summary["ready_ms"] > args.ready_budget_ms
+    if over or any(r["sdk_loaded_at_import"] for r in results):
+        print("startup budget exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
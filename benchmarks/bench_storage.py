@@ -0,0 +1,58 @@
+# benchmarks/bench_storage.py
+# 파일 기반 서비스 함수 마이크로 벤치마크 (임시 폴더 사용, 실제 app/output 은 건드리지 않음)
+#
+# 실행: python -m benchmarks.bench_storage [--results 300] [--repeat 200]
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from benchmarks.harness import prepare_app
+from benchmarks.bench_dialogue import make_export
+
+def bench(label: str, fn, repeat: int):
+    fn()  # 준비 호출 (manifest 생성 등)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{label:<40} {per_call * 1e6:10.1f} us/call")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=300, help="미리 저장해 둘 분석 결과 수")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="tone_bench_"))
+    prepare_app(data_dir, users=("bench",))
+
+    from app.schemas import ToneProfile
+    from app.services import storage, preset, history
+    from app.utils.dialogue import cut_dialogue_by_date
+
+    profile = ToneProfile.model_validate(DEFAULT_PROFILE)
+    for i in range(args.results):
+        storage.save_tone_profile("bench", ToneProfile.model_validate(dict(DEFAULT_PROFILE, tone=f"친근한 {i}")))
+    print(f"seeded {args.results} saved results in {data_dir}")
+
+    dialogue = make_export(2_000, 10).decode("utf-8").splitlines()
+    bench("cut_dialogue_by_date (2k lines)", lambda: cut_dialogue_by_date(dialogue), args.repeat)
+    bench("save_tone_profile", lambda: storage.save_tone_profile("bench", profile), args.repeat)
+    bench("load_latest_profile", lambda: storage.load_latest_profile("bench"), args.repeat)
+    bench("load_profile", lambda: storage.load_profile("bench", "result_001.json"), args.repeat)
+    bench("list_user_history", lambda: storage.list_user_history("bench", "desc"), args.repeat)
+    bench("list_user_history (query)", lambda: storage.list_user_history("bench", query="tone:친근한 1"), args.repeat)
+    bench("update_profile", lambda: storage.update_profile("bench", "result_001.json", profile), args.repeat)
+    bench("load_preset", lambda: preset.load_preset("bench", "friend"), args.repeat)
+    bench("list_presets", lambda: preset.list_presets("bench"), args.repeat)
+    bench("page_presets (expand)", lambda: preset.page_presets("bench"), args.repeat)
+    bench("save_preset", lambda: preset.save_preset("bench", "saved", profile), args.repeat)
+    bench("append_history", lambda: history.append_history("bench", "메시지 하나"), args.repeat)
+    bench("read_history", lambda: history.read_history("bench"), args.repeat)
+    bench("read_history (limit 20)", lambda: history.read_history("bench", limit=20), args.repeat)
+    print(json.dumps({"preset_cache": preset.preset_cache.stats(), "pack_cache": preset.pack_cache.stats()}, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
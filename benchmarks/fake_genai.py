@@ -0,0 +1,142 @@
+# benchmarks/fake_genai.py
+# google.generativeai 로컬 대역 (API 할당량 없이 처리량/지연 측정용)
+# - 지연(latency), 흔들림(jitter), 오류율(error_rate), 미리 정한 JSON/텍스트 응답을 설정 가능
+# - install() 을 app 모듈 import 전에 호출하면 sys.modules 에 끼워 넣음
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+
+DEFAULT_PROFILE = {
+    "name": "벤치마크 말투",
+    "tone": "친근한",
+    "emotion_tendency": "긍정적",
+    "formality": "낮음",
+    "vocab_style": ["줄임말", "ㅋㅋ"],
+    "sentence_style": ["짧은 문장", "이모지 사용"],
+    "expression_freq": ["감탄사 많음"],
+    "intent_bias": ["리액션형"],
+    "relationship_tendency": [{"context": "친구", "tone": "반말 + 유쾌함"}],
+    "sample_phrases": ["와 진짜 대박!", "고마워~"],
+    "notes": "벤치마크용 가짜 응답입니다.",
+    "ai_recommendation_tone": "반말과 유머가 섞인 톤을 추천합니다.",
+}
+
+@dataclass
+class FakeSettings:
+    latency: float = 0.5          # 평균 응답 시간(초)
+    jitter: float = 0.1           # latency 에 더해지는 ±jitter 균등 분포
+    error_rate: float = 0.0       # 0~1, 이 확률로 ServiceUnavailable 발생
+    stream_chunks: int = 8        # 스트리밍 응답 조각 수
+    profile: dict = field(default_factory=lambda: dict(DEFAULT_PROFILE))
+    text: str = "변환된 문장이에요 😊"
+    seed: int | None = None
+
+settings = FakeSettings()
+calls = {"sync": 0, "async": 0, "stream": 0, "errors": 0}
+_calls_lock = threading.Lock()
+_random = random.Random()
+
+def _count(kind: str):
+    with _calls_lock:
+        calls[kind] += 1
+
+def _delay() -> float:
+    return max(0.0, settings.latency + _random.uniform(-settings.jitter, settings.jitter))
+
+def _maybe_fail():
+    if settings.error_rate and _random.random() < settings.error_rate:
+        _count("errors")
+        try:
+            from google.api_core.exceptions import ServiceUnavailable
+        except ImportError:
+            raise RuntimeError("fake genai: injected failure")
+        raise ServiceUnavailable("fake genai: injected failure")
+
+def _answer(prompt: str) -> str:
+    ##프롬프트 종류에 맞는 응답 생성 (분석 -> 프로필 JSON, 배치 -> 번호별 JSON, 그 외 -> 문장)##
+    if "JSON 형식" in prompt or '"ai_recommendation_tone"' in prompt:
+        return json.dumps(settings.profile, ensure_ascii=False)
+    if "입력 문장(JSON):" in prompt:
+        numbered = json.loads(prompt.split("입력 문장(JSON):", 1)[1].strip())
+        return json.dumps({key: settings.text for key in numbered}, ensure_ascii=False)
+    if "프리셋 이름만" in prompt:
+        for line in prompt.splitlines():
+            if line.startswith("- 프리셋 이름:"):
+                return line.split(":", 1)[1].strip()
+    return settings.text
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeAsyncStream:
+    def __init__(self, text: str):
+        size = max(1, len(text) // max(1, settings.stream_chunks))
+        self._parts = [text[i:i + size] for i in range(0, len(text), size)]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        # 전체 지연을 조각 수로 나눠 첫 조각이 빨리 오도록 함
+        step = _delay() / max(1, len(self._parts))
+        for part in self._parts:
+            await asyncio.sleep(step)
+            yield FakeResponse(part)
+
+class GenerativeModel:
+    def __init__(self, model_name: str = "fake-model", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, **kwargs):
+        _count("sync")
+        time.sleep(_delay())
+        _maybe_fail()
+        return FakeResponse(_answer(str(contents)))
+
+    async def generate_content_async(self, contents, *, stream: bool = False, **kwargs):
+        if stream:
+            _count("stream")
+            _maybe_fail()
+            return FakeAsyncStream(_answer(str(contents)))
+        _count("async")
+        await asyncio.sleep(_delay())
+        _maybe_fail()
+        return FakeResponse(_answer(str(contents)))
+
+def configure(**kwargs):
+    pass
+
+def install(new_settings: FakeSettings | None = None) -> FakeSettings:
+    ##sys.modules 에 대역 모듈을 등록하고 설정을 반환 (app import 전에 호출)##
+    global settings
+    if new_settings is not None:
+        settings = new_settings
+    if settings.seed is not None:
+        _random.seed(settings.seed)
+
+    module = types.ModuleType("google.generativeai")
+    module.configure = configure
+    module.GenerativeModel = GenerativeModel
+    module.__fake__ = True
+
+    if "google" not in sys.modules:
+        try:
+            import google  # noqa: F401  (google-api-core 등이 설치된 경우)
+        except ImportError:
+            parent = types.ModuleType("google")
+            parent.__path__ = []
+            sys.modules["google"] = parent
+    sys.modules["google.generativeai"] = module
+    sys.modules["google"].generativeai = module
+    return settings
+
+def reset_calls():
+    with _calls_lock:
+        for key in calls:
+            calls[key] = 0
@@ -0,0 +1,48 @@
+# benchmarks/harness.py
+# 벤치마크/테스트 공용: 가짜 Gemini 를 설치하고 임시 데이터 폴더를 쓰는 앱을 준비
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+from benchmarks import fake_genai
+from benchmarks.fake_genai import FakeSettings, DEFAULT_PROFILE, install
+
+PRESET_NAMES = ("friend", "business", "lover")
+
+def prepare_app(data_dir: Path, fake: FakeSettings | None = None, users: tuple[str, ...] = ("bench",),
+                rate_limits: dict[str, tuple[float, int]] | None = None,
+                patch: Callable[[Any, str, Any], None] = setattr):
+    ##가짜 Gemini 설치 -> app import -> 저장 경로를 data_dir 아래로 돌림 -> 프리셋 준비##
+    ##벤치마크는 적은 user_id 로 많은 클라이언트를 흉내내므로 사용자별 한도는 rate_limits 를 줄 때만 적용##
+    ##patch: 모듈 전역을 바꾸는 함수 (테스트는 monkeypatch.setattr 을 넘겨 테스트가 끝나면 되돌림)##
+    if fake is not None:
+        patch(fake_genai, "settings", fake)
+    install()
+    os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+
+    from app.main import app
+    import app.services.storage as storage
+    import app.services.preset as preset
+    import app.services.history as history
+    import app.api.user as user
+    from app.services.jobs import job_queue
+    from app.services.admission import rate_limiter
+    from app.services.llm import llm_scheduler
+    from app.core.config import LLM_QUEUE_MAX_PER_USER
+
+    data_dir = Path(data_dir)
+    patch(storage, "BASE_DIR", data_dir / "output")
+    patch(preset, "PRESET_DIR", data_dir / "output" / "presets")
+    patch(history, "HISTORY_BASE", data_dir / "history")
+    patch(user, "PRESET_BASE", preset.PRESET_DIR)
+    patch(job_queue, "path", data_dir / "_jobs.sqlite3")
+    patch(rate_limiter, "limits", dict(rate_limits or {}))
+    patch(llm_scheduler, "max_per_user", llm_scheduler.max_queued if rate_limits is None else LLM_QUEUE_MAX_PER_USER)
+
+    for user_id in users:
+        preset_dir = preset.PRESET_DIR / user_id
+        preset_dir.mkdir(parents=True, exist_ok=True)
+        for i, name in enumerate(PRESET_NAMES):
+            profile = dict(DEFAULT_PROFILE, name=name, formality=("낮음", "높음", "낮음")[i])
+            (preset_dir / f"{name}.json").write_text(json.dumps(profile, ensure_ascii=False), encoding="utf-8")
+    return app
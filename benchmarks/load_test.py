@@ -0,0 +1,165 @@
+# benchmarks/load_test.py
+# 가짜 Gemini 로 모든 라우터(analyze, convert, preset, storage, history, user)에 동시 부하를 걸고
+# 시나리오별 p50/p95/p99 지연과 초당 요청 수를 출력
+#
+# 실행 예:
+#   python -m benchmarks.load_test                         # 앱을 프로세스 안에서 직접 구동
+#   python -m benchmarks.load_test --latency 1.0 --concurrency 50 --scenarios analyze,convert
+#   python -m benchmarks.load_test --url http://127.0.0.1:8000   # 이미 떠 있는 서버 대상
+#
+# analyze 부하 중 /health 지연도 함께 재서(health_probe), 이벤트 루프가 막히면 눈에 띄게 함
+import argparse
+import asyncio
+import itertools
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+import httpx
+from benchmarks.fake_genai import FakeSettings, DEFAULT_PROFILE, calls
+from benchmarks.harness import prepare_app, PRESET_NAMES
+
+USER_ID = "bench"
+_counter = itertools.count()
+
+def _n() -> int:
+    return next(_counter)
+
+# 시나리오: 이름 -> (메서드, 경로와 본문을 만드는 함수)
+# 문장/대화는 매번 달라지게 만들어 캐시가 아닌 실제 호출 경로를 잰다 (--cacheable 로 끌 수 있음)
+def build_scenarios(unique: bool):
+    def tag() -> str:
+        return f" #{_n()}" if unique else ""
+
+    return {
+        "analyze": ("POST", lambda: (f"/analyze?user_id={USER_ID}", {"dialogue": ["안녕?", f"오늘 뭐해{tag()}", "좋은 하루!"]})),
+        "analyze_stream": ("POST", lambda: (f"/analyze/stream?user_id={USER_ID}", {"dialogue": ["ㅋㅋ", f"밥 먹었어{tag()}"]})),
+        "convert": ("POST", lambda: ("/convert", {"text": f"고마워{tag()}", "target_tone": "정중한"})),
+        "convert_profile": ("POST", lambda: ("/convert/with-profile", {"text": f"언제 끝나?{tag()}", "tone_profile": DEFAULT_PROFILE})),
+        "convert_preset": ("POST", lambda: ("/convert/from-preset", {"text": f"고마워{tag()}", "preset_name": "friend", "user_id": USER_ID})),
+        "convert_auto": ("POST", lambda: ("/convert/auto-preset", {"text": f"고마워{tag()}", "dialogue_context": ["ㅋㅋ 뭐해", "밥 먹었어?"], "user_id": USER_ID})),
+        "convert_batch": ("POST", lambda: ("/convert/batch", {"texts": [f"문장 {i}{tag()}" for i in range(20)], "preset_name": "friend", "user_id": USER_ID})),
+        "convert_stream": ("POST", lambda: ("/convert/stream", {"text": f"고마워{tag()}", "target_tone": "정중한"})),
+        "preset_list": ("GET", lambda: (f"/presets/{USER_ID}", None)),
+        "preset_get": ("GET", lambda: (f"/presets/{USER_ID}/{PRESET_NAMES[_n() % len(PRESET_NAMES)]}", None)),
+        "preset_save": ("POST", lambda: (f"/presets/{USER_ID}", dict(DEFAULT_PROFILE, name="bench_saved"))),
+        "storage_save": ("POST", lambda: (f"/save?user_id={USER_ID}", None)),
+        "storage_load": ("GET", lambda: (f"/load?user_id={USER_ID}", None)),
+        "storage_list": ("GET", lambda: (f"/history?user_id={USER_ID}&sort=desc", None)),
+        "storage_search": ("GET", lambda: (f"/history?user_id={USER_ID}&query=tone:친근", None)),
+        "history_add": ("POST", lambda: (f"/history/{USER_ID}", {"text": f"보낸 메시지{tag()}"})),
+        "history_get": ("GET", lambda: (f"/history/{USER_ID}", None)),
+        "user_ids": ("GET", lambda: ("/user-ids", None)),
+    }
+
+@dataclass
+class Result:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+def percentile(values: list[float], p: float) -> float:
+    ##nearest-rank 백분위수##
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(p / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+async def _request(client: httpx.AsyncClient, method: str, make, result: Result):
+    path, body = make()
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, path, json=body)
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 0
+    result.latencies.append(time.perf_counter() - started)
+    result.statuses[status] = result.statuses.get(status, 0) + 1
+
+async def run_scenario(client: httpx.AsyncClient, name: str, method: str, make, total: int, concurrency: int) -> Result:
+    result = Result(name)
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            await _request(client, method, make, result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float = 0.02) -> Result:
+    result = Result("health_probe")
+    started = time.perf_counter()
+    while not stop.is_set():
+        await _request(client, "GET", lambda: ("/health", None), result)
+        await asyncio.sleep(interval)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+def print_table(results: list[Result]):
+    print(f"{'scenario':<24} {'reqs':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for r in results:
+        rps = len(r.latencies) / r.elapsed if r.elapsed else 0.0
+        ms = [percentile(r.latencies, p) * 1000 for p in (50, 95, 99)]
+        statuses = ",".join(f"{code}:{count}" for code, count in sorted(r.statuses.items()))
+        print(f"{r.name:<24} {len(r.latencies):>6} {rps:>9.1f} {ms[0]:>9.1f} {ms[1]:>9.1f} {ms[2]:>9.1f}  {statuses}")
+
+async def main_async(args) -> list[Result]:
+    scenarios = build_scenarios(unique=not args.cacheable)
+    names = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        fake = FakeSettings(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+        app = prepare_app(Path(tempfile.mkdtemp(prefix="tone_bench_")), fake, users=(USER_ID,))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+
+    results = []
+    async with client:
+        # /save, /load 가 동작하도록 분석 결과를 하나 만들어 둠
+        await client.post(f"/analyze?user_id={USER_ID}", json={"dialogue": ["준비용 대화"]})
+        await client.post(f"/save?user_id={USER_ID}")
+
+        for name in names:
+            method, make = scenarios[name]
+            if name.startswith("analyze"):
+                stop = asyncio.Event()
+                probe = asyncio.create_task(probe_health(client, stop))
+                results.append(await run_scenario(client, name, method, make, args.requests, args.concurrency))
+                stop.set()
+                health = await probe
+                health.name = f"  /health@{name}"
+                results.append(health)
+            else:
+                results.append(await run_scenario(client, name, method, make, args.requests, args.concurrency))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Tone Analyzer offline load test")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (없으면 앱을 프로세스 안에서 구동)")
+    parser.add_argument("--scenarios", help="쉼표로 구분한 시나리오 이름 (기본: 전부)")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 Gemini 평균 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--cacheable", action="store_true", help="같은 입력을 반복해서 캐시 적중 경로를 잼")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print_table(results)
+    if not args.url:
+        print(f"fake gemini calls: {calls}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import asyncio
+import httpx
+import pytest
+from benchmarks.fake_genai import FakeSettings
+from benchmarks.harness import prepare_app
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    ##임시 폴더를 쓰는 앱을 준비, 바꾼 모듈 전역(저장 경로, 한도 등)은 테스트가 끝나면 되돌림##
+    def make(fake: FakeSettings | None = None, users: tuple[str, ...] = ("tester",),
+             rate_limits: dict[str, tuple[float, int]] | None = None):
+        fake = fake or FakeSettings(latency=0.0, jitter=0.0)
+        return prepare_app(tmp_path, fake, users=users, rate_limits=rate_limits, patch=monkeypatch.setattr)
+    return make
+
+@pytest.fixture
+def make_client(make_app):
+    ##make_app 으로 준비한 앱에 ASGI 로 요청하는 클라이언트 (테스트의 asyncio.run 안에서 사용)##
+    clients = []
+
+    def make(raise_app_exceptions: bool = True, **app_options) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=make_app(**app_options), raise_app_exceptions=raise_app_exceptions)
+        clients.append(httpx.AsyncClient(transport=transport, base_url="http://test"))
+        return clients[-1]
+
+    yield make
+    for client in clients:
+        asyncio.run(client.aclose())
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
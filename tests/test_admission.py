@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from app.services.admission import FairScheduler, current_user
+
+class Busy(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def test_fair_scheduler_interleaves_users_and_caps_backlog():
+    scheduler = FairScheduler(capacity=1, max_queued=10, max_per_user=4, busy_error=Busy)
+    order = []
+
+    async def call(user_id: str, label: str, hold: asyncio.Event | None = None):
+        current_user.set(user_id)
+        async with scheduler.slot("test"):
+            order.append(label)
+            if hold is not None:
+                await hold.wait()
+
+    async def run():
+        hold = asyncio.Event()
+        first = asyncio.create_task(call("a", "a0", hold))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(call("a", f"a{i}")) for i in range(1, 5)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("b", "b1")))
+        await asyncio.sleep(0)
+        with pytest.raises(Busy):
+            await call("a", "a5")
+        hold.set()
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+    # b 는 a 가 먼저 쌓아 둔 요청을 모두 기다리지 않고 두 번째로 실행됨
+    assert order == ["a0", "a1", "b1", "a2", "a3", "a4"]
+    assert scheduler.active == 0
+
+def test_convert_rate_limit_returns_429(make_client):
+    client = make_client(raise_app_exceptions=False, rate_limits={"convert": (60, 2)})
+
+    async def run():
+        return [
+            await client.post("/convert/from-preset", json={"text": f"안녕 {i}", "user_id": "tester", "preset_name": "friend"})
+            for i in range(3)
+        ] + [await client.post("/convert/from-preset", json={"text": "안녕", "user_id": "other", "preset_name": "friend"})]
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses[:3]] == [200, 200, 429]
+    assert int(responses[2].headers["retry-after"]) >= 1
+    # 다른 사용자는 한도에 영향 없음 (프리셋이 없어 실패할 뿐 429 아님)
+    assert responses[3].status_code != 429
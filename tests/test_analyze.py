@@ -0,0 +1,62 @@
+import asyncio
+import time
+import pytest
+from benchmarks.fake_genai import FakeSettings, DEFAULT_PROFILE
+
+LATENCY = 0.3
+
+@pytest.fixture
+def client(make_client):
+    return make_client(fake=FakeSettings(latency=LATENCY, jitter=0.0))
+
+def test_analyze_returns_profile(client):
+    async def run():
+        return await client.post("/analyze?user_id=tester", json={"dialogue": ["안녕?", "오늘 뭐해?"]})
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json()["name"] == DEFAULT_PROFILE["name"]
+
+def test_analyze_does_not_block_event_loop(client):
+    async def run():
+        analysis = asyncio.create_task(
+            client.post("/analyze?user_id=tester", json={"dialogue": ["이벤트 루프 확인용"]})
+        )
+        await asyncio.sleep(LATENCY / 6)
+        started = time.perf_counter()
+        health = await client.get("/health")
+        elapsed = time.perf_counter() - started
+        await analysis
+        return health, elapsed
+
+    health, elapsed = asyncio.run(run())
+    assert health.status_code == 200
+    assert elapsed < LATENCY / 2
+
+def test_metrics_record_route_and_llm_call_site(client):
+    async def run():
+        await client.post("/analyze?user_id=tester", json={"dialogue": ["메트릭 확인용"]})
+        return await client.get("/metrics")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert 'http_requests_total{method="POST",route="/analyze",status="200"}' in response.text
+    assert 'llm_call_duration_seconds_count{call_site="analyze_tone"' in response.text
+
+def test_analysis_job_completes_and_feeds_save(client):
+    async def run():
+        created = await client.post("/analyze/jobs?user_id=tester", json={"dialogue": ["작업 큐 확인용"]})
+        job_id = created.json()["job_id"]
+        for _ in range(50):
+            job = await client.get(f"/analyze/jobs/{job_id}?user_id=tester")
+            if job.json()["status"] in ("done", "failed"):
+                break
+            await asyncio.sleep(LATENCY / 5)
+        saved = await client.post("/save?user_id=tester")
+        return created, job, saved
+
+    created, job, saved = asyncio.run(run())
+    assert created.status_code == 202
+    assert job.json()["status"] == "done"
+    assert job.json()["result"]["name"] == DEFAULT_PROFILE["name"]
+    assert saved.status_code == 200
@@ -0,0 +1,26 @@
+import asyncio
+from benchmarks.harness import PRESET_NAMES
+
+def test_auto_preset_without_presets_is_404(client):
+    body = {"text": "고마워", "dialogue_context": ["ㅋㅋ 뭐해", "밥 먹었어?"], "user_id": "nobody"}
+
+    async def run():
+        return await client.post("/convert/auto-preset", json=body), await client.post("/convert/auto-preset/stream", json=body)
+
+    plain, stream = asyncio.run(run())
+    assert plain.status_code == 404
+    # 스트림 시작 전에 프리셋을 고르므로 SSE error 이벤트가 아니라 404
+    assert stream.status_code == 404
+    assert stream.json()["detail"] == "프리셋을 찾을 수 없습니다"
+
+def test_auto_preset_stream_sends_selected_preset_first(client):
+    body = {"text": "고마워", "dialogue_context": ["ㅋㅋ 뭐해", "밥 먹었어?"], "user_id": "tester"}
+
+    async def run():
+        return await client.post("/convert/auto-preset/stream", json=body)
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert events[0] == "preset" and events[-1] == "done"
+    assert any(f'"selected_preset": "{name}"' in response.text for name in PRESET_NAMES)
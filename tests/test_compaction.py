@@ -0,0 +1,18 @@
+from app.services.compaction import compact_dialogue, estimate_tokens
+
+def test_compaction_strips_system_lines_and_collapses_spam():
+    dialogue = [
+        "홍길동님과 카카오톡 대화",
+        "--------------- 2024년 4월 10일 수요일 ---------------",
+        "[철수] [오후 3:12] ㅋㅋㅋㅋㅋㅋㅋㅋㅋㅋ",
+        "[철수] [오후 3:12] ㅋㅋㅋㅋ",
+        "[영희] [오후 3:13] 사진",
+        "[영희] [오후 3:13] 오늘 저녁 뭐 먹을래? 배고파ㅠㅠㅠㅠㅠ",
+    ]
+    assert compact_dialogue(dialogue) == ["[철수] ㅋㅋㅋ", "[영희] 오늘 저녁 뭐 먹을래? 배고파ㅠㅠㅠ"]
+
+def test_compaction_respects_token_budget():
+    dialogue = [f"메시지 {i}번 보내요~ 내일 봬요" for i in range(500)] + ["아주 긴 문단 " * 200]
+    compacted = compact_dialogue(dialogue, token_budget=300, line_max_tokens=40)
+    assert sum(estimate_tokens(line) for line in compacted) <= 300
+    assert all(estimate_tokens(line) <= 40 for line in compacted)
@@ -0,0 +1,32 @@
+import asyncio
+from benchmarks.fake_genai import DEFAULT_PROFILE
+
+def test_read_endpoints_answer_304_until_a_write(client):
+    from app.services.storage import save_tone_profile
+    from app.schemas import ToneProfile
+    save_tone_profile("tester", ToneProfile.model_validate(DEFAULT_PROFILE))
+
+    async def revalidate(client, url):
+        first = await client.get(url)
+        again = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        return first, again
+
+    async def run():
+        urls = [
+            "/presets/tester", "/presets/tester?expand=true", "/presets/tester/friend",
+            "/load?user_id=tester", "/load/result_001.json?user_id=tester",
+            "/history?user_id=tester", "/history/tester",
+        ]
+        before = {url: await revalidate(client, url) for url in urls}
+        await client.post("/presets/tester", json=dict(DEFAULT_PROFILE, name="friend", tone="정중한"))
+        await client.put("/update/result_001.json?user_id=tester", json=dict(DEFAULT_PROFILE, tone="정중한"))
+        await client.post("/history/tester", json={"text": "새 메시지"})
+        after = {url: await client.get(url, headers={"If-None-Match": before[url][0].headers["etag"]}) for url in urls}
+        return before, after
+
+    before, after = asyncio.run(run())
+    for url, (first, again) in before.items():
+        assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache", url
+        assert again.status_code == 304 and again.content == b"", url
+    for url, response in after.items():
+        assert response.status_code == 200, url
@@ -0,0 +1,45 @@
+import asyncio
+import json
+from app.services import convert
+from app.services.llm import LLMUnavailableError
+
+def test_batch_keeps_order_dedups_and_falls_back_per_item(client, monkeypatch):
+    prompts = []
+
+    async def fake_generate_text(prompt, models=None, call_site="generate"):
+        prompts.append(call_site)
+        if call_site == "convert_batch":
+            numbered = json.loads(prompt.split("입력 문장(JSON):", 1)[1])
+            # '셋' 은 응답에서 빠진 것처럼 (파싱 실패) 만들어 단건 변환으로 넘어가게 함
+            return json.dumps({key: f"배치:{text}" for key, text in numbered.items() if text != "배치 셋"}, ensure_ascii=False)
+        return "단건:배치 셋"
+
+    monkeypatch.setattr(convert, "generate_text", fake_generate_text)
+    body = {"texts": ["배치 하나", "배치 둘", "배치 하나", "배치 셋"], "target_tone": "장난스러운"}
+
+    async def run():
+        return (await client.post("/convert/batch", json=body)).json(), (await client.post("/convert/batch", json=body)).json()
+
+    first, second = asyncio.run(run())
+    assert first["converted_texts"] == ["배치:배치 하나", "배치:배치 둘", "배치:배치 하나", "단건:배치 셋"]
+    # 같은 문장은 한 번만 보내고, 빠진 문장만 단건 호출
+    assert first["llm_calls"] == 2 and prompts == ["convert_batch", "convert_tone"]
+    assert second["converted_texts"] == first["converted_texts"]
+    assert second["cached_count"] == 4 and second["llm_calls"] == 0
+
+def test_batch_propagates_llm_outage_without_per_item_retries(client, monkeypatch):
+    calls = []
+
+    async def failing_generate_text(prompt, models=None, call_site="generate"):
+        calls.append(call_site)
+        raise LLMUnavailableError("모델 장애", retry_after=7)
+
+    monkeypatch.setattr(convert, "generate_text", failing_generate_text)
+
+    async def run():
+        return await client.post("/convert/batch", json={"texts": [f"장애 {i}" for i in range(5)], "target_tone": "장난스러운"})
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert calls == ["convert_batch"]
@@ -0,0 +1,50 @@
+import asyncio
+from benchmarks.bench_formality import evaluate, load_corpus
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from app.services import convert
+from app.services.formality import target_from_tone, transform, try_local
+
+def test_formality_fast_path_matches_reference_corpus():
+    report = evaluate(load_corpus(), min_confidence=0.85)
+    assert report["coverage"] >= 0.8
+    assert report["agreement"] >= 0.95
+
+def test_formality_fast_path_defers_ambiguous_sentences():
+    polite = target_from_tone("정중한")
+    assert transform("밥 먹었니?", polite).text == "밥 먹었나요?"
+    # 호칭/주체 높임이 필요한 문장, 격식 외의 톤은 LLM 으로
+    assert try_local("너 어디야?", polite, 0.85) is None
+    assert try_local("잘 지내셨어요?", target_from_tone("반말"), 0.85) is None
+    assert target_from_tone("친근한") is None
+
+def test_formality_fast_path_defers_unpunctuated_multi_clause_messages():
+    polite, casual = target_from_tone("정중한"), target_from_tone("반말")
+    # 마지막 어절만 바뀌어 말 높이가 섞이는 문장은 LLM 으로
+    assert try_local("응 알았어 내일 봐", polite, 0.85) is None
+    assert try_local("배고파, 밥 먹자", polite, 0.85) is None
+    assert try_local("네 알겠습니다 내일 갈게요", casual, 0.85) is None
+    assert try_local("도와주실 수 있나요?", casual, 0.85) is None
+    assert transform("가는 중 ㅋㅋ 좀 늦어", polite).text == "가는 중 좀 늦어요"
+
+def test_profile_conversions_always_reach_the_llm(client, monkeypatch):
+    calls = []
+
+    async def fake_generate_text(prompt, models=None, call_site="generate"):
+        calls.append(call_site)
+        return "LLM 변환"
+
+    monkeypatch.setattr(convert, "generate_text", fake_generate_text)
+    # 격식만 보면 규칙으로 바꿀 수 있는 문장이라도 프로필의 어휘/이모지 특성은 LLM 이 반영해야 함
+    profile = dict(DEFAULT_PROFILE, formality="높음")
+
+    async def run():
+        return [
+            (await client.post("/convert", json={"text": "알았어", "target_tone": "정중한"})).json(),
+            (await client.post("/convert/with-profile", json={"text": "알았어", "tone_profile": profile})).json(),
+            (await client.post("/convert/from-preset", json={"text": "알았어", "preset_name": "business", "user_id": "tester"})).json(),
+        ]
+
+    tone, with_profile, from_preset = asyncio.run(run())
+    assert tone["converted_text"] == "알겠어요"
+    assert with_profile["converted_text"] == from_preset["converted_text"] == "LLM 변환"
+    assert calls == ["convert_with_style", "convert_with_style"]
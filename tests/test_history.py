@@ -0,0 +1,53 @@
+import asyncio
+import json
+import pytest
+from app.services import history
+
+@pytest.mark.usefixtures("client")
+def test_log_is_compacted_to_retention(monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_MAX_ITEMS", 5)
+    monkeypatch.setattr(history, "HISTORY_COMPACT_FACTOR", 2)
+    path = history.get_history_path("hist")
+
+    counts = [history.append_history("hist", f"메시지 {i}") for i in range(10)]
+    assert counts == [1, 2, 3, 4, 5, 5, 5, 5, 5, 5]
+    # 보관 개수의 2배까지는 추가만
+    assert len(path.read_bytes().splitlines()) == 10
+
+    history.append_history("hist", "메시지 10")
+    assert len(path.read_bytes().splitlines()) == 5
+    assert history.read_history("hist") == [f"메시지 {i}" for i in range(6, 11)]
+
+def test_offset_and_limit_count_from_latest(client, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_MAX_ITEMS", 5)
+    for i in range(8):
+        history.append_history("hist", f"메시지 {i}")
+    # 쓰다가 끊긴 줄은 건너뜀
+    with open(history.get_history_path("hist"), "ab") as f:
+        f.write('{"text": "끊긴'.encode("utf-8"))
+
+    assert history.read_history("hist") == [f"메시지 {i}" for i in range(3, 8)]
+    assert history.read_history("hist", offset=1, limit=2) == ["메시지 5", "메시지 6"]
+    assert history.read_history("hist", offset=4) == ["메시지 3"]
+    assert history.read_history("hist", offset=5) == []
+
+    async def run():
+        return await client.get("/history/hist", params={"offset": 0, "limit": 2})
+
+    assert asyncio.run(run()).json() == ["메시지 6", "메시지 7"]
+
+@pytest.mark.usefixtures("client")
+def test_legacy_json_history_is_migrated(monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_MAX_ITEMS", 5)
+    legacy = history.HISTORY_BASE / "old.json"
+    legacy.parent.mkdir(parents=True, exist_ok=True)
+    legacy.write_text(json.dumps([f"예전 {i}" for i in range(7)], ensure_ascii=False), encoding="utf-8")
+
+    # 옮기기 전에는 조건부 GET 검증자 없이 읽음
+    assert history.history_validator("old") is None
+    assert history.read_history("old") == [f"예전 {i}" for i in range(2, 7)]
+    assert not legacy.exists() and legacy.with_name("old.json.migrated").exists()
+    assert history.history_validator("old") is not None
+
+    assert history.append_history("old", "새 메시지") == 5
+    assert history.read_history("old") == [f"예전 {i}" for i in range(3, 7)] + ["새 메시지"]
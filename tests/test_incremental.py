@@ -0,0 +1,37 @@
+import asyncio
+from app.services import incremental
+from app.services.incremental import find_new_lines, line_hash
+
+def test_find_new_lines_after_last_anchor():
+    dialogue = [f"줄 {i}" for i in range(20)]
+    anchor = [line_hash(line) for line in dialogue[5:8]]
+    assert find_new_lines(dialogue, anchor) == dialogue[8:]
+    assert find_new_lines(dialogue, [line_hash("없는 줄")]) is None
+    assert find_new_lines(dialogue, [line_hash(line) for line in dialogue[-3:]]) == []
+
+def test_incremental_analyze_uses_saved_profile_and_forces_full(client, monkeypatch):
+    monkeypatch.setattr(incremental, "INCREMENTAL_FULL_EVERY", 2)
+    first = [f"[친구] [오후 3:{i:02}] 오늘 {i}번째 얘기 ㅋㅋ" for i in range(12)]
+    second = first + ["[친구] [오후 4:00] 새로 온 메시지야!", "[친구] [오후 4:01] 내일 봐~"]
+    third = second + ["[친구] [오후 5:00] 또 왔어"]
+
+    async def analyze(client, dialogue, save=True):
+        response = await client.post("/analyze?user_id=inc&incremental=true", json={"dialogue": dialogue})
+        if save:
+            assert (await client.post("/save?user_id=inc")).status_code == 200
+        return response.headers["x-analysis-mode"]
+
+    async def run():
+        return [
+            await analyze(client, first),
+            # 저장하지 않은 결과는 기준이 되지 않음
+            await analyze(client, second, save=False),
+            await analyze(client, second),
+            await analyze(client, second),
+            await analyze(client, third),
+            await analyze(client, third + ["[친구] [오후 6:00] 마지막"]),
+            await analyze(client, ["전혀 다른 대화"]),
+        ]
+
+    # 증분 갱신 2번 뒤에는 전체 재분석, 이어지지 않는 대화도 전체 분석
+    assert asyncio.run(run()) == ["full", "incremental", "incremental", "unchanged", "incremental", "full", "full"]
@@ -0,0 +1,158 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from app.schemas import ToneProfile
+from app.services.jobs import JobQueue, QueueFullError, RUNNING, DONE
+
+LEASE = 0.6
+
+def _queue(path, workers: int = 1, max_queued: int = 10) -> JobQueue:
+    queue = JobQueue(path, workers, max_queued, max_per_user=10, result_ttl=3600, lease=LEASE, poll_interval=0.05)
+    handled = []
+
+    async def handler(user_id: str, dialogue: list[str]) -> ToneProfile:
+        handled.append((user_id, dialogue))
+        return ToneProfile.model_validate(DEFAULT_PROFILE)
+
+    queue.set_handler(handler)
+    queue.handled = handled
+    return queue
+
+async def _wait_done(queue: JobQueue, job_id: str) -> dict:
+    for _ in range(100):
+        job = await queue.get(job_id)
+        if job["status"] == DONE:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+def _mark_running(queue: JobQueue, job_id: str, owner: str, updated_at: float):
+    queue._execute("UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?", (RUNNING, owner, updated_at, job_id))
+
+def test_start_requeues_only_expired_leases(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    other, restarted = _queue(path, workers=0), _queue(path)
+
+    async def run():
+        live = await other.submit("tester", ["다른 워커가 실행 중"])
+        stale = await other.submit("tester", ["죽은 워커가 잡고 있던 작업"])
+        _mark_running(other, live, "host:1:live", time.time())
+        _mark_running(other, stale, "host:2:dead", time.time() - LEASE * 2)
+
+        await restarted.start()
+        job = await _wait_done(restarted, stale)
+        await asyncio.sleep(0.1)
+        await restarted.stop()
+        return job, await restarted.get(live)
+
+    job, live_job = asyncio.run(run())
+    assert job["result"].name == DEFAULT_PROFILE["name"]
+    assert live_job["status"] == RUNNING
+    assert restarted.handled == [("tester", ["죽은 워커가 잡고 있던 작업"])]
+
+def test_idle_worker_claims_jobs_submitted_by_another_process(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    submitter, worker = _queue(path, workers=0), _queue(path)
+
+    async def run():
+        job_ids = [await submitter.submit(user, [f"{user} 작업"]) for user in ("a", "a", "b")]
+        await worker.start()
+        jobs = [await _wait_done(worker, job_id) for job_id in job_ids]
+        await worker.stop()
+        return jobs
+
+    jobs = asyncio.run(run())
+    assert [job["status"] for job in jobs] == [DONE] * 3
+    # 사용자별로 번갈아 처리
+    assert [user for user, _ in worker.handled] == ["a", "b", "a"]
+    assert submitter.handled == []
+
+def test_max_queued_is_shared_across_processes(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    first, second = _queue(path, workers=0, max_queued=2), _queue(path, workers=0, max_queued=2)
+
+    async def run():
+        await first.submit("a", ["하나"])
+        await second.submit("b", ["둘"])
+        with pytest.raises(QueueFullError):
+            await first.submit("c", ["셋"])
+        with pytest.raises(QueueFullError):
+            await second.submit("c", ["셋"])
+        return first._queued
+
+    assert asyncio.run(run()) == 2
+
+def test_running_job_keeps_its_lease_while_handler_runs(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    slow, other = _queue(path), _queue(path, workers=0)
+
+    async def handler(user_id: str, dialogue: list[str]) -> ToneProfile:
+        await asyncio.sleep(LEASE * 2)
+        return ToneProfile.model_validate(DEFAULT_PROFILE)
+
+    slow.set_handler(handler)
+
+    async def run():
+        await slow.start()
+        job_id = await slow.submit("tester", ["오래 걸리는 작업"])
+        await asyncio.sleep(LEASE * 1.5)
+        # 임대 시간이 지났어도 하트비트로 갱신 중이라 다른 프로세스가 가져가지 않음
+        recovered = other.requeue_expired()
+        status = (await other.get(job_id))["status"]
+        job = await _wait_done(slow, job_id)
+        await slow.stop()
+        return recovered, status, job
+
+    recovered, status, job = asyncio.run(run())
+    assert recovered == 0
+    assert status == RUNNING
+    assert job["status"] == DONE
+
+def test_locked_database_does_not_block_the_event_loop(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    queue = _queue(path, workers=0)
+
+    async def run():
+        await queue.submit("tester", ["스키마 준비"])
+        # 다른 프로세스가 쓰기 잠금을 잡고 있는 상황: 루프가 돌아야 잠금이 풀림
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        asyncio.get_running_loop().call_later(0.3, holder.execute, "COMMIT")
+        started = time.perf_counter()
+        job_id = await queue.submit("tester", ["잠금이 풀린 뒤 추가"])
+        elapsed = time.perf_counter() - started
+        holder.close()
+        return await queue.get(job_id), elapsed
+
+    job, elapsed = asyncio.run(run())
+    assert job["status"] == "queued"
+    assert 0.25 < elapsed < 2
+
+def test_worker_survives_failed_result_write(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.sqlite3"
+    queue = _queue(path)
+    execute = queue._execute
+    failures = []
+
+    def flaky_execute(sql, params=()):
+        if sql.startswith("UPDATE jobs SET status = ?, result = ?") and not failures:
+            failures.append(params[-2])
+            raise sqlite3.OperationalError("database is locked")
+        return execute(sql, params)
+
+    monkeypatch.setattr(queue, "_execute", flaky_execute)
+
+    async def run():
+        await queue.start()
+        first = await queue.submit("tester", ["기록 실패"])
+        await asyncio.sleep(0.2)
+        second = await queue.submit("tester", ["다음 작업"])
+        job = await _wait_done(queue, second)
+        await queue.stop()
+        return first, job
+
+    first, job = asyncio.run(run())
+    assert failures == [first]
+    assert job["status"] == DONE
@@ -0,0 +1,27 @@
+import asyncio
+from benchmarks import fake_genai
+from benchmarks.fake_genai import FakeSettings
+
+def test_fallback_to_next_model_when_circuit_opens(monkeypatch):
+    settings = fake_genai.install(FakeSettings(latency=0.0, jitter=0.0, error_rate=1.0))
+    from app.services import llm
+    monkeypatch.setattr(llm, "LLM_RETRY_BASE", 0.0)
+    monkeypatch.setattr(llm, "LLM_BREAKER_THRESHOLD", 2)
+
+    calls = []
+    original = fake_genai.GenerativeModel.generate_content_async
+
+    async def flaky(self, contents, **kwargs):
+        calls.append(self.model_name)
+        settings.error_rate = 1.0 if self.model_name == "test-primary" else 0.0
+        return await original(self, contents, **kwargs)
+
+    monkeypatch.setattr(fake_genai.GenerativeModel, "generate_content_async", flaky)
+    try:
+        text = asyncio.run(llm.generate_text("안녕", ("test-primary", "test-fallback"), call_site="test"))
+    finally:
+        settings.error_rate = 0.0
+
+    assert text == settings.text
+    assert calls[-1] == "test-fallback"
+    assert llm.get_breaker("test-primary").state == llm.OPEN
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import pytest
+from benchmarks.fake_genai import DEFAULT_PROFILE
+
+def test_expanded_preset_listing_is_served_from_pack(client):
+    import app.services.preset as preset
+
+    async def run():
+        page = await client.get("/presets/tester?expand=true&fields=formality&offset=1&limit=1")
+        await client.post("/presets/tester", json=dict(DEFAULT_PROFILE, name="added"))
+        await client.delete("/presets/tester/friend")
+        names = await client.get("/presets/tester")
+        bad = await client.get("/presets/tester?expand=true&fields=bogus")
+        return page, names, bad
+
+    page, names, bad = asyncio.run(run())
+    assert page.json() == {"total": 3, "offset": 1, "limit": 1, "items": [{"name": "friend", "formality": "낮음"}]}
+    assert names.json() == ["added", "business", "lover"]
+    assert bad.status_code == 400
+
+    # 팩 밖에서 추가된 프리셋 파일도 폴더 mtime 으로 감지해 반영
+    (preset.PRESET_DIR / "tester" / "manual.json").write_text(json.dumps(dict(DEFAULT_PROFILE, name="manual")), encoding="utf-8")
+    assert "manual" in preset.list_presets("tester")
+
+def _save_presets(worker: int, count: int):
+    import app.services.preset as preset
+    from app.schemas import ToneProfile
+    for i in range(count):
+        preset.save_preset("tester", f"w{worker}_{i}", ToneProfile.model_validate(dict(DEFAULT_PROFILE, name=f"w{worker}_{i}")))
+
+@pytest.mark.usefixtures("client")
+def test_concurrent_saves_from_worker_processes_keep_every_preset():
+    import multiprocessing
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork 가 필요한 테스트")
+    import app.services.preset as preset
+    preset.load_preset_pack("tester")
+
+    # 여러 uvicorn 워커처럼 프로세스마다 따로 팩을 읽고 고침
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_save_presets, args=(worker, 10)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    stored = set(preset._read_pack_file("tester").presets)
+    assert {f"w{worker}_{i}" for worker in range(4) for i in range(10)} <= stored
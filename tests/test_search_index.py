@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from app.schemas import ToneProfile
+from app.services import storage
+
+def _profile(**changes) -> ToneProfile:
+    return ToneProfile.model_validate(dict(DEFAULT_PROFILE, **changes))
+
+@pytest.mark.usefixtures("client")
+def test_search_ranks_by_field_weight_and_scopes_fields():
+    storage.save_tone_profile("search", _profile(name="회사", tone="친근한"))
+    storage.save_tone_profile("search", _profile(name="상사", tone="차분한", notes="가끔 친근한 말도 씀"))
+    storage.save_tone_profile("search", _profile(name="친근 모드", tone="친근한"))
+
+    def search(query: str) -> list[str]:
+        return storage.list_user_history("search", query=query)
+
+    # 이름/톤(가중치 3)에서 맞으면 메모(가중치 1)보다 앞
+    assert search("친근") == ["result_003.json", "result_001.json", "result_002.json"]
+    # 필드를 지정하면 그 필드 점수만: 같은 점수는 저장 순서대로
+    assert search("tone:친근") == ["result_001.json", "result_003.json"]
+    # relationship_tendency 의 tone 값은 tone 필드가 아님
+    assert search("tone:유쾌") == []
+    assert search("유쾌") == ["result_001.json", "result_002.json", "result_003.json"]
+    # 검색어는 모두 포함해야 함, 모르는 필드명은 일반 검색어
+    assert search("친근 차분") == ["result_002.json"]
+    assert search("mood:친근") == []
+
+def test_index_follows_update_and_delete(client):
+    storage.save_tone_profile("search", _profile(name="회사", tone="정중한"))
+    storage.save_tone_profile("search", _profile(name="친구", tone="친근한"))
+
+    storage.update_profile("search", "result_001.json", _profile(name="회사", tone="친근한 존댓말"))
+    assert storage.list_user_history("search", query="tone:정중") == []
+    assert storage.list_user_history("search", query="tone:친근") == ["result_001.json", "result_002.json"]
+
+    storage.delete_profile("search", "result_002.json")
+
+    async def run():
+        return await client.get("/history", params={"user_id": "search", "query": "tone:친근"})
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json() == ["result_001.json"]
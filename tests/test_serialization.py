@@ -0,0 +1,45 @@
+import json
+from benchmarks.fake_genai import DEFAULT_PROFILE
+from app.schemas import ToneProfile
+from app.core import serialization
+from app.core.serialization import VerifiedFiles, dumps, model_hash, model_to_json, write_model
+from app.services.cache import profile_key
+
+def test_encodings_match_without_orjson(monkeypatch):
+    profile = ToneProfile.model_validate(DEFAULT_PROFILE)
+    data = {"presets": {"friend": profile.model_dump()}, 1: "숫자 키"}
+    fast = dumps(data)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert dumps(data) == fast
+    # 모델 경로와 dict 경로가 같은 저장 형식을 만듦 (한글 그대로, 공백 없음)
+    assert model_to_json(profile) == dumps(profile.model_dump())
+    assert "말투".encode("utf-8") in model_to_json(profile) and b": " not in model_to_json(profile)
+
+def test_model_hash_ignores_field_order_and_backs_profile_key():
+    profile = ToneProfile.model_validate(DEFAULT_PROFILE)
+    reordered = ToneProfile.model_validate(dict(reversed(list(DEFAULT_PROFILE.items()))))
+    assert model_hash(profile) == model_hash(reordered)
+    assert model_hash(profile) != model_hash(profile.model_copy(update={"tone": "다른 톤"}))
+    assert profile_key(profile) == "profile:" + model_hash(profile)
+
+def test_verified_files_passthrough_and_legacy_format(tmp_path):
+    profile = ToneProfile.model_validate(DEFAULT_PROFILE)
+    verified = VerifiedFiles(8)
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps(DEFAULT_PROFILE, ensure_ascii=False, indent=2), encoding="utf-8")
+    compact = tmp_path / "compact.json"
+    compact.write_bytes(model_to_json(profile))
+
+    # 예전 형식은 검증 후 저장 형식으로 바꿔 응답하고, 확인 목록에는 넣지 않음
+    assert verified.read(legacy, ToneProfile) == model_to_json(profile)
+    assert verified.read(legacy, ToneProfile) == model_to_json(profile)
+    assert verified.stats()["misses"] == 2
+
+    assert verified.read(compact, ToneProfile) == model_to_json(profile)
+    assert verified.read(compact, ToneProfile) == model_to_json(profile)
+    assert verified.stats()["hits"] == 1
+
+    # 파일이 교체되면 (저장 경로는 모두 원자적 교체) 다시 검증
+    write_model(compact, profile.model_copy(update={"tone": "정중한"}))
+    assert json.loads(verified.read(compact, ToneProfile))["tone"] == "정중한"
+    assert verified.stats()["hits"] == 1
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+PROBE = r"""
+import asyncio, json, sys
+import httpx
+import app.main
+
+async def run():
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        presets = await client.get("/presets/startup-test")
+        convert = await client.post("/convert", json={"text": "안녕", "target_tone": "친근한"})
+        return presets.status_code, convert.status_code
+
+presets, convert = asyncio.run(run())
+print(json.dumps({"presets": presets, "convert": convert, "sdk": "google.generativeai" in sys.modules}))
+"""
+
+def test_app_boots_without_key_and_defers_sdk_import(tmp_path):
+    env = dict(os.environ, GEMINI_API_KEY="", PYTHONPATH=os.getcwd())
+    # 저장 경로가 작업 디렉터리 기준이므로 임시 폴더에서 실행
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=tmp_path, capture_output=True, text=True, check=True
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    assert result == {"presets": 200, "convert": 503, "sdk": False}
@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import webapp
+from app.services.webapp import WebBuild, web_build as shared_build
+
+def test_web_app_serves_precompressed_and_versioned_assets(tmp_path, monkeypatch):
+    root = tmp_path / "web"
+    root.mkdir()
+    (root / "index.html").write_text('<html><head><base href="/tone_c_project/"></head></html>', encoding="utf-8")
+    (root / "main.dart.js").write_text("console.log('tone');\n" * 500, encoding="utf-8")
+    # 공유 인스턴스는 건드리지 않고 이 테스트용 빌드를 라우터에 끼워 넣음
+    web_build = WebBuild(root, tmp_path / "cache", shared_build.mount_path)
+    monkeypatch.setattr(webapp, "web_build", web_build)
+    web_build.scan()
+    web_build.precompress()
+
+    app = FastAPI()
+    app.include_router(webapp.router)
+    client = TestClient(app)
+
+    index = client.get("/web/", headers={"Accept-Encoding": "identity"})
+    assert f'<base href="/web/_v/{web_build.build_id}/">' in index.text
+    assert index.headers["cache-control"] == "no-cache"
+    assert client.get("/web/", headers={"If-None-Match": index.headers["etag"], "Accept-Encoding": "identity"}).status_code == 304
+
+    script = client.get(f"/web/_v/{web_build.build_id}/main.dart.js", headers={"Accept-Encoding": "gzip"})
+    assert script.headers["content-encoding"] == "gzip"
+    assert script.headers["cache-control"].endswith("immutable")
+    assert int(script.headers["content-length"]) < (root / "main.dart.js").stat().st_size
+    assert client.get("/web/_v/old-build/main.dart.js").headers["cache-control"] == "no-cache"
+    assert client.get("/web/missing.js").status_code == 404
@@ -0,0 +1,7 @@
+// API 서버 주소
+// API 서버가 웹 앱을 함께 제공(WEB_APP_DIR)할 때는 빈 값으로 빌드하면 같은 출처로 요청 (CORS preflight 없음)
+//   flutter build web --dart-define=API_SERVER=
+const String apiServer = String.fromEnvironment(
+  'API_SERVER',
+  defaultValue: 'https://tonecproject-production.up.railway.app',
+);
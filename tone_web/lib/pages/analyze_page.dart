@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
+import '../api_config.dart';
 
 import 'preset_page.dart';
 
@@ -18,7 +19,7 @@ class _AnalyzePageState extends State<AnalyzePage> {
   bool _loading = false;
   Map<String, dynamic>? _result;
 
-  final String hostApiServer = 'https://tonecproject-production.up.railway.app';
+  final String hostApiServer = apiServer;
 
   @override
   void dispose() {
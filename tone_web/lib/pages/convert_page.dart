@@ -2,6 +2,7 @@ import 'package:flutter/material.dart';
 import 'package:flutter/services.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
+import '../api_config.dart';
 import 'dart:async'; // ⏱️ timeout 처리용
 
 class ConvertPage extends StatefulWidget {
@@ -18,7 +19,7 @@ class _ConvertPageState extends State<ConvertPage> {
   String _autoPresetName = '';
   bool _loading = false;
 
-  final String hostApiServer = 'https://tonecproject-production.up.railway.app';
+  final String hostApiServer = apiServer;
 
   List<String> _presetList = [];
   String? _selectedPreset;
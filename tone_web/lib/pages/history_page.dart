@@ -2,6 +2,7 @@ import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
 import 'package:flutter/services.dart'; // ✅ 복사 기능을 위한 import
 import 'dart:convert';
+import '../api_config.dart';
 
 class HistoryPage extends StatefulWidget {
   final String userId;  // userId를 필수 파라미터로 추가
@@ -12,7 +13,7 @@ class HistoryPage extends StatefulWidget {
 }
 
 class _HistoryPageState extends State<HistoryPage> {
-  final String hostApiServer = 'https://tonecproject-production.up.railway.app';
+  final String hostApiServer = apiServer;
   List<String> _history = [];
   bool _loading = true;
 
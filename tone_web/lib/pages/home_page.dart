@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
+import '../api_config.dart';
 
 import 'analyze_page.dart';
 import 'preset_page.dart';
@@ -19,7 +20,7 @@ class _HomePageState extends State<HomePage> {
   List<String> _userIds = [];
   bool _loading = false;
   bool _isUserSelected = false;
-  final String hostApiServer = 'https://tonecproject-production.up.railway.app';
+  final String hostApiServer = apiServer;
 
   @override
   void initState() {
@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
+import '../api_config.dart';
 
 class PresetPage extends StatefulWidget {
   final String userId;
@@ -11,8 +12,10 @@ class PresetPage extends StatefulWidget {
 }
 
 class _PresetPageState extends State<PresetPage> {
-  final String hostApiServer = 'https://tonecproject-production.up.railway.app';
+  final String hostApiServer = apiServer;
   List<String> _presetNames = [];
+  // expand=true 로 한 번에 받아온 프리셋 프로필 (이름 -> 프로필)
+  Map<String, Map<String, dynamic>> _presetProfiles = {};
   String? _selectedPreset;
   Map<String, dynamic>? _presetDetail;
   bool _loading = false;
@@ -70,12 +73,14 @@ class _PresetPageState extends State<PresetPage> {
   Future<void> _loadPresetList() async {
     setState(() => _loading = true);
     try {
-      final uri = Uri.parse('$hostApiServer/presets/${widget.userId}');
+      final uri = Uri.parse('$hostApiServer/presets/${widget.userId}?expand=true');
       final response = await http.get(uri);
       if (response.statusCode == 200) {
         final decoded = utf8.decode(response.bodyBytes);
+        final items = List<Map<String, dynamic>>.from(jsonDecode(decoded)['items']);
         setState(() {
-          _presetNames = List<String>.from(jsonDecode(decoded));
+          _presetProfiles = {for (final item in items) item['name'] as String: item};
+          _presetNames = _presetProfiles.keys.toList();
         });
       } else {
         throw Exception('불러오기 실패');
@@ -109,11 +114,13 @@ class _PresetPageState extends State<PresetPage> {
       _loading = true;
     });
     try {
-      final uri = Uri.parse('$hostApiServer/presets/${widget.userId}/$presetName');
-      final response = await http.get(uri);
-      if (response.statusCode == 200) {
-        final decoded = utf8.decode(response.bodyBytes);
-        final data = jsonDecode(decoded);
+      // 목록을 불러올 때 받아둔 프로필이 있으면 다시 요청하지 않음
+      final cached = _presetProfiles[presetName];
+      final response = cached == null
+          ? await http.get(Uri.parse('$hostApiServer/presets/${widget.userId}/$presetName'))
+          : null;
+      if (cached != null || response!.statusCode == 200) {
+        final data = cached ?? jsonDecode(utf8.decode(response!.bodyBytes));
         setState(() {
           _presetDetail = data;
           _nameController.text = data['name'] ?? '';
@@ -138,6 +145,7 @@ class _PresetPageState extends State<PresetPage> {
   }
 
   Future<bool> _checkPresetExists(String name) async {
+    if (_presetProfiles.containsKey(name)) return true;
     try {
       final uri = Uri.parse('$hostApiServer/presets/${widget.userId}/$name');
       final response = await http.get(uri);